@@ -1,11 +1,10 @@
 import streamlit as st
+import re
+import numpy as np
 import pandas as pd
-import json
-from pathlib import Path
-import os
-from src.config_loader import load_config
-from src.run_pipeline import load_existing_dataset
-from src.io_utils import load_json
+from src import data_cache
+from src.journal import append_entries, journal_path
+from src.aggregates import update_cubes
 
 
 class EditCategoriesPage:
@@ -23,46 +22,110 @@ class EditCategoriesPage:
         self.columns_to_edit = [
             'New Subcategory'
             ]
+        # Columns the editor can be sorted by (sorted indexes of the filter engine)
+        self.sort_columns = [
+            'Date',
+            'Amount'
+            ]
+        # Page sizes offered in the editor (0 = all rows, unpaged)
+        self.page_sizes = [100, 250, 500, 1000, 0]
 
     #---------------------------------------------------------------------------------------------------------------
     # Internal method to load config, data and rules into session state if not already loaded
     #---------------------------------------------------------------------------------------------------------------
     def _load_initial_state(self):
         """
-        Load data, config and rules if not already in session state
+        Load config and rules if not already in session state, and initialize the session overlay.
+
+        The dataset itself is not copied into the session: all sessions share the same read-only
+        base frame (see src/data_cache.py), reloaded only when the stored dataset or the edit
+        journal changes. Each session only holds its pending modifications:
+        - edits : pending modifications (New Subcategory / New Category), indexed by the stable
+          (fingerprint, occurrence) key of the rows (see data_cache.get_row_index), so they stay
+          attached to the same operations when the dataset is reloaded (e.g. new rows added by the pipeline)
         """
         # Load config
         if 'config' not in st.session_state :
-            st.session_state.config = load_config()
-        # Load data
-        if 'data' not in st.session_state :                 
-            st.session_state.data = load_existing_dataset(st.session_state.config)
+            st.session_state.config = data_cache.get_config()
 
         if 'rules' not in st.session_state :
             # Load rules file to get categories and subcategories
-            st.session_state.rules = load_json(st.session_state.config['rules_file'])
-
-        if 'current_df' not in st.session_state :
-            # Filter data to keep only relevant columns for editing
-            st.session_state.current_df = (
-                st.session_state.data
-                .loc[:, self.columns_to_display]
-                .copy()
-            )
-            st.session_state.current_df['Date'] = st.session_state.current_df['Date'].dt.strftime('%Y-%m-%d')
+            st.session_state.rules = data_cache.get_rules(st.session_state.config)
 
-            # Create stable row identifier
-            st.session_state.current_df["row_id"] = st.session_state.current_df.index
+        if 'edits' not in st.session_state :
+            st.session_state.edits = pd.DataFrame(
+                columns=['New Subcategory', 'New Category'],
+                index=pd.MultiIndex.from_arrays([[], []], names=['fingerprint', 'occurrence'])
+                )
 
-            # Add columns to store modifications
-            for col in ['New Subcategory', 'New Category']:
-                if col not in st.session_state.current_df.columns:
-                    st.session_state.current_df[col] = ''
+    #---------------------------------------------------------------------------------------------------------------
+    # Internal method to get the shared base dataframe displayed in the editor
+    #---------------------------------------------------------------------------------------------------------------
+    def _base_df(self):
+        """
+        Return the shared, read-only display dataframe (must never be modified in place).
+        """
+        return data_cache.get_display_frame(st.session_state.config, self.columns_to_display)
 
     #---------------------------------------------------------------------------------------------------------------
-    # Internal method to apply filters to the master dataframe and return the filtered dataframe for display
+    # Internal method to get the stable keys of rows of the base dataframe
+    #---------------------------------------------------------------------------------------------------------------
+    def _row_keys(self, df):
+        """
+        Return the (fingerprint, occurrence) keys of rows of the base dataframe, read from the rows
+        themselves so they designate the displayed operations even if the dataset was reloaded since.
+        """
+        return pd.MultiIndex.from_arrays([df[col].to_numpy() for col in data_cache.ROW_KEY_COLUMNS], names=data_cache.ROW_KEY_COLUMNS)
+
+    #---------------------------------------------------------------------------------------------------------------
+    # Internal method to get the positions of the edited rows in the base dataframe
+    #---------------------------------------------------------------------------------------------------------------
+    def _edited_positions(self):
+        """
+        Return the row_id of each pending modification in the base dataframe (-1 if the row is no longer in the dataset).
+        """
+        return data_cache.get_row_index(st.session_state.config).get_indexer(st.session_state.edits.index)
+
+    #---------------------------------------------------------------------------------------------------------------
+    # Internal method to apply the session overlay (pending edits) on a slice of the base dataframe
+    #---------------------------------------------------------------------------------------------------------------
+    def _with_overlay(self, df_slice):
+        """
+        Return a copy of a slice of the base dataframe with the session edits applied.
+
+        Parameters
+        ----------
+        df_slice : pd.DataFrame
+            Rows of the base dataframe (e.g. after filtering).
+
+        Returns
+        -------
+        pd.DataFrame
+            The slice with the 'New Subcategory' / 'New Category' columns.
+        """
+        df = df_slice.astype({'Category': object, 'Subcategory': object})
+        edits = st.session_state.edits
+        if edits.empty:
+            df['New Subcategory'] = df['New Category'] = ''
+            return df
+        overlay = edits.reindex(self._row_keys(df))
+        for col in ['New Subcategory', 'New Category']:
+            df[col] = overlay[col].fillna('').to_numpy()
+        return df
+
     #---------------------------------------------------------------------------------------------------------------
-    def _apply_amount_filter(self, df, filter_str):
+    # Internal method to get the shared filter indexes of the base dataframe
+    #---------------------------------------------------------------------------------------------------------------
+    def _filter_index(self):
+        """
+        Return the shared filter indexes of the base dataframe (see src/filter_index.py).
+        """
+        return data_cache.get_filter_index(st.session_state.config, self.columns_to_display)
+
+    #---------------------------------------------------------------------------------------------------------------
+    # Internal method to apply the amount filter using the sorted Amount index
+    #---------------------------------------------------------------------------------------------------------------
+    def _apply_amount_filter(self, index, filter_str):
             """
             Apply numeric filtering on the Amount column.
 
@@ -74,33 +137,22 @@ class EditCategoriesPage:
 
             Parameters
             ----------      
-            df : pd.DataFrame
+            index : FilterIndex
             filter_str : str          
             
             Returns
             -------
-            pd.DataFrame
-                Filtered dataframe based on the amount filter.
+            np.ndarray or None
+                Bitmap of the rows matching the amount filter, None if the filter is invalid.
             """
             try:
-                if filter_str.startswith('>'):
-                    threshold = float(filter_str[1:])
-                    return df[df['Amount'] > threshold]
-                elif filter_str.startswith('<'):
-                    threshold = float(filter_str[1:])
-                    return df[df['Amount'] < threshold]
-                elif ':' in filter_str:
-                    low, high = map(float, filter_str.split(':'))
-                    if low > high:
-                        st.warning("Invalid range: low value is greater than high value.")
-                        return df
-                    return df[(df['Amount'] >= low) & (df['Amount'] <= high)]
+                return index.amount(filter_str)
+            except ValueError as e:
+                if str(e).startswith("Invalid range"):
+                    st.warning(str(e))
                 else:
-                    value = float(filter_str)
-                    return df[df['Amount'] == value]
-            except ValueError:
-                st.warning("Invalid amount filter format. Please use '>100', '<50', '10:200', or '150'.")
-                return df
+                    st.warning("Invalid amount filter format. Please use '>100', '<50', '10:200', or '150'.")
+                return None
 
     #---------------------------------------------------------------------------------------------------------------
     # Internal method to apply filters to the master dataframe and return the filtered dataframe for display
@@ -121,21 +173,22 @@ class EditCategoriesPage:
         """
         Apply all UI filters to the master dataframe.
 
+        Each filter is answered by the precomputed indexes of the base dataframe (bitmaps, sorted
+        arrays, n-gram index) and filters are combined by intersecting their bitmaps.
+
         Parameters
         ----------
         df : pd.DataFrame
-            The master dataframe stored in session_state.
+            The shared base dataframe.
         search_date : datetime.date or None
         search_month : int or None
         search_year : int or None
         search_text : str
-        amount : str
-             Examples: '50', '-50', '>100', '<100', '10:200'
+        amount_filter : str
+            Examples: '>100', '<50', '10:200', '150'
         account : list
         category : list
         subcategory : list
-        amount_filter : str
-            Examples: '>100', '<50', '10-200'
         filter_modified : bool
 
         Returns
@@ -143,47 +196,38 @@ class EditCategoriesPage:
         pd.DataFrame
             Filtered dataframe (view only, does not modify master).
         """
-        # Initiate df_filtered with all data
-        df_filtered = df
+        index = self._filter_index()
+        bitmaps = []
 
-        # Apply filters to the dataframe
         if search_date:
-            df_filtered = df_filtered[
-                df_filtered["Date"] == search_date
-            ]
+            bitmaps.append(index.equals('Date', search_date.strftime('%Y-%m-%d')))
         if search_month:
-            df_filtered = df_filtered[
-                df_filtered["Month"] == search_month
-            ]
+            bitmaps.append(index.isin('Month', [search_month]))
         if search_year:
-            df_filtered = df_filtered[
-                df_filtered["Year"] == search_year
-            ]       
+            bitmaps.append(index.isin('Year', [search_year]))
         if search_text:
-            df_filtered = df_filtered[
-                df_filtered["Details"].str.contains(search_text, case=False, na=False)
-            ]
+            try:
+                bitmaps.append(index.contains(search_text))
+            except re.error:
+                st.warning("Invalid search pattern.")
         if amount_filter:
-            df_filtered = self._apply_amount_filter(df_filtered, amount_filter)
+            amount_bitmap = self._apply_amount_filter(index, amount_filter)
+            if amount_bitmap is not None:
+                bitmaps.append(amount_bitmap)
         if account:
-            df_filtered = df_filtered[
-                df_filtered["Account"].isin(account)
-            ]
+            bitmaps.append(index.isin('Account', account))
         if category:
-            df_filtered = df_filtered[
-                df_filtered["Category"].isin(category)
-            ]
+            bitmaps.append(index.isin('Category', category))
         if subcategory:
-            df_filtered = df_filtered[
-                df_filtered["Subcategory"].isin(subcategory)
-            ]
+            bitmaps.append(index.isin('Subcategory', subcategory))
         if filter_modified:
-            df_filtered = df_filtered[
-                df_filtered['New Subcategory'] != ''
-            ]
+            positions = self._edited_positions()
+            bitmaps.append(index.from_positions(positions[positions >= 0]))
+
+        if not bitmaps:
+            return df
+        return df.iloc[index.rows(index.combine(bitmaps))]
 
-        return df_filtered
-    
     #---------------------------------------------------------------------------------------------------------------
     # Internal method to list subcategories from rules file
     #---------------------------------------------------------------------------------------------------------------
@@ -207,6 +251,60 @@ class EditCategoriesPage:
             subcat_list.add('other')
         return sorted(subcat_list)
     
+    #---------------------------------------------------------------------------------------------------------------
+    # Internal method to sort the filtered dataframe and keep only the visible page
+    #---------------------------------------------------------------------------------------------------------------
+    def _paginate(self, df_filtered):
+        """
+        Render the sort and pagination controls and return the visible page of the filtered dataframe.
+
+        Rows are sorted through the sorted indexes of the filter engine and only the rows of the
+        current page are sent to the data editor. The default page size and sort column come from
+        the config ('editor_page_size', 'editor_sort_by'); a page size of 0 shows all rows.
+
+        Parameters
+        ----------
+        df_filtered : pd.DataFrame
+            The dataframe after applying filters (rows of the base dataframe).
+
+        Returns
+        -------
+        pd.DataFrame
+            The rows of the current page, in the selected sort order.
+        """
+        config = st.session_state.config
+        default_size = config.get('editor_page_size', 500)
+        page_sizes = self.page_sizes if default_size in self.page_sizes else sorted(self.page_sizes + [default_size])
+        default_sort = config.get('editor_sort_by', 'Date')
+
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col2:
+            sort_by = st.selectbox(
+                "Sort by",
+                options=self.sort_columns,
+                index=self.sort_columns.index(default_sort) if default_sort in self.sort_columns else 0
+            )
+        with col3:
+            descending = st.toggle("Descending", value=True)
+        with col4:
+            page_size = st.selectbox(
+                "Rows per page",
+                options=page_sizes,
+                index=page_sizes.index(default_size),
+                format_func=lambda size: "All" if size == 0 else str(size)
+            )
+
+        n_rows = len(df_filtered)
+        n_pages = max(1, -(-n_rows // page_size)) if page_size else 1
+        with col1:
+            page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1) if n_pages > 1 else 1
+
+        positions = self._filter_index().sort_rows(df_filtered['row_id'].to_numpy(), sort_by, descending)
+        if page_size:
+            positions = positions[(page - 1) * page_size:page * page_size]
+        st.caption(f"{n_rows} transactions, page {page}/{n_pages}")
+        return self._base_df().iloc[positions]
+
     #---------------------------------------------------------------------------------------------------------------
     # Internal method to render the data editor with the filtered dataframe
     #---------------------------------------------------------------------------------------------------------------
@@ -217,7 +315,7 @@ class EditCategoriesPage:
         Parameters
         ----------
         df_filtered : pd.DataFrame
-            The dataframe after applying filters, to be displayed in the data editor.
+            The dataframe after applying filters (visible page only), to be displayed in the data editor.
         
         Returns
         -------
@@ -225,6 +323,7 @@ class EditCategoriesPage:
             The edited dataframe returned by the data editor, containing user modifications.
         """
         subcat_list = self._list_subcategories(st.session_state.rules)
+        df_filtered = self._with_overlay(df_filtered)
 
         edited_df = st.data_editor(
             df_filtered,
@@ -232,7 +331,9 @@ class EditCategoriesPage:
                 'New Subcategory': st.column_config.SelectboxColumn(
                     options=subcat_list
                 ),
-                "row_id": None 
+                "row_id": None,
+                "fingerprint": None,
+                "occurrence": None
             },
             disabled = [
                 col for col in df_filtered.columns
@@ -246,113 +347,144 @@ class EditCategoriesPage:
         return edited_df
 
     #---------------------------------------------------------------------------------------------------------------
-    #   Internal method to map subcategory to main category using rules file
+    #   Internal method to build the subcategory -> main category lookup from the rules file
     #---------------------------------------------------------------------------------------------------------------
-    def _map_subcat_to_main(self, subcat):
+    def _subcat_to_main_lookup(self):
         """
-        Map a subcategory to its main category using the rules file.
-        Parameters
-        ----------
-        subcat : str
-            The subcategory to map.
-        
+        Lookup table mapping each subcategory to its main category, computed once per session.
+
         Returns
         -------
-        str
-            The main category corresponding to the subcategory.
+        dict
+            {subcategory: main category}, including 'other'.
         """
-        if subcat in st.session_state.rules:
-            return st.session_state.rules[subcat]['main_category']
-        elif subcat == 'other':
-            return 'other'
-        else:
-            return ''   
+        if 'subcat_to_main' not in st.session_state:
+            lookup = {subcat: details['main_category'] for subcat, details in st.session_state.rules.items()}
+            lookup['other'] = 'other'
+            st.session_state.subcat_to_main = lookup
+        return st.session_state.subcat_to_main
 
     #---------------------------------------------------------------------------------------------------------------
-    # Internal method to apply changes from the data editor to the master dataframe in session state
+    # Internal method to apply changes from the data editor to the session edits
     #---------------------------------------------------------------------------------------------------------------
     def _apply_editor_changes(self, df_filtered):
+        """
+        Apply all the rows edited in the data editor to the session edits in one batch.
+
+        The edited positions are resolved to row keys through the key columns of the displayed
+        dataframe (as rendered, whatever the current version of the dataset), subcategories are mapped to main categories with the precomputed lookup, and
+        the session edits (indexed by row key) are updated with a single assignment.
+
+        Parameters
+        ----------
+        df_filtered : pd.DataFrame
+            The dataframe displayed in the data editor.
+        """
         editor_state = st.session_state.get('category_editor', {})
+        edited_rows = editor_state.get('edited_rows')
 
-        if "edited_rows" not in editor_state:
+        if not edited_rows:
             return
-        
-        for display_idx, changes in editor_state['edited_rows'].items():
-            # Find the actual index in the master dataframe
-            idx = df_filtered.iloc[display_idx]['row_id']
-
-            for col, new_value in changes.items():
-                # Update the master dataframe with the new value
-                st.session_state.current_df.loc[
-                    st.session_state.current_df['row_id'] == idx,
-                     col
-                ] = new_value
-
-                # Map the new subcategory to the main category and update it in the master dataframe
-                if col == 'New Subcategory':
-                    new_main_cat = self._map_subcat_to_main(new_value)
-                    st.session_state.current_df.loc[
-                        st.session_state.current_df['row_id'] == idx,
-                        'New Category'
-                    ] = new_main_cat
-                
-        
-    #---------------------------------------------------------------------------------------------------------------
-    # Internal method to save the modified dataframe to a CSV file
-    #---------------------------------------------------------------------------------------------------------------
-    def _save_to_csv(self, test=False):
-        """
-        Save the modified dataframe to a CSV file.
-        """
-        try:
-            if test:
-                output_path = "data/processed/personal/final_data_test.csv"
-            else:
-                output_path = st.session_state.config['output_file']
-            
-            st.session_state.data.to_csv(output_path, index=False)
-            st.success(f"✅ Data saved to {output_path}!")
-        except Exception as e:
-            st.error(f"Error saving data: {e}")
+
+        # Collect the edited positions and new subcategories into arrays
+        changes = [
+            (int(position), values['New Subcategory'])
+            for position, values in edited_rows.items()
+            if 'New Subcategory' in values
+            ]
+        if not changes:
+            return
+        positions, new_subcats = zip(*changes)
+
+        # Resolve display positions to row keys
+        row_keys = self._row_keys(df_filtered.iloc[np.asarray(positions)])
+        new_subcats = pd.Series(new_subcats, index=row_keys, dtype=object)
+        new_subcats = new_subcats[~new_subcats.index.duplicated(keep='last')]
+
+        # Cleared cells remove the pending modification, the others replace it
+        is_set = new_subcats.notna() & (new_subcats != '')
+        new_edits = pd.DataFrame({
+            'New Subcategory': new_subcats[is_set],
+            'New Category': new_subcats[is_set].map(self._subcat_to_main_lookup()).fillna(''),
+            })
+        edits = st.session_state.edits
+        st.session_state.edits = pd.concat([
+            edits[~edits.index.isin(new_subcats.index)],
+            new_edits
+            ])
+
 
     #---------------------------------------------------------------------------------------------------------------
-    # Internal method to save modifications from the edited dataframe to the master dataframe in session state
+    # Internal method to save modifications from the session edits
     #---------------------------------------------------------------------------------------------------------------
     def _save_modifications(self):
         """
-        Save modifications from the edited dataframe to the master dataframe in session state.
-        Parameters
-        ----------
-        edited_df : pd.DataFrame
-            The dataframe returned by the data editor, containing user modifications.
+        Save the pending modifications of the session to the edit journal (see src/journal.py).
+
+        Only the modified rows are written: each one is identified by its fingerprint and
+        occurrence number, with its old and new subcategory. The shared dataset is reloaded with
+        the journal replayed on the next run, and the pipeline replays it on every load.
+        The aggregate tables are updated with the modified rows only.
         Returns
         -------
         None
         """
-        df = st.session_state.current_df
-        # Filter only modified rows
-        mask = st.session_state.current_df['New Subcategory'] != ''
-        # df_modified = st.session_state.current_df.loc[mask].copy()
+        edits = st.session_state.edits
 
         # If no modifications, show info message and return
-        if not mask.any():
+        if edits.empty:
             st.info("No modifications to save.")
             return
 
-        # If there are modifications, update the master dataframe 
-        df.loc[mask, 'Category'] = df.loc[mask, 'New Category']
-        df.loc[mask, 'Subcategory'] = df.loc[mask, 'New Subcategory']
-        df.loc[mask, 'is_manual']= True
+        config = st.session_state.config
+
+        # Positions and rows are read from one version of the dataset (see data_cache.get_keyed_dataset)
+        df, row_index = data_cache.get_keyed_dataset(config)
+        positions = row_index.get_indexer(edits.index)
+
+        # Rows removed from the dataset since they were edited (e.g. rebuilt by the pipeline) are dropped
+        if (positions < 0).any():
+            st.warning(f"{int((positions < 0).sum())} modified row(s) no longer in the dataset, ignored.")
+            edits = edits[positions >= 0]
+            positions = positions[positions >= 0]
+            if edits.empty:
+                st.session_state.edits = edits
+                return
+
+        # Rows as they are before the modifications (the shared dataset is reloaded once the journal changes)
+        rows_before = df.iloc[positions]
+        entries = [
+            {
+                'fingerprint': int(fingerprint),
+                'occurrence': int(occurrence),
+                'old_subcategory': old_subcat if isinstance(old_subcat, str) else None,
+                'new_subcategory': new_subcat,
+                'new_category': new_cat,
+            }
+            for (fingerprint, occurrence), old_subcat, new_subcat, new_cat in zip(
+                edits.index,
+                rows_before['Subcategory'].astype(object).to_numpy(),
+                edits['New Subcategory'],
+                edits['New Category'],
+                )
+            ]
 
-        # Update master dataframe with modifications
-        st.session_state.data.update(df.loc[mask])
+        try:
+            append_entries(entries, journal_path(config))
+            st.success(f"✅ {len(entries)} modification(s) saved to {journal_path(config)}!")
+        except OSError as e:
+            st.error(f"Error saving data: {e}")
+            return
 
-        # Save to test file to check before overwriting master file
-        self._save_to_csv(test=True)
+        # Move the modified rows between categories in the aggregate tables
+        rows_after = rows_before.assign(
+            Category=edits['New Category'].to_numpy(),
+            Subcategory=edits['New Subcategory'].to_numpy()
+            )
+        update_cubes(config, df_added=rows_after, df_removed=rows_before)
 
-        # Reset temp columns
-        df.loc[mask, 'New Subcategory'] = ''
-        df.loc[mask, 'New Category'] = ''
+        # Reset pending modifications
+        st.session_state.edits = edits.iloc[0:0]
 
 
     #---------------------------------------------------------------------------------------------------------------
@@ -366,8 +498,10 @@ class EditCategoriesPage:
 
         # Container for filters and data editor
         with st.container():
-            # Initiate df_filtered with all data
-            df_filtered = st.session_state.current_df
+            # Shared base dataframe (read-only)
+            base_df = self._base_df()
+            # Filter option lists, computed once per dataset version
+            options = data_cache.get_filter_options(st.session_state.config, self.columns_to_display)
           
             col1, col2 = st.columns([4, 1])
             with col1:
@@ -389,14 +523,14 @@ class EditCategoriesPage:
             with col2:
                 search_month = st.selectbox(
                     "Search by month",
-                    options=[None] + sorted(st.session_state.current_df["Month"].dropna().unique()),
+                    options=[None] + options["Month"],
                     help="Filter transactions by month. Leave empty to show all."
                 )
             
             with col3:
                 search_year = st.selectbox(
                     "Search by year",
-                    options=[None] + sorted(st.session_state.current_df["Year"].dropna().unique()),
+                    options=[None] + options["Year"],
                     help="Filter transactions by year. Leave empty to show all."
                 )
 
@@ -418,27 +552,26 @@ class EditCategoriesPage:
             with col6:
                 account = st.multiselect(
                     "Search by account",
-                    sorted(st.session_state.current_df["Account"].dropna().unique()),
+                    options["Account"],
                     help="Filter transactions by account. Leave empty to show all."
                 )
 
             with col7:
                 category = st.multiselect(
                     "Search by category",
-                    sorted(st.session_state.current_df["Category"].dropna().unique()),
+                    options["Category"],
                     help="Filter transactions by category. Leave empty to show all."
                 )
 
             with col8:
                 # if a category is selected, filter corresponding subcategories
                 if category != []:
-                    subcat = sorted(
-                        st.session_state.current_df[
-                            st.session_state.current_df["Category"].isin(category)
-                            ]["Subcategory"].dropna().unique()
-                        )
+                    subcat = sorted({
+                        sub for cat in category
+                        for sub in options["subcategories_by_category"].get(cat, [])
+                        })
                 else:
-                    subcat = sorted(st.session_state.current_df["Subcategory"].dropna().unique())
+                    subcat = options["Subcategory"]
 
                 subcategory = st.multiselect(
                     "Search by subcategory",
@@ -448,7 +581,7 @@ class EditCategoriesPage:
 
             # Apply filters to the dataframe
             df_filtered = self._apply_filters(
-                st.session_state.current_df,
+                base_df,
                 search_date,
                 search_month,
                 search_year,
@@ -460,8 +593,8 @@ class EditCategoriesPage:
                 filter_modified
             )
             
-            # Display filtered dataframe in data editor
-            self._render_editor(df_filtered)
+            # Display the current page of the filtered dataframe in data editor
+            self._render_editor(self._paginate(df_filtered))
 
            # Buttons to apply modifications to the current dataframe and save modifications to the master database
             cols = st.columns([1,1,1])                
@@ -0,0 +1,142 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : End-to-end benchmark of the pipeline stages on synthetic raw files.
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import logging
+import tempfile
+import subprocess
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.synthetic_data import generate_dataset
+from src.io_utils import load_json
+from src.run_pipeline import load_raw_files, remove_existing_rows, save_final_dataset
+from src.clean import clean_bank_data
+from src.categorize import categorize_operations
+from src.fingerprint import FingerprintIndex, FINGERPRINT_COLUMN, add_fingerprints
+
+# Default dataset sizes (number of raw operations)
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Folder of the JSON results (one file per run)
+RESULTS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def _timed(timings: dict, stage: str, function, *args, **kwargs):
+    """ Run function, store its wall time (seconds) under stage and return its result. """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    timings[stage] = round(time.perf_counter() - start, 4)
+    return result
+
+def bench_size(n_rows: int, folder: str, n_accounts: int = 4, n_months: int = 24) -> dict:
+    """
+    Time the pipeline stages on n_rows synthetic operations.
+
+    The first half of the operations is the existing dataset and every raw file is read again,
+    like a run where half of the raw files were already ingested: remove_existing_rows drops the
+    existing half, and the other half is categorized and saved.
+    """
+    config = generate_dataset(folder, n_rows, n_accounts, n_months)
+    rules = load_json(config['rules_file'])
+    timings = {}
+
+    df_raw = _timed(timings, 'load_raw_files', load_raw_files, config)
+    df_clean = _timed(timings, 'clean_bank_data', clean_bank_data, df_raw, config)
+
+    # Existing dataset (not timed): first half, categorized, with its fingerprint index
+    df_existing = categorize_operations(df_clean.iloc[:len(df_clean) // 2], config['category_columns'], category_rules=rules)
+    df_existing = add_fingerprints(df_existing, config['merge_col'])
+    index = FingerprintIndex.from_fingerprints(df_existing[FINGERPRINT_COLUMN].to_numpy())
+
+    df_new = _timed(timings, 'remove_existing_rows', remove_existing_rows, df_clean, df_existing, config, index)
+    df_new_cat = _timed(
+        timings, 'categorize_operations', categorize_operations, df_new, config['category_columns'], category_rules=rules
+        )
+    _timed(timings, 'save_final_dataset', save_final_dataset, df_new_cat, df_existing, config)
+
+    return {
+        'rows': n_rows,
+        'rows_clean': len(df_clean),
+        'rows_new': len(df_new),
+        'seconds': timings,
+        'total_seconds': round(sum(timings.values()), 4),
+        }
+
+def environment() -> dict:
+    """ Versions and commit the results were produced with. """
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(RESULTS_FOLDER)
+            ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        }
+
+def run_benchmarks(sizes: list, output_file: str = None) -> dict:
+    """ Run the benchmark for each size and save the results as JSON (in benchmarks/results by default). """
+    results = {**environment(), 'results': []}
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            result = bench_size(n_rows, folder)
+        results['results'].append(result)
+        stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in result['seconds'].items())
+        print(f"{n_rows:>10} rows: {stages} (total {result['total_seconds']:.2f}s)")
+
+    if output_file is None:
+        os.makedirs(RESULTS_FOLDER, exist_ok=True)
+        output_file = os.path.join(RESULTS_FOLDER, f"{results['date'][:10]}_{results['commit'] or 'nocommit'}.json")
+    with open(output_file, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {output_file}")
+    return results
+
+def compare(baseline_file: str, current_file: str) -> pd.DataFrame:
+    """ Time ratio (current / baseline) of each stage and size found in both result files. """
+    rows = []
+    with open(baseline_file) as file:
+        baseline = {result['rows']: result['seconds'] for result in json.load(file)['results']}
+    with open(current_file) as file:
+        current = {result['rows']: result['seconds'] for result in json.load(file)['results']}
+    for n_rows in sorted(set(baseline) & set(current)):
+        for stage in baseline[n_rows]:
+            if stage in current[n_rows]:
+                rows.append({
+                    'rows': n_rows,
+                    'stage': stage,
+                    'baseline_s': baseline[n_rows][stage],
+                    'current_s': current[n_rows][stage],
+                    'ratio': round(current[n_rows][stage] / max(baseline[n_rows][stage], 1e-9), 2),
+                    })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Dataset sizes (number of operations).")
+    parser.add_argument('--output', default=None, help="Result file (default: benchmarks/results/<date>_<commit>.json).")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Compare two result files instead of running.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    if args.compare:
+        print(compare(*args.compare).to_string(index=False))
+    else:
+        run_benchmarks(args.sizes, args.output)
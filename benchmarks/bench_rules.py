@@ -0,0 +1,87 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Benchmark of the compiled rule engine against the original loop of str.contains over the rules.
+
+import os
+import sys
+import time
+import string
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rule_engine import compile_rules
+from src.synthetic_data import synthetic_rules as rules_file
+
+# Default (number of rules, number of distinct strings) cases; 14 rules is the synthetic rules file
+CASES = [(14, 100_000), (400, 20_000), (400, 100_000)]
+
+
+def synthetic_rules(n_rules: int, rng: np.random.Generator, words: list) -> dict:
+    """ Rules mixing plain literals, optional characters, alternations and word boundaries. """
+    rules = {}
+    for index in range(n_rules):
+        first, second, third = rng.choice(words, 3, replace=False)
+        shapes = [
+            [first, second],
+            [rf'{first} ?{second[:3]}', third],
+            [rf'(PRLV|VIR) SEPA {first}', rf'\b{second}\b'],
+            ]
+        rules[f'subcategory {index}'] = {'main_category': f'category {index % 20}', 'patterns': shapes[index % 3]}
+    return rules
+
+def synthetic_details(n_strings: int, rng: np.random.Generator, words: list) -> list:
+    """ Distinct operation details built like statement labels (prefix, two words, card date). """
+    prefixes = ['CB ', 'PRLV SEPA ', 'VIR SEPA ', 'RETRAIT DAB ', '']
+    return [
+        f"{rng.choice(prefixes)}{rng.choice(words)} {rng.choice(words)} {rng.integers(1, 29):02d}/{rng.integers(1, 13):02d} {n}"
+        for n in range(n_strings)
+        ]
+
+def legacy_categorize(details: pd.Series, category_rules: dict) -> pd.Series:
+    """ Original implementation: one str.contains scan per rule, the last matching rule wins. """
+    subcategories = pd.Series('other', index=details.index, dtype=object)
+    for subcategory, rule in category_rules.items():
+        mask = details.str.contains('|'.join(rule['patterns']), case=False, na=False)
+        subcategories[mask] = subcategory
+    return subcategories
+
+def bench_case(n_rules: int, n_strings: int, seed: int = 0) -> dict:
+    """ Time both implementations on the same rules and strings, and check that they agree. """
+    rng = np.random.default_rng(seed)
+    words = [''.join(rng.choice(list(string.ascii_uppercase), size=rng.integers(4, 9))) for _ in range(3000)]
+    rules = rules_file() if n_rules == len(rules_file()) else synthetic_rules(n_rules, rng, words)
+    details = pd.Series(synthetic_details(n_strings, rng, words))
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)  # patterns with groups
+        expected = legacy_categorize(details, rules)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = compile_rules(rules)
+    labels = np.array(compiled.subcategories + ['other'], dtype=object)[compiled.match_all(details.tolist())]
+    engine_seconds = time.perf_counter() - start
+
+    return {
+        'rules': len(rules),
+        'strings': n_strings,
+        'legacy_s': round(legacy_seconds, 3),
+        'engine_s': round(engine_seconds, 3),
+        'speedup': round(legacy_seconds / max(engine_seconds, 1e-9), 1),
+        'identical': bool((labels == expected.to_numpy()).all()),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the compiled rule engine against the loop over the rules.")
+    parser.add_argument('--cases', type=int, nargs=2, action='append', metavar=('RULES', 'STRINGS'),
+                        help="Number of rules (14: synthetic rules file) and of distinct strings (repeatable).")
+    args = parser.parse_args()
+    results = pd.DataFrame([bench_case(n_rules, n_strings) for n_rules, n_strings in (args.cases or CASES)])
+    print(results.to_string(index=False))
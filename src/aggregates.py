@@ -0,0 +1,112 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Monthly and yearly aggregate tables (cubes) maintained incrementally for the dashboards.
+
+import os
+import logging
+import pandas as pd
+from src.io_utils import file_lock
+
+# Dimensions of the aggregate tables
+DIMENSIONS = ['Account', 'Category', 'Subcategory', 'Debit/Credit']
+
+# Cubes: name -> time keys
+CUBES = {
+    'monthly': ['Year', 'Month'],
+    'yearly': ['Year'],
+}
+
+# Additive measures stored in the cubes (Average is derived from them)
+MEASURES = ['Total', 'Count']
+
+
+def cube_path(config: dict, name: str) -> str:
+    """ Path of a cube file ({name}_summary.csv in the 'aggregates' folder, next to the final dataset by default). """
+    folder = config.get('aggregates') or os.path.dirname(config['output_final'])
+    return os.path.join(folder, f"{name}_summary.csv")
+
+def _keys(name: str) -> list:
+    return CUBES[name] + DIMENSIONS
+
+def _plain_keys(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """ Key columns with plain dtypes (int time keys, object labels) so cubes and new rows group together. """
+    return pd.DataFrame({
+        col: df[col].astype('int64') if col in ('Year', 'Month') else df[col].astype(object)
+        for col in keys
+        })
+
+def aggregate(df: pd.DataFrame, name: str, sign: int = 1) -> pd.DataFrame:
+    """
+    Total amount and number of rows of df for each key combination of the cube (multiplied by sign).
+    Rows without date (unparsable in the raw file) cannot be placed in a period and are left out.
+    """
+    keys = _keys(name)
+    df = df[df[CUBES[name]].notna().all(axis=1)]
+    grouped = _plain_keys(df, keys).assign(Total=df['Amount'].to_numpy() * sign, Count=sign)
+    return grouped.groupby(keys, dropna=False, sort=False)[MEASURES].sum().reset_index()
+
+def merge(cubes: list, name: str) -> pd.DataFrame:
+    """ Sum partial cubes, dropping empty cells, and derive the average amount. """
+    keys = _keys(name)
+    combined = pd.concat([cube[keys + MEASURES] for cube in cubes if not cube.empty], ignore_index=True)
+    if combined.empty:
+        return pd.DataFrame(columns=keys + MEASURES + ['Average'])
+    cube = combined.groupby(keys, dropna=False, sort=True)[MEASURES].sum().reset_index()
+    cube = cube[cube['Count'] != 0].reset_index(drop=True)
+    cube['Total'] = cube['Total'].round(2)
+    cube['Count'] = cube['Count'].astype('int64')
+    cube['Average'] = (cube['Total'] / cube['Count']).round(2)
+    return cube
+
+def load_cube(config: dict, name: str) -> pd.DataFrame:
+    """ Load a cube, None if it does not exist. """
+    file_path = cube_path(config, name)
+    if not os.path.exists(file_path):
+        return None
+    return pd.read_csv(file_path)
+
+def save_cube(cube: pd.DataFrame, config: dict, name: str) -> None:
+    """ Write a cube (to a temporary file first, then renamed, so readers never see a partial file). """
+    file_path = cube_path(config, name)
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    cube.to_csv(file_path + '.tmp', index=False)
+    os.replace(file_path + '.tmp', file_path)
+
+def _lock(config: dict):
+    """ Lock held while the cubes are read, updated and written (one writer at a time across processes). """
+    return file_lock(os.path.join(os.path.dirname(cube_path(config, 'monthly')), 'aggregates'))
+
+def build_cubes(df: pd.DataFrame, config: dict) -> None:
+    """ (Re)build every cube from the whole dataset. """
+    with _lock(config):
+        for name in CUBES:
+            save_cube(merge([aggregate(df, name)], name), config, name)
+    logging.info(f"Aggregate tables rebuilt from {len(df)} rows")
+
+def cubes_exist(config: dict) -> bool:
+    return all(os.path.exists(cube_path(config, name)) for name in CUBES)
+
+def update_cubes(config: dict, df_added: pd.DataFrame = None, df_removed: pd.DataFrame = None) -> bool:
+    """
+    Update the cubes incrementally: add the rows of df_added and subtract the rows of df_removed
+    (e.g. a recategorized row is removed with its old category and added with the new one).
+    Only the cubes and the given rows are read, under a lock shared by every writer.
+    Returns False if the cubes do not exist yet.
+    """
+    with _lock(config):
+        if not cubes_exist(config):
+            return False
+        for name in CUBES:
+            parts = [load_cube(config, name)]
+            if df_added is not None and not df_added.empty:
+                parts.append(aggregate(df_added, name))
+            if df_removed is not None and not df_removed.empty:
+                parts.append(aggregate(df_removed, name, sign=-1))
+            save_cube(merge(parts, name), config, name)
+    return True
+
+def update_or_build_cubes(config: dict, df_new: pd.DataFrame, df_existing: pd.DataFrame) -> None:
+    """ Add new rows to the cubes, or build them from the whole dataset if they do not exist yet. """
+    if not update_cubes(config, df_added=df_new):
+        build_cubes(pd.concat([df_existing, df_new], ignore_index=True), config)
@@ -0,0 +1,363 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Per-account running balances, checkpointed per month and reconciled against the statement balances.
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from src.io_utils import file_lock
+
+# Monthly checkpoints: amounts of the month (Total) and running sum of the amounts since the first month (Net)
+CHECKPOINT_KEYS = ['Account', 'Year', 'Month']
+CHECKPOINT_COLUMNS = CHECKPOINT_KEYS + ['Count', 'Total', 'Net']
+
+# Daily totals, to place statements dated within a month (export date) between two checkpoints
+DAILY_COLUMNS = ['Account', 'Date', 'Count', 'Total']
+
+# Balances read in the preamble of the raw files
+STATEMENT_COLUMNS = ['Account', 'Date', 'Balance', 'File']
+
+# Reconciliation report (one row per statement)
+RECONCILIATION_COLUMNS = ['Account', 'Date', 'File', 'Statement', 'Computed', 'Difference', 'Opening', 'Status']
+
+
+def balances_folder(config: dict) -> str:
+    """ Folder of the checkpoints, statement balances and reconciliation report (next to the final dataset unless set in config). """
+    return config.get('balances') or os.path.join(os.path.dirname(config['output_final']), 'balances')
+
+def _path(config: dict, name: str) -> str:
+    return os.path.join(balances_folder(config), f"{name}.csv")
+
+def _save(df: pd.DataFrame, config: dict, name: str) -> None:
+    """ Write a table (to a temporary file first, then renamed, so readers never see a partial file). """
+    file_path = _path(config, name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    df.to_csv(file_path + '.tmp', index=False)
+    os.replace(file_path + '.tmp', file_path)
+
+def _cents(values) -> np.ndarray:
+    """ Amounts in integer cents, so running sums are exact whatever the number of operations (missing amounts count as 0). """
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64))
+    return np.round(values * 100).astype(np.int64)
+
+def _euros(cents) -> np.ndarray:
+    return np.asarray(cents, dtype=np.int64) / 100
+
+def _period(year, month) -> np.ndarray:
+    """ Months since year 0 (consecutive months have consecutive periods). """
+    return np.asarray(year, dtype=np.int64) * 12 + np.asarray(month, dtype=np.int64) - 1
+
+
+# Statement balances
+
+def read_statement(file_path: str, config: dict) -> dict:
+    """
+    Statement date and balance ('Date' and 'Solde' lines) of the preamble of a La Banque Postale
+    raw file, the lines skipped by load_raw_data. Returns None if the preamble has no balance.
+    """
+    date = balance = None
+    with open(file_path, encoding=config['encoding'], newline='') as file:
+        for _ in range(config['skiprows']):
+            fields = file.readline().rstrip('\r\n').split(config['separator'])
+            if len(fields) < 2:
+                continue
+            label, value = fields[0].strip().lower(), fields[1].strip()
+            if label.startswith('solde'):
+                balance = float(value.replace(' ', '').replace(',', '.'))
+            elif label == 'date':
+                date = pd.to_datetime(value, dayfirst=True, errors='coerce')
+    if balance is None or date is None or pd.isna(date):
+        return None
+    name = os.path.basename(file_path)
+    return {'Account': name[:11], 'Date': date, 'Balance': balance, 'File': name}
+
+def load_statements(config: dict) -> pd.DataFrame:
+    """ Statement balances recorded so far (empty if none). """
+    file_path = _path(config, 'statements')
+    if not os.path.exists(file_path):
+        return pd.DataFrame(columns=STATEMENT_COLUMNS)
+    return pd.read_csv(file_path, dtype={'Account': str, 'File': str}, parse_dates=['Date'])
+
+def record_statements(config: dict, raw_files: list) -> pd.DataFrame:
+    """
+    Read the statement balance of each raw file and add it to the recorded ones (a statement of the
+    same account and date replaces the previous one). Unreadable preambles are logged and skipped.
+    """
+    statements = []
+    for file_path in raw_files:
+        try:
+            statement = read_statement(file_path, config)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            logging.warning(f"Statement balance of {file_path} could not be read ({type(e).__name__}: {e})")
+            continue
+        if statement is not None:
+            statements.append(statement)
+
+    with file_lock(_path(config, 'statements')):
+        recorded = load_statements(config)
+        if not statements:
+            return recorded
+        parts = [df for df in [recorded, pd.DataFrame(statements, columns=STATEMENT_COLUMNS)] if not df.empty]
+        recorded = (
+            pd.concat(parts, ignore_index=True)
+            .drop_duplicates(['Account', 'Date'], keep='last')
+            .sort_values(['Account', 'Date'], kind='stable', ignore_index=True)
+            )
+        _save(recorded, config, 'statements')
+    return recorded
+
+
+# Monthly checkpoints
+
+def monthly_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number of operations and total amount (in cents) of each account and month of df.
+    Rows without date cannot be placed in a month and are left out, as in the aggregate tables.
+    """
+    df = df[df[['Year', 'Month']].notna().all(axis=1)]
+    totals = pd.DataFrame({
+        'Account': df['Account'].astype(str).to_numpy(),
+        'Year': df['Year'].astype('int64').to_numpy(),
+        'Month': df['Month'].astype('int64').to_numpy(),
+        'Count': 1,
+        'Total': _cents(df['Amount']),
+        })
+    return totals.groupby(CHECKPOINT_KEYS, sort=True)[['Count', 'Total']].sum().reset_index()
+
+def daily_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """ Number of operations and total amount (in cents) of each account and day of df (rows without date left out). """
+    df = df[df['Date'].notna()]
+    totals = pd.DataFrame({
+        'Account': df['Account'].astype(str).to_numpy(),
+        'Date': df['Date'].to_numpy(),
+        'Count': 1,
+        'Total': _cents(df['Amount']),
+        })
+    return totals.groupby(['Account', 'Date'], sort=True)[['Count', 'Total']].sum().reset_index()
+
+def merge_daily_totals(daily: pd.DataFrame, totals: pd.DataFrame) -> pd.DataFrame:
+    """ Add the daily totals of new operations to the recorded ones (None for none yet). """
+    parts = [df for df in [daily, totals] if df is not None and not df.empty]
+    if not parts:
+        return totals
+    return pd.concat(parts, ignore_index=True).groupby(['Account', 'Date'], sort=True)[['Count', 'Total']].sum().reset_index()
+
+def _empty_checkpoints() -> pd.DataFrame:
+    return pd.DataFrame({
+        'Account': pd.Series(dtype=str),
+        **{col: pd.Series(dtype='int64') for col in CHECKPOINT_COLUMNS[1:]},
+        })
+
+def extend_checkpoints(checkpoints: pd.DataFrame, totals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the monthly totals of new operations to the checkpoints (amounts in cents, None for no checkpoints yet).
+
+    The running sums are only recomputed from the earliest month touched by the new operations
+    of each account, starting from the checkpoint of the month before: appending a new month
+    extends the chain by one cumulative sum, and a late operation in an old month only shifts
+    the months after it.
+    """
+    if checkpoints is None:
+        checkpoints = _empty_checkpoints()
+    if totals.empty:
+        return checkpoints
+    merged = checkpoints.merge(totals, on=CHECKPOINT_KEYS, how='outer', suffixes=('', '_added'), sort=True)
+    touched = merged['Count_added'].notna()
+    for col in ['Count', 'Total']:
+        merged[col] = (merged[col].fillna(0) + merged[f'{col}_added'].fillna(0)).astype('int64')
+    merged = merged.drop(columns=['Count_added', 'Total_added'])
+
+    accounts = merged['Account']
+    tail = touched.astype('int64').groupby(accounts, sort=False).cummax().astype(bool)
+    # Running sum of the last month before the tail of each account (0 before the first month)
+    base = merged['Net'].where(~tail).groupby(accounts, sort=False).ffill().fillna(0)
+    extended = base[tail] + merged['Total'][tail].groupby(accounts[tail], sort=False).cumsum()
+    merged['Net'] = merged['Net'].where(~tail, extended).astype('int64')
+    return merged[CHECKPOINT_COLUMNS]
+
+def load_checkpoints(config: dict) -> pd.DataFrame:
+    """ Monthly checkpoints with amounts in cents, None if they do not exist. """
+    file_path = _path(config, 'checkpoints')
+    if not os.path.exists(file_path):
+        return None
+    checkpoints = pd.read_csv(file_path, dtype={'Account': str})
+    for col in ['Total', 'Net']:
+        checkpoints[col] = _cents(checkpoints[col])
+    return checkpoints
+
+def load_daily_totals(config: dict) -> pd.DataFrame:
+    """ Daily totals with amounts in cents, None if they do not exist. """
+    file_path = _path(config, 'daily')
+    if not os.path.exists(file_path):
+        return None
+    daily = pd.read_csv(file_path, dtype={'Account': str}, parse_dates=['Date'])
+    daily['Total'] = _cents(daily['Total'])
+    return daily
+
+def _save_state(checkpoints: pd.DataFrame, daily: pd.DataFrame, config: dict) -> None:
+    """ Write the checkpoints and daily totals with amounts in euros. """
+    _save(checkpoints.assign(Total=_euros(checkpoints['Total']), Net=_euros(checkpoints['Net'])), config, 'checkpoints')
+    _save(daily.assign(Total=_euros(daily['Total'])), config, 'daily')
+
+def _lock(config: dict):
+    """ Lock held while the checkpoints are read, extended and written (one writer at a time across processes). """
+    return file_lock(_path(config, 'checkpoints'))
+
+def build_checkpoints(df: pd.DataFrame, config: dict) -> None:
+    """ (Re)build the checkpoints and daily totals from the whole dataset. """
+    with _lock(config):
+        _save_state(extend_checkpoints(None, monthly_totals(df)), daily_totals(df), config)
+    logging.info(f"Balance checkpoints rebuilt from {len(df)} rows")
+
+def update_checkpoints(config: dict, df_added: pd.DataFrame) -> bool:
+    """
+    Extend the checkpoints and daily totals with new rows (only they and the new rows are read,
+    under a lock shared by every writer). Returns False if they do not exist yet.
+    """
+    with _lock(config):
+        checkpoints, daily = load_checkpoints(config), load_daily_totals(config)
+        if checkpoints is None or daily is None:
+            return False
+        if df_added is not None and not df_added.empty:
+            _save_state(
+                extend_checkpoints(checkpoints, monthly_totals(df_added)),
+                merge_daily_totals(daily, daily_totals(df_added)),
+                config
+                )
+    return True
+
+def update_or_build_checkpoints(config: dict, df_new: pd.DataFrame, df_existing: pd.DataFrame) -> None:
+    """ Extend the checkpoints with new rows, or build them from the whole dataset if they do not exist yet. """
+    if not update_checkpoints(config, df_added=df_new):
+        build_checkpoints(pd.concat([df_existing, df_new], ignore_index=True), config)
+
+
+# Balances
+
+def _net_before(accounts, periods, checkpoints: pd.DataFrame) -> np.ndarray:
+    """ Running sum (cents) at the end of the last checkpointed month strictly before each (account, period). """
+    queries = pd.DataFrame({'Account': pd.Series(np.asarray(accounts, dtype=object), dtype=str), 'Period': np.asarray(periods, dtype=np.int64)})
+    queries['position'] = np.arange(len(queries))
+    if checkpoints is None or checkpoints.empty or queries.empty:
+        return np.zeros(len(queries), dtype=np.int64)
+    points = pd.DataFrame({
+        'Account': checkpoints['Account'].astype(str),
+        'Period': _period(checkpoints['Year'], checkpoints['Month']),
+        'Net': checkpoints['Net'],
+        }).sort_values('Period', kind='stable')
+    found = pd.merge_asof(
+        queries.sort_values('Period', kind='stable'), points, on='Period', by='Account', allow_exact_matches=False
+        )
+    net = np.zeros(len(queries), dtype=np.int64)
+    net[found['position'].to_numpy()] = found['Net'].fillna(0).to_numpy(dtype=np.int64)
+    return net
+
+def _net_at_statements(statements: pd.DataFrame, checkpoints: pd.DataFrame, daily: pd.DataFrame) -> np.ndarray:
+    """
+    Running sum (cents) at the end of each statement date: checkpoint of the previous month plus the
+    daily totals of the statement month up to the statement date (statements are dated on the
+    export day, not necessarily at the end of a month).
+    """
+    periods = _period(statements['Date'].dt.year, statements['Date'].dt.month)
+    net = _net_before(statements['Account'], periods, checkpoints)
+    queries = pd.DataFrame({
+        'Account': statements['Account'].astype(str).to_numpy(),
+        'Period': periods,
+        'Statement date': statements['Date'].to_numpy(),
+        'position': np.arange(len(statements)),
+        })
+    if daily is None or daily.empty:
+        return net
+    days = pd.DataFrame({
+        'Account': daily['Account'].astype(str).to_numpy(),
+        'Period': _period(daily['Date'].dt.year, daily['Date'].dt.month),
+        'Date': daily['Date'].to_numpy(),
+        'Total': daily['Total'].to_numpy(dtype=np.int64),
+        })
+    found = days.merge(queries, on=['Account', 'Period'])
+    found = found[found['Date'] <= found['Statement date']]
+    np.add.at(net, found['position'].to_numpy(), found['Total'].to_numpy(dtype=np.int64))
+    return net
+
+def reconcile(statements: pd.DataFrame, checkpoints: pd.DataFrame, daily: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare the computed balance of each account at each statement date with the statement balance.
+
+    The opening balance of an account (before its first operation) is set by its first statement
+    ('anchor'), every later statement is 'ok' if the computed balance matches it to the cent and
+    'mismatch' otherwise (missing, duplicated or modified operations between the two statements).
+
+    Returns:
+        pd.DataFrame: one row per statement (RECONCILIATION_COLUMNS), amounts in euros.
+    """
+    if statements.empty:
+        return pd.DataFrame(columns=RECONCILIATION_COLUMNS)
+    statements = statements.sort_values(['Account', 'Date'], kind='stable', ignore_index=True)
+    net = _net_at_statements(statements, checkpoints, daily)
+    statement = _cents(statements['Balance'])
+    anchor = ~statements['Account'].duplicated().to_numpy()
+    opening = pd.Series(np.where(anchor, statement - net, 0)).groupby(statements['Account']).transform('first').to_numpy()
+    computed = opening + net
+    return pd.DataFrame({
+        'Account': statements['Account'],
+        'Date': statements['Date'],
+        'File': statements['File'],
+        'Statement': _euros(statement),
+        'Computed': _euros(computed),
+        'Difference': _euros(statement - computed),
+        'Opening': _euros(opening),
+        'Status': np.where(anchor, 'anchor', np.where(statement == computed, 'ok', 'mismatch')),
+        }, columns=RECONCILIATION_COLUMNS)
+
+def reconcile_balances(config: dict) -> pd.DataFrame:
+    """ Reconcile the recorded statements with the checkpoints, write the report and log the mismatches. """
+    report = reconcile(load_statements(config), load_checkpoints(config), load_daily_totals(config))
+    _save(report, config, 'reconciliation')
+    mismatches = report[report['Status'] == 'mismatch']
+    for row in mismatches.itertuples(index=False):
+        logging.warning(
+            f"Balance mismatch for account {row.Account} on {row.Date:%d/%m/%Y} ({row.File}): "
+            f"statement {row.Statement:.2f}, computed {row.Computed:.2f}, difference {row.Difference:.2f}"
+            )
+    logging.info(f"{len(report)} statement balance(s) reconciled, {len(mismatches)} mismatch(es)")
+    return report
+
+def opening_balances(config: dict) -> pd.Series:
+    """ Opening balance (euros) of each account with statements, from the last reconciliation report (or reconciled now if there is none). """
+    file_path = _path(config, 'reconciliation')
+    if os.path.exists(file_path):
+        report = pd.read_csv(file_path, dtype={'Account': str})
+    else:
+        report = reconcile(load_statements(config), load_checkpoints(config), load_daily_totals(config))
+    return report.groupby('Account')['Opening'].first()
+
+def running_balances(df: pd.DataFrame, config: dict) -> pd.Series:
+    """
+    Balance of the account after each operation of df (grouped cumulative sum of the amounts sorted
+    by date, operations of the same day in dataset order), in euros and aligned on df.index.
+
+    df may hold any months of the dataset: each account starts from its opening balance (see
+    reconcile) plus the checkpoint of the month before its first operation in df. Rows without
+    date have no balance.
+    """
+    balances = pd.Series(np.nan, index=df.index, name='Balance')
+    if df.empty:
+        return balances
+    dated = df[df[['Date', 'Year', 'Month']].notna().all(axis=1)]
+    if dated.empty:
+        return balances
+    checkpoints = load_checkpoints(config)
+    openings = opening_balances(config)
+
+    dated = dated.sort_values(['Account', 'Date'], kind='stable')
+    accounts = dated['Account'].astype(str).to_numpy()
+    periods = _period(dated['Year'], dated['Month'])
+    first = pd.Series(periods).groupby(accounts, sort=False).min()
+    base = _net_before(first.index, first.to_numpy(), checkpoints) + _cents(openings.reindex(first.index).to_numpy())
+    base = pd.Series(base, index=first.index)
+
+    cumulative = pd.Series(_cents(dated['Amount'])).groupby(accounts, sort=False).cumsum().to_numpy()
+    balances.loc[dated.index] = _euros(base.loc[accounts].to_numpy() + cumulative)
+    return balances
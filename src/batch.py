@@ -0,0 +1,108 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Batch runner executing the pipeline of many profiles (one config file each) on a process pool.
+
+import os
+import glob
+import time
+import logging
+import argparse
+import pandas as pd
+from src.config_loader import load_config
+from src.disk_cache import load_compiled_rules
+from src.run_pipeline import run_pipeline
+
+# Columns of the batch summary (one row per profile)
+SUMMARY_COLUMNS = ['profile', 'status', 'wall_s', 'rows_read', 'rows_added', 'rows_total', 'error', 'config']
+
+
+def profile_configs(paths: list) -> list:
+    """ Config files of the given paths: files are kept as given, folders are expanded to their *.yml/*.yaml files. """
+    configs = []
+    for path in paths:
+        if os.path.isdir(path):
+            configs += sorted(glob.glob(os.path.join(path, '*.yml')) + glob.glob(os.path.join(path, '*.yaml')))
+        else:
+            configs.append(path)
+    return configs
+
+def _stage_rows(report: dict, stage: str, default: int = 0) -> int:
+    """ Rows out of a stage of a run report (default if the stage did not run, e.g. no new raw file). """
+    for record in report['stages']:
+        if record['stage'] == stage:
+            return record['rows_out']
+    return default
+
+def run_profile(config_file: str, full_rebuild: bool = False) -> dict:
+    """ Run the pipeline of one profile and return its summary row (failures are reported, not raised). """
+    summary = {'profile': os.path.splitext(os.path.basename(config_file))[0], 'config': config_file, 'error': None}
+    start = time.perf_counter()
+    try:
+        report = run_pipeline(full_rebuild=full_rebuild, config=load_config(config_file)).to_dict()
+        summary.update({
+            'status': report['status'],
+            'rows_read': _stage_rows(report, 'load_raw'),
+            'rows_added': _stage_rows(report, 'categorize'),
+            'rows_total': _stage_rows(report, 'save', default=None),
+            })
+    except Exception as e:
+        logging.error(f"Profile {config_file} failed ({type(e).__name__}: {e})")
+        summary.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    summary['wall_s'] = round(time.perf_counter() - start, 3)
+    return summary
+
+def _warm_rules(config_files: list) -> None:
+    """
+    Compile each distinct rules file once, before the workers start: forked workers inherit the
+    compiled matchers, and other start methods find them in the disk cache.
+    """
+    for config_file in config_files:
+        try:
+            load_compiled_rules(load_config(config_file)['rules_file'])
+        except Exception as e:
+            # Reported by the profile run itself
+            logging.debug(f"Rules of profile {config_file} not preloaded ({type(e).__name__}: {e})")
+
+def run_batch(config_files: list, workers: int = None, full_rebuild: bool = False) -> pd.DataFrame:
+    """
+    Run the pipeline of every profile (config file) concurrently on a process pool.
+
+    Each worker process imports pandas and the pipeline once and runs many profiles; profiles
+    using the same rules file share its compiled matcher. Profiles run serially with workers=1
+    or if the pool cannot be started.
+
+    Returns:
+        pd.DataFrame: one row per profile (SUMMARY_COLUMNS), in the order of config_files.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(config_files))
+    _warm_rules(config_files)
+
+    results = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(run_profile, config_files, [full_rebuild] * len(config_files)))
+        except (OSError, RuntimeError) as e:
+            logging.warning(f"Process pool unavailable ({e}), running the profiles serially")
+    if results is None:
+        results = [run_profile(config_file, full_rebuild) for config_file in config_files]
+    return pd.DataFrame(results, columns=SUMMARY_COLUMNS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline of several profiles (config files) concurrently.")
+    parser.add_argument('paths', nargs='+', help="Config files, or folders of *.yml config files.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of processes (default: number of CPUs).")
+    parser.add_argument('--full-rebuild', action='store_true', help="Re-read every raw file of every profile.")
+    parser.add_argument('--summary', default=None, help="Also write the summary to this CSV file.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+
+    start = time.perf_counter()
+    summary = run_batch(profile_configs(args.paths), workers=args.workers, full_rebuild=args.full_rebuild)
+    print(summary.drop(columns=['config']).to_string(index=False))
+    print(f"{len(summary)} profile(s), {(summary['status'] != 'success').sum()} failed, {time.perf_counter() - start:.1f}s")
+    if args.summary:
+        summary.to_csv(args.summary, index=False)
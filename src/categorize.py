@@ -3,21 +3,34 @@
 # Project : Personal finance analysis
 # Content : Function to categorize operations in a DataFrame using regex-based matching.
 
+import os
+import numpy as np
 import pandas as pd
-import re
+from src.rule_engine import compile_rules
+from src.io_utils import load_json, save_json
+from src.schema import apply_compact_schema
 
-def categorize_operations(df, operation_col, category_rules=None):
+def categorize_operations(df, operation_col, category_rules=None, compiled_rules=None, dedup=True, memo=None):
     """
     Categorizes operations in a DataFrame using:
       - Regular expression matching (category_rules)
 
+    All rules are compiled once into a single matcher (see rule_engine.py) and every row
+    is categorized in one scan. When several rules match, the last one wins.
+
+    In dedup mode, the operation column is factorized and only the distinct normalized
+    strings are categorized; results are broadcast back to the rows through the integer codes.
+
     Args:
         df (pd.DataFrame): Input DataFrame containing transaction data.
         operation_col (str): Column name containing operation descriptions.
         category_rules (dict): Dictionary {category: [regex patterns]} for regex-based matching.
+        compiled_rules (CompiledRules): Already compiled rules (takes precedence over category_rules).
+        dedup (bool): Categorize each distinct normalized string only once.
+        memo (dict): Optional {normalized string: (Category, Subcategory)} memo, read and updated in dedup mode.
 
     Returns:
-        pd.DataFrame: A copy of the input DataFrame with a new 'Category' and 'Subcategory' column added.
+        pd.DataFrame: A copy of the input DataFrame with a new 'Category' and 'Subcategory' column added (compact schema).
     """
     df = df.copy()
 
@@ -25,15 +38,63 @@ def categorize_operations(df, operation_col, category_rules=None):
     df['Category'] = 'other'  # Default value
     df['Subcategory'] = 'other'  # Default value
     df['is_manual'] = False  # Default value
+    df['is_fallback'] = False  # Default value
+
+    if compiled_rules is None and category_rules:
+        compiled_rules = compile_rules(category_rules)
 
     # Regex match rules 
-    if category_rules:
-        for category, details in category_rules.items():
-            pattern = '|'.join(details['patterns'])
-            mask = df[operation_col].str.contains(pattern, case=False, na=False)
-            df.loc[mask, 'Subcategory'] = category
-            df.loc[mask, 'Category'] = details['main_category']
+    if compiled_rules is not None and compiled_rules.subcategories:
+        if dedup:
+            categories, subcategories = _categorize_unique(df[operation_col], compiled_rules, memo)
+        else:
+            rule_index = np.array(compiled_rules.match_all(df[operation_col].tolist()), dtype=np.int64)
+            categories = _labels(compiled_rules.main_categories, rule_index)
+            subcategories = _labels(compiled_rules.subcategories, rule_index)
+        df['Category'] = categories
+        df['Subcategory'] = subcategories
+
+    return apply_compact_schema(df)
+
+def _categorize_unique(operations: pd.Series, compiled_rules, memo=None) -> tuple:
+    """
+    Categorize the distinct strings only and broadcast the labels back to the rows.
+
+    Strings are not normalized (e.g. lower-cased) first: a pattern may be case-sensitive in part
+    (inline flags such as (?-i:...)), so only identical strings are sure to get the same labels.
+    """
+    codes, uniques = pd.factorize(operations)
+    uniques = list(uniques)
+    if memo is None:
+        memo = {}
+
+    # Categorize strings not already in the memo
+    missing = [value for value in uniques if value not in memo]
+    if missing:
+        rule_index = compiled_rules.match_all(missing)
+        categories = _labels(compiled_rules.main_categories, rule_index)
+        subcategories = _labels(compiled_rules.subcategories, rule_index)
+        memo.update(zip(missing, zip(categories, subcategories)))
+
+    # Last position is used for missing values (code -1)
+    unique_categories = np.array([memo[value][0] for value in uniques] + ['other'], dtype=object)
+    unique_subcategories = np.array([memo[value][1] for value in uniques] + ['other'], dtype=object)
+    return unique_categories[codes], unique_subcategories[codes]
+
+def _labels(names: list, rule_index) -> np.ndarray:
+    """ Map rule indexes to labels, -1 (no match) being mapped to 'other'. """
+    labels = np.array(list(names) + ['other'], dtype=object)
+    return labels[np.asarray(rule_index, dtype=np.int64)]
 
-    return df
+def load_category_memo(memo_file: str, rules_hash: str) -> dict:
+    """ Load the persistent categorization memo, or an empty one if it was built with other rules. """
+    if not memo_file or not os.path.exists(memo_file):
+        return {}
+    memo = load_json(memo_file)
+    if memo.get('rules_hash') != rules_hash:
+        return {}
+    return {value: tuple(labels) for value, labels in memo['entries'].items()}
 
-    
+def save_category_memo(memo: dict, memo_file: str, rules_hash: str) -> None:
+    """ Save the categorization memo along with the hash of the rules file it was built with. """
+    save_json({'rules_hash': rules_hash, 'entries': memo}, memo_file)
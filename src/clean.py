@@ -3,17 +3,25 @@
 # Project : Personal finance analysis
 # Content : Functions to clean bank data
 
+import numpy as np
 import pandas as pd
 import os
+from src.schema import apply_compact_schema
+from src.io_utils import OCCURRENCE_COLUMN
 
 def drop_empty_columns(df: pd.DataFrame) -> pd.DataFrame:
     """ Drop columns with only NaN values. """
-    na_col = df.columns[df.isna().sum() == len(df)].tolist()
-    return df.drop(columns=na_col)
+    na_col = df.columns[df.isna().all()].tolist()
+    return df.drop(columns=na_col) if na_col else df
 
 def drop_duplicates(df: pd.DataFrame) -> pd.DataFrame:
-    """ Drop duplicates operations. """
-    return df.drop_duplicates(ignore_index=True)
+    """
+    Drop operations repeated in several raw files (overlapping exports). Identical rows of one file
+    are kept: the loaders number them in OCCURRENCE_COLUMN, which is compared with the other
+    columns and then dropped.
+    """
+    df = df.drop_duplicates(ignore_index=True)
+    return df.drop(columns=OCCURRENCE_COLUMN) if OCCURRENCE_COLUMN in df.columns else df
 
 def rename_columns(df: pd.DataFrame, new_names: list) -> pd.DataFrame:
     """ Rename dataframe columns. """
@@ -29,7 +37,7 @@ def convert_amount_column(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
     Replace comma with dot in a string amount column and convert to float.
     """
-    if df[column].dtype == 'object':
+    if not pd.api.types.is_numeric_dtype(df[column]):
         df[column] = df[column].str.replace(',', '.', regex=False).astype(float)
     else:
         df[column] = df[column].astype(float)
@@ -53,13 +61,39 @@ def add_currency_column(df: pd.DataFrame, currency: str) -> pd.DataFrame:
     return df
 
 def clean_multiple_spaces(df: pd.DataFrame, column: str) -> pd.DataFrame:
-    """ Replace multiple consecutive spaces with a single space in a column. """
-    df[column] = df[column].str.replace(r'\s+', ' ', regex=True).str.strip()
+    """ Replace multiple consecutive spaces with a single space in a column (each distinct value is cleaned once). """
+    codes, uniques = pd.factorize(df[column])
+    cleaned = pd.Index(uniques).str.replace(r'\s+', ' ', regex=True).str.strip()
+    df[column] = pd.Series(cleaned.take(codes, allow_fill=True, fill_value=np.nan), index=df.index)
+    return df
+
+def parse_date_column(df: pd.DataFrame, column: str, date_format: str) -> pd.DataFrame:
+    """ Convert a string column to datetime using an exact date format (each distinct date string is parsed once). """
+    codes, uniques = pd.factorize(df[column])
+    parsed = pd.DatetimeIndex(pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce'))
+    df[column] = parsed.take(codes, allow_fill=True, fill_value=pd.NaT).to_numpy()
     return df
 
-def clean_bank_data(df_raw : pd.DataFrame, config : dict) -> pd.DataFrame:
+def clean_typed_data(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """
+    Cleaning pipeline for raw data read with a config schema (see io_utils.raw_read_options).
+
+    Columns already have their final names and amounts are already floats, so there is no
+    column dropping, renaming or string round trip; the frame is modified in place.
+    """
+    schema = config['schema']
+    df = drop_duplicates(df)
+    df = clean_multiple_spaces(df, config['details_column'])
+    df = add_currency_column(df, config['currency'])
+    df = parse_date_column(df, config['date_column'], schema['date_format'])
+    df['Debit/Credit'] = np.where(df[config['amount_column']] > 0, 'Credit', 'Debit')
+    df = add_date_parts(df, config['date_column'])
+    return apply_compact_schema(df)
+
+def clean_bank_data(df_raw : pd.DataFrame, config : dict, copy : bool = True) -> pd.DataFrame:
     """
     Perform full cleaning pipeline on raw bank statement data.
+    The raw DataFrame is copied first unless copy is False (e.g. a chunk owned by the caller).
     
     Returns a cleaned DataFrame with:
     - Drop empty columns
@@ -68,8 +102,14 @@ def clean_bank_data(df_raw : pd.DataFrame, config : dict) -> pd.DataFrame:
     - Convert date and amount fields
     - Add debit/credit classification
     - Extract month and year
+    - Apply the compact schema (categoricals, narrow integers)
+
+    If config declares a 'schema', the typed fast path clean_typed_data is used instead.
     """
-    df = df_raw.copy()
+    if config.get('schema'):
+        return clean_typed_data(df_raw.copy() if copy else df_raw, config)
+
+    df = df_raw.copy() if copy else df_raw
     df = drop_empty_columns(df)
     df = drop_duplicates(df)
     df = rename_columns(df, config['rename_columns'])
@@ -80,4 +120,4 @@ def clean_bank_data(df_raw : pd.DataFrame, config : dict) -> pd.DataFrame:
     df = add_Debit_Credit_column(df, config['amount_column'])
     df = add_date_parts(df, config['date_column'])
     
-    return df
+    return apply_compact_schema(df)
@@ -1,5 +1,71 @@
 import os
-from src.io_utils import load_yaml
+import logging
+from src.disk_cache import cached_build, content_hash
+
+# Keys every configuration must define
+REQUIRED_KEYS = [
+    'input_folder',
+    'output_final',
+    'rules_file',
+    'category_columns',
+    'merge_col',
+    'encoding',
+    'skiprows',
+    'separator',
+    'file_extensions',
+]
+
+# Expected type of the keys (required or optional) when they are set
+KEY_TYPES = {
+    'input_folder': str,
+    'output_final': str,
+    'rules_file': str,
+    'category_columns': str,
+    'merge_col': list,
+    'rename_columns': list,
+    'encoding': str,
+    'skiprows': int,
+    'separator': str,
+    'file_extensions': list,
+    'schema': dict,
+    'storage': dict,
+    'load_workers': int,
+    'chunk_size': int,
+    'editor_page_size': int,
+    'editor_sort_by': str,
+    'engine': str,
+    'fallback': dict,
+}
+
+
+class Config(dict):
+    """
+    Validated project configuration.
+
+    It is a dict, so config['key'] and config.get('key') work everywhere, checked once at
+    load time: required keys present, known keys of the expected type, and either
+    'rename_columns' or 'schema' to name the raw columns.
+    """
+    def __init__(self, values: dict, path: str = None):
+        super().__init__(values or {})
+        self.path = path
+
+    def errors(self) -> list:
+        """ List of the configuration problems (empty if the configuration is valid). """
+        errors = [f"missing key '{key}'" for key in REQUIRED_KEYS if key not in self]
+        for key, expected in KEY_TYPES.items():
+            value = self.get(key)
+            if value is not None and not isinstance(value, expected):
+                errors.append(f"'{key}' must be of type {expected.__name__}, got {type(value).__name__}")
+        if 'rename_columns' not in self and 'schema' not in self:
+            errors.append("one of 'rename_columns' or 'schema' is required")
+        return errors
+
+    def validate(self) -> 'Config':
+        errors = self.errors()
+        if errors:
+            raise ValueError(f"Invalid configuration {self.path or ''}: " + "; ".join(errors))
+        return self
 
 
 def config_path() -> str:
@@ -9,8 +75,21 @@ def config_path() -> str:
     return "config/config_example.yml"
 
 
-def load_config() -> dict:
-    """ Load project configuration. """
-    path = config_path()
-    print(path)
-    return load_yaml(path)
\ No newline at end of file
+def load_config(path: str = None) -> Config:
+    """
+    Load and validate the project configuration (from the given path, or the one returned by config_path()).
+
+    The parsed configuration is cached on disk by content hash of the YAML file, so the YAML
+    parser is only imported and run when the file changed.
+    """
+    path = path or config_path()
+    logging.debug(f"Loading configuration {path}")
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    def parse():
+        import yaml
+        return yaml.safe_load(data)
+
+    values = cached_build('config', content_hash(data), parse)
+    return Config(values, path).validate()
@@ -0,0 +1,130 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Process-wide cache of the config, rules and dataset shared by all Streamlit sessions.
+
+import os
+import threading
+import pandas as pd
+from src.config_loader import config_path, load_config
+from src.io_utils import load_json
+from src.storage import get_storage
+from src.journal import journal_path, replay_journal, row_keys
+
+# {key: (signature, value)}; a value is reloaded when the signature of its source changes
+_cache = {}
+_lock = threading.RLock()
+
+# Columns of the stable key of a row (journal entries, editor pending edits)
+ROW_KEY_COLUMNS = ['fingerprint', 'occurrence']
+
+
+def file_signature(file_path: str) -> tuple:
+    """ (path, mtime, size) of a file, empty if it does not exist. """
+    if not os.path.exists(file_path):
+        return ()
+    stat = os.stat(file_path)
+    return (file_path, stat.st_mtime_ns, stat.st_size)
+
+def cached(key, signature: tuple, loader):
+    """ Return the cached value for key if its signature did not change, otherwise (re)load it. """
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        value = loader()
+        _cache[key] = (signature, value)
+        return value
+
+def invalidate() -> None:
+    """ Drop every cached value (e.g. after the pipeline wrote new data in this process). """
+    with _lock:
+        _cache.clear()
+
+def get_config(path: str = None) -> dict:
+    """ Project configuration, shared by all sessions. """
+    path = path or config_path()
+    return cached(('config', path), file_signature(path), lambda: load_config(path))
+
+def get_rules(config: dict) -> dict:
+    """ Categorization rules, shared by all sessions. """
+    rules_file = config['rules_file']
+    return cached(('rules', rules_file), file_signature(rules_file), lambda: load_json(rules_file))
+
+def dataset_signature(config: dict) -> tuple:
+    """ Signature of the stored dataset (see Storage.signature) and of its edit journal. """
+    return get_storage(config).signature() + (file_signature(journal_path(config)),)
+
+def get_dataset(config: dict) -> pd.DataFrame:
+    """
+    Dataset as stored by the pipeline with the edit journal replayed, shared by all sessions.
+    The returned frame is a read-only base: callers must never modify it in place.
+    """
+    storage = get_storage(config)
+    return cached(('dataset', storage.path), dataset_signature(config), lambda: replay_journal(storage.load(), config))
+
+def get_keyed_dataset(config: dict) -> tuple:
+    """
+    (dataset, row index) of the same version of the dataset, shared by all sessions. The row index
+    holds the stable (fingerprint, occurrence) key of each row (see journal.row_keys): the position
+    of a row in this version is found with get_indexer (rows move when the dataset is reloaded).
+    """
+    storage = get_storage(config)
+    def build():
+        df = get_dataset(config)
+        return df, pd.MultiIndex.from_arrays(row_keys(df, config), names=ROW_KEY_COLUMNS)
+    return cached(('keyed_dataset', storage.path), dataset_signature(config), build)
+
+def get_row_index(config: dict) -> pd.MultiIndex:
+    """ Stable (fingerprint, occurrence) key of each dataset row (see get_keyed_dataset). """
+    return get_keyed_dataset(config)[1]
+
+def get_display_frame(config: dict, columns: list) -> pd.DataFrame:
+    """
+    Read-only frame displayed by the Streamlit editor: the given dataset columns, the date as a
+    string, a 'row_id' column equal to the row position in this version of the dataset (used by
+    the filter indexes) and the stable key of each row in the 'fingerprint' and 'occurrence'
+    columns (used by the pending edits, which must survive a reload of the dataset).
+    """
+    storage = get_storage(config)
+    def build():
+        df, rows = get_keyed_dataset(config)
+        frame = df.loc[:, columns].copy()
+        frame['Date'] = frame['Date'].dt.strftime('%Y-%m-%d')
+        frame['row_id'] = range(len(frame))
+        for level, name in enumerate(ROW_KEY_COLUMNS):
+            frame[name] = rows.get_level_values(level).to_numpy()
+        return frame
+    return cached(('display', storage.path, tuple(columns)), dataset_signature(config), build)
+
+def get_filter_index(config: dict, columns: list) -> 'FilterIndex':
+    """ Filter indexes of the display frame (see get_display_frame), shared by all sessions. """
+    from src.filter_index import FilterIndex
+    storage = get_storage(config)
+    def build():
+        return FilterIndex(
+            get_display_frame(config, columns),
+            bitmap_columns=[col for col in ['Account', 'Category', 'Subcategory', 'Month', 'Year'] if col in columns],
+            sorted_columns=[col for col in ['Amount', 'Date'] if col in columns],
+            )
+    return cached(('filter_index', storage.path, tuple(columns)), dataset_signature(config), build)
+
+def get_filter_options(config: dict, columns: list) -> dict:
+    """
+    Sorted distinct values offered by the editor filters (Month, Year, Account, Category, Subcategory),
+    plus the subcategories of each category, shared by all sessions.
+    """
+    storage = get_storage(config)
+    def build():
+        df = get_display_frame(config, columns)
+        options = {
+            col: sorted(df[col].dropna().unique().tolist())
+            for col in ['Month', 'Year', 'Account', 'Category', 'Subcategory'] if col in columns
+            }
+        pairs = df[['Category', 'Subcategory']].dropna().drop_duplicates()
+        options['subcategories_by_category'] = {
+            category: sorted(group['Subcategory'].unique().tolist())
+            for category, group in pairs.groupby('Category', observed=True)
+            }
+        return options
+    return cached(('filter_options', storage.path, tuple(columns)), dataset_signature(config), build)
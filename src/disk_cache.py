@@ -0,0 +1,104 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : On-disk cache of parsed configuration and compiled rules, keyed by the content hash of their source file.
+
+import os
+import sys
+import copy
+import pickle
+import hashlib
+import logging
+from functools import lru_cache
+
+# Name of the cache folder in the per-user cache directory (unless FINANCE_CACHE_DIR is set)
+CACHE_NAME = 'personal_finance'
+
+# Compiled rules already loaded by this process: {rules hash: (rules, CompiledRules)}
+_compiled_rules = {}
+
+
+def cache_dir() -> str:
+    """ Cache folder: FINANCE_CACHE_DIR, or a per-user folder ($XDG_CACHE_HOME or ~/.cache) independent of the working directory. """
+    if os.environ.get('FINANCE_CACHE_DIR'):
+        return os.environ['FINANCE_CACHE_DIR']
+    user_cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(user_cache, CACHE_NAME)
+
+def content_hash(data: bytes) -> str:
+    """ SHA-256 of a file content. """
+    return hashlib.sha256(data).hexdigest()
+
+@lru_cache(maxsize=None)
+def source_version(*module_names: str) -> str:
+    """
+    Short hash of the source files of this module and of the given (imported) modules: entries
+    pickled by another version of the code defining the cached objects are never reused.
+    """
+    digest = hashlib.sha256()
+    for name in (__name__,) + module_names:
+        with open(sys.modules[name].__file__, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:12]
+
+def _trusted(file_path: str) -> bool:
+    """ Only unpickle entries owned by the current user and not writable by other users (POSIX). """
+    if not hasattr(os, 'getuid'):
+        return True
+    status = os.stat(file_path)
+    return status.st_uid == os.getuid() and not status.st_mode & 0o022
+
+def cached_build(kind: str, key: str, builder, modules: tuple = ()):
+    """
+    Return the object cached on disk for (kind, key), or build it with builder() and cache it.
+    modules are the names of the modules defining the cached object, part of the entry version.
+
+    The cache is only an accelerator: unreadable, outdated or untrusted entries are rebuilt, and
+    failing to write an entry (read-only folder...) is not an error.
+    """
+    file_path = os.path.join(cache_dir(), f"{kind}-{source_version(*modules)}-{key}.pickle")
+    if os.path.exists(file_path) and not _trusted(file_path):
+        logging.warning(f"Ignoring cache entry {file_path} writable by other users")
+    elif os.path.exists(file_path):
+        try:
+            with open(file_path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logging.warning(f"Ignoring unreadable cache entry {file_path} ({e})")
+
+    value = builder()
+    try:
+        os.makedirs(cache_dir(), mode=0o700, exist_ok=True)
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, file_path)
+    except OSError as e:
+        logging.warning(f"Could not write cache entry {file_path} ({e})")
+    return value
+
+def load_compiled_rules(rules_file: str) -> tuple:
+    """
+    Rules of a rules file and their compiled matcher, cached on disk by content hash
+    (and in memory, so profiles sharing a rules file in one process share the matcher).
+    Each caller gets its own copy of the rules dict, the compiled matcher is read-only.
+
+    Returns:
+        tuple: (rules dict, CompiledRules, content hash of the rules file)
+    """
+    import json
+    from src.rule_engine import compile_rules
+
+    with open(rules_file, 'rb') as file:
+        data = file.read()
+    rules_hash = content_hash(data)
+
+    def build():
+        rules = json.loads(data)
+        return rules, compile_rules(rules)
+
+    if rules_hash not in _compiled_rules:
+        _compiled_rules[rules_hash] = cached_build('rules', rules_hash, build, modules=('src.rule_engine',))
+    rules, compiled_rules = _compiled_rules[rules_hash]
+    return copy.deepcopy(rules), compiled_rules, rules_hash
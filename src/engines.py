@@ -0,0 +1,50 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Dataframe engines running the batch pipeline stages (pandas reference, Arrow).
+
+import pandas as pd
+from src.fingerprint import FingerprintIndex
+from src.run_pipeline import load_raw_files, clean_data, remove_existing_rows, categorize_data, save_final_dataset
+
+# Available engines; the first one is used when the config does not set 'engine'
+ENGINES = ['pandas', 'arrow']
+
+
+class PandasEngine:
+    """
+    Reference engine: every stage is the pandas implementation of run_pipeline.
+
+    An engine implements the stages load_raw, clean, dedup, categorize and save. The frame
+    returned by load_raw is only passed to the clean stage of the same engine, so it may be
+    of any type with a length; clean returns a pandas DataFrame in the compact schema, and
+    the later stages work on pandas DataFrames. Every engine must produce the same final
+    dataset as this one (see tests/test_engines.py).
+    """
+    name = 'pandas'
+
+    def load_raw(self, config: dict, raw_files: list, row_counts: dict = None):
+        return load_raw_files(config, raw_files, row_counts)
+
+    def clean(self, df_raw, config: dict) -> pd.DataFrame:
+        return clean_data(df_raw, config, copy=False)
+
+    def dedup(self, df_clean: pd.DataFrame, df_existing: pd.DataFrame, config: dict, index: FingerprintIndex) -> pd.DataFrame:
+        return remove_existing_rows(df_clean, df_existing, config, index)
+
+    def categorize(self, df: pd.DataFrame, config: dict) -> pd.DataFrame:
+        return categorize_data(df, config)
+
+    def save(self, df_new: pd.DataFrame, df_existing: pd.DataFrame, config: dict) -> None:
+        save_final_dataset(df_new, df_existing, config)
+
+
+def get_engine(config: dict) -> PandasEngine:
+    """ Engine selected by config['engine'] ('pandas' by default, 'arrow' requires pyarrow). """
+    name = config.get('engine') or ENGINES[0]
+    if name == 'pandas':
+        return PandasEngine()
+    if name == 'arrow':
+        from src.arrow_engine import ArrowEngine
+        return ArrowEngine()
+    raise ValueError(f"Unknown engine '{name}' (expected one of {', '.join(ENGINES)})")
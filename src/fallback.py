@@ -0,0 +1,331 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Nearest-neighbour fallback categorizer (character trigrams) for the operations matched by no rule.
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from src.disk_cache import load_compiled_rules
+from src.schema import apply_compact_schema
+
+try:
+    from scipy import sparse
+except ImportError:  # scipy is optional: scores are accumulated with numpy
+    sparse = None
+
+# Default minimum cosine similarity with the nearest labelled operation
+DEFAULT_THRESHOLD = 0.5
+
+# Trigrams found in more labelled details than max(STOP_GRAM_MIN_DOCS, STOP_GRAM_FRACTION x labelled details)
+# ('cb ', 'sepa'...) are left out of the scores (they still count in the vector norms): they carry
+# little information and would pair every query with most of the labelled details
+STOP_GRAM_FRACTION = 0.01
+STOP_GRAM_MIN_DOCS = 50
+
+# Queries scored at once with scipy, and size of the (queries x labelled details) score block of the numpy scorer
+BATCH_SIZE = 5000
+SCORE_BLOCK = 1 << 22
+
+
+def model_path(config: dict) -> str:
+    """ Path of the fallback model ('model' in the 'fallback' config block, next to the final dataset by default). """
+    return (config.get('fallback') or {}).get('model') or os.path.join(
+        os.path.dirname(config['output_final']), 'fallback_model.npz'
+        )
+
+def normalize_details(details: pd.Series) -> pd.Series:
+    """ Details as compared by the model: lower case, digit runs replaced by '0' (dates, card and cheque numbers), single spaces. """
+    details = details.astype(object).fillna('').astype(str).str.lower()
+    return details.str.replace(r'\d+', '0', regex=True).str.replace(r'\s+', ' ', regex=True).str.strip()
+
+def trigrams(texts) -> tuple:
+    """
+    Character trigrams of each text (UTF-8 bytes, padded with a space on each side), computed
+    for all texts at once. A trigram is encoded as a 24-bit integer (no hashing collisions).
+
+    Returns:
+        tuple: (ptr, features, counts): the distinct trigrams of text i are features[ptr[i]:ptr[i + 1]],
+        sorted, with their number of occurrences in counts.
+    """
+    encoded = [f" {text} ".encode('utf-8') for text in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    n_grams = np.maximum(lengths - 2, 0)
+    if n_grams.sum() == 0:
+        return np.zeros(len(encoded) + 1, dtype=np.int64), np.array([], dtype=np.uint32), np.array([], dtype=np.float32)
+
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint32)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    starts = np.cumsum(lengths) - lengths
+    ends = np.cumsum(n_grams)
+    positions = np.repeat(starts - (ends - n_grams), n_grams) + np.arange(ends[-1])
+    docs = np.repeat(np.arange(len(encoded), dtype=np.int64), n_grams)
+
+    keys, counts = np.unique((docs << 24) | codes[positions], return_counts=True)
+    ptr = np.searchsorted(keys >> 24, np.arange(len(encoded) + 1))
+    return ptr.astype(np.int64), (keys & 0xFFFFFF).astype(np.uint32), counts.astype(np.float32)
+
+
+class FallbackModel:
+    """
+    Labelled operations (distinct normalized details with their category and subcategory) and
+    their trigram vectors. An operation is categorized like its nearest labelled operation
+    (cosine similarity of TF-IDF trigram vectors), if the similarity reaches the threshold.
+
+    The model is updated incrementally (only new or relabelled details are added), manual
+    categorizations take precedence over rule categorizations of the same details, and it is
+    rebuilt when the rules file changes (rule labels may have changed). Operations categorized
+    by the model itself (is_fallback) are never learnt, so its guesses do not reinforce themselves.
+    """
+    def __init__(self, rules_hash: str = None):
+        self.rules_hash = rules_hash
+        self.texts = np.array([], dtype=object)
+        self.categories = np.array([], dtype=object)
+        self.subcategories = np.array([], dtype=object)
+        self.manual = np.array([], dtype=bool)
+        self.ptr = np.zeros(1, dtype=np.int64)
+        self.features = np.array([], dtype=np.uint32)
+        self.counts = np.array([], dtype=np.float32)
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def update(self, df: pd.DataFrame, details_column: str) -> int:
+        """ Learn the labelled rows of df (categorized by a rule, or manually). Returns the number of added or relabelled details. """
+        by_rule = (df['Category'].astype(object) != 'other') & ~_flag(df, 'is_fallback')
+        labelled = by_rule | df['is_manual'].astype(bool)
+        if not labelled.any():
+            return 0
+        rows = pd.DataFrame({
+            'text': normalize_details(df.loc[labelled, details_column]).to_numpy(),
+            'category': df.loc[labelled, 'Category'].astype(object).to_numpy(),
+            'subcategory': df.loc[labelled, 'Subcategory'].astype(object).to_numpy(),
+            'manual': df.loc[labelled, 'is_manual'].astype(bool).to_numpy(),
+            })
+        # Last label of each details, manual labels winning over rule labels
+        rows = rows[rows['text'] != ''].sort_values('manual', kind='stable').drop_duplicates('text', keep='last')
+
+        known = pd.Index(self.texts).get_indexer(rows['text'])
+        existing = rows[known >= 0]
+        position = known[known >= 0]
+        relabel = (
+            ((self.categories[position] != existing['category'].to_numpy())
+             | (self.subcategories[position] != existing['subcategory'].to_numpy()))
+            & (existing['manual'].to_numpy() | ~self.manual[position])
+            )
+        position = position[relabel]
+        existing = existing[relabel]
+        self.categories[position] = existing['category'].to_numpy()
+        self.subcategories[position] = existing['subcategory'].to_numpy()
+        self.manual[position] |= existing['manual'].to_numpy()
+
+        new = rows[known < 0]
+        if len(new):
+            ptr, features, counts = trigrams(new['text'])
+            self.ptr = np.concatenate([self.ptr, self.ptr[-1] + ptr[1:]])
+            self.features = np.concatenate([self.features, features])
+            self.counts = np.concatenate([self.counts, counts])
+            self.texts = np.concatenate([self.texts, new['text'].to_numpy(dtype=object)])
+            self.categories = np.concatenate([self.categories, new['category'].to_numpy(dtype=object)])
+            self.subcategories = np.concatenate([self.subcategories, new['subcategory'].to_numpy(dtype=object)])
+            self.manual = np.concatenate([self.manual, new['manual'].to_numpy(dtype=bool)])
+            self._index = None
+        return len(new) + len(position)
+
+    def _build_index(self) -> dict:
+        """ Inverted index of the trigrams (vocabulary -> labelled details, with their normalized TF-IDF weights). """
+        n_docs = len(self.texts)
+        vocab, inverse, df = np.unique(self.features, return_inverse=True, return_counts=True)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        weights = (1 + np.log(self.counts)) * idf[inverse]
+        docs = np.repeat(np.arange(n_docs), np.diff(self.ptr))
+        norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=n_docs))
+        weights = weights / norms[docs]
+
+        order = np.argsort(inverse, kind='stable')
+        return {
+            'vocab': vocab,
+            'idf': idf,
+            'scored': df <= max(STOP_GRAM_MIN_DOCS, STOP_GRAM_FRACTION * n_docs),
+            'unknown_idf': np.log(1 + n_docs) + 1,
+            'vptr': np.concatenate([[0], np.cumsum(df)]),
+            'docs': docs[order],
+            'weights': weights[order],
+            }
+
+    def _query(self, texts) -> tuple:
+        """ Query vectors: (query of each entry, vocabulary column, normalized weight) of the known, scored trigrams. """
+        index = self._index
+        ptr, features, counts = trigrams(texts)
+        queries = np.repeat(np.arange(len(ptr) - 1), np.diff(ptr))
+        column = np.minimum(np.searchsorted(index['vocab'], features), len(index['vocab']) - 1)
+        known = index['vocab'][column] == features
+        # Unknown trigrams count in the norm (they make the query less similar to everything)
+        weights = (1 + np.log(counts)) * np.where(known, index['idf'][column], index['unknown_idf'])
+        norms = np.sqrt(np.bincount(queries, weights=weights ** 2, minlength=len(ptr) - 1))
+        weights = weights / np.maximum(norms[queries], 1e-12)
+        kept = known & index['scored'][column]
+        return queries[kept], column[kept], weights[kept]
+
+    def _nearest_numpy(self, texts) -> tuple:
+        n_docs = len(self.texts)
+        index = self._index
+        best = np.full(len(texts), -1, dtype=np.int64)
+        scores = np.zeros(len(texts))
+        batch = max(1, SCORE_BLOCK // n_docs)
+        for start in range(0, len(texts), batch):
+            queries, column, weights = self._query(texts[start:start + batch])
+            n_queries = min(batch, len(texts) - start)
+            # Every (query trigram, labelled details with this trigram) pair adds its product to the score
+            lengths = index['vptr'][column + 1] - index['vptr'][column]
+            ends = np.cumsum(lengths)
+            if len(ends) == 0 or ends[-1] == 0:
+                continue
+            postings = np.repeat(index['vptr'][column] - (ends - lengths), lengths) + np.arange(ends[-1])
+            block = np.bincount(
+                np.repeat(queries, lengths) * n_docs + index['docs'][postings],
+                weights=np.repeat(weights, lengths) * index['weights'][postings],
+                minlength=n_queries * n_docs,
+                ).reshape(n_queries, n_docs)
+            best[start:start + n_queries] = block.argmax(axis=1)
+            scores[start:start + n_queries] = block.max(axis=1)
+        return best, scores
+
+    def _nearest_sparse(self, texts) -> tuple:
+        index = self._index
+        training = sparse.csr_matrix(
+            (index['weights'], index['docs'], index['vptr']), shape=(len(index['vocab']), len(self.texts))
+            )
+        best = np.full(len(texts), -1, dtype=np.int64)
+        scores = np.zeros(len(texts))
+        for start in range(0, len(texts), BATCH_SIZE):
+            queries, column, weights = self._query(texts[start:start + BATCH_SIZE])
+            n_queries = min(BATCH_SIZE, len(texts) - start)
+            block = sparse.csr_matrix((weights, (queries, column)), shape=(n_queries, len(index['vocab']))) @ training
+            best[start:start + n_queries] = np.asarray(block.argmax(axis=1)).ravel()
+            scores[start:start + n_queries] = block.max(axis=1).toarray().ravel()
+        return best, scores
+
+    def predict(self, texts, threshold: float = DEFAULT_THRESHOLD) -> tuple:
+        """
+        Category and subcategory of each normalized details (in batches), 'other' when the nearest
+        labelled operation is less similar than threshold.
+
+        Returns:
+            tuple: (categories, subcategories, similarity with the nearest labelled operation)
+        """
+        texts = np.asarray(texts, dtype=object)
+        if len(self.texts) == 0 or len(texts) == 0:
+            other = np.full(len(texts), 'other', dtype=object)
+            return other, other.copy(), np.zeros(len(texts))
+        if self._index is None:
+            self._index = self._build_index()
+        best, scores = self._nearest_sparse(texts) if sparse is not None else self._nearest_numpy(texts)
+
+        confident = (best >= 0) & (scores >= threshold)
+        categories = np.where(confident, self.categories[best], 'other').astype(object)
+        subcategories = np.where(confident, self.subcategories[best], 'other').astype(object)
+        return categories, subcategories, scores
+
+    def save(self, file_path: str) -> None:
+        """ Save the model as a .npz file (written to a temporary file first, then renamed). """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path + '.tmp', 'wb') as file:
+            np.savez(
+                file,
+                rules_hash=np.array(self.rules_hash or ''),
+                texts=self.texts.astype(str), categories=self.categories.astype(str),
+                subcategories=self.subcategories.astype(str), manual=self.manual,
+                ptr=self.ptr, features=self.features, counts=self.counts,
+                )
+        os.replace(file_path + '.tmp', file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'FallbackModel':
+        """ Load a model saved with save(). """
+        with np.load(file_path) as data:
+            model = cls(str(data['rules_hash']) or None)
+            model.texts = data['texts'].astype(object)
+            model.categories = data['categories'].astype(object)
+            model.subcategories = data['subcategories'].astype(object)
+            model.manual = data['manual']
+            model.ptr, model.features, model.counts = data['ptr'], data['features'], data['counts']
+        return model
+
+
+def _flag(df: pd.DataFrame, column: str) -> pd.Series:
+    """ Boolean flag column of df (False for every row of datasets saved before the column existed). """
+    if column not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df[column].fillna(False).astype(bool)
+
+def load_model(config: dict, df_existing: pd.DataFrame) -> FallbackModel:
+    """
+    Load the fallback model, up to date with the manual changes of the dataset. It is built
+    from the whole dataset if it is missing or was built with another rules file.
+    """
+    _, _, rules_hash = load_compiled_rules(config['rules_file'])
+    file_path = model_path(config)
+    model = FallbackModel.load(file_path) if os.path.exists(file_path) else None
+    if model is None or model.rules_hash != rules_hash:
+        model = FallbackModel(rules_hash)
+        if not df_existing.empty:
+            model.update(df_existing, config['details_column'])
+    elif not df_existing.empty:
+        # Manual changes are few: they are always replayed (unchanged ones are skipped)
+        model.update(df_existing[df_existing['is_manual'].astype(bool)], config['details_column'])
+    return model
+
+def load_model_without_dataset(config: dict, load_dataset) -> FallbackModel:
+    """
+    Load the fallback model without reading the dataset when the persisted model was built with
+    the current rules (streaming and watch mode). Otherwise it is rebuilt from load_dataset().
+    Manual changes made since the model was saved are then learnt by the next batch run only.
+    """
+    _, _, rules_hash = load_compiled_rules(config['rules_file'])
+    file_path = model_path(config)
+    if os.path.exists(file_path):
+        model = FallbackModel.load(file_path)
+        if model.rules_hash == rules_hash:
+            return model
+    return load_model(config, load_dataset())
+
+def apply_fallback(df: pd.DataFrame, config: dict, model: FallbackModel) -> pd.DataFrame:
+    """
+    Learn the rows of df categorized by the rules, then categorize the rows left 'other' like their
+    nearest labelled operation (flagged is_fallback). The model is updated in place, not saved.
+    Rows whose similarity is below the 'threshold' of the 'fallback' config block stay 'other'.
+    """
+    settings = config.get('fallback') or {}
+    model.update(df, config['details_column'])
+
+    unmatched = (df['Category'].astype(object) == 'other') & ~df['is_manual'].astype(bool)
+    if unmatched.any():
+        # Distinct raw details, then distinct normalized details
+        codes, uniques = pd.factorize(df.loc[unmatched, config['details_column']].astype(object), use_na_sentinel=False)
+        text_codes, texts = pd.factorize(normalize_details(pd.Series(uniques, dtype=object)))
+        codes = text_codes[codes]
+        categories, subcategories, _ = model.predict(texts, settings.get('threshold', DEFAULT_THRESHOLD))
+        df = df.copy()
+        df['Category'] = df['Category'].astype(object)
+        df['Subcategory'] = df['Subcategory'].astype(object)
+        df.loc[unmatched, 'Category'] = categories[codes]
+        df.loc[unmatched, 'Subcategory'] = subcategories[codes]
+        df['is_fallback'] = _flag(df, 'is_fallback')
+        df.loc[unmatched, 'is_fallback'] = categories[codes] != 'other'
+        df = apply_compact_schema(df)
+        found = int((categories[codes] != 'other').sum())
+        logging.info(f"Fallback categorizer: {found} of {int(unmatched.sum())} unmatched operations categorized")
+    return df
+
+def categorize_fallback(df: pd.DataFrame, config: dict, df_existing: pd.DataFrame) -> pd.DataFrame:
+    """
+    Categorize the rows of df left 'other' by the rules like their nearest labelled operation
+    (learnt from df_existing and the rows of df categorized by the rules), then save the updated model.
+    """
+    model = load_model(config, df_existing)
+    df = apply_fallback(df, config, model)
+    model.save(model_path(config))
+    return df
@@ -0,0 +1,165 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Precomputed indexes used to filter the transactions displayed in the Streamlit editor.
+
+import re
+import numpy as np
+import pandas as pd
+
+# Length of the n-grams of the Details inverted index
+NGRAM = 3
+
+# Characters that make a search a regular expression (the search used to be a regex str.contains)
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+
+def parse_amount_filter(filter_str: str) -> tuple:
+    """
+    Parse an amount filter into (low, high, include_low, include_high).
+
+    Accepted formats: '>100', '<50', '10:200' (inclusive) and '150' (equality).
+    Raises ValueError if the format is invalid or if low is greater than high.
+    """
+    filter_str = filter_str.strip()
+    if filter_str.startswith('>'):
+        return float(filter_str[1:]), np.inf, False, True
+    if filter_str.startswith('<'):
+        return -np.inf, float(filter_str[1:]), True, False
+    if ':' in filter_str:
+        low, high = map(float, filter_str.split(':'))
+        if low > high:
+            raise ValueError("Invalid range: low value is greater than high value.")
+        return low, high, True, True
+    value = float(filter_str)
+    return value, value, True, True
+
+
+class FilterIndex:
+    """
+    Indexes of a (read-only) transactions frame, built once and reused by every filter change.
+
+    - Details: n-gram inverted index over the distinct lower-cased strings
+    - Amount and Date: sorted arrays, queried with binary search
+    - Low-cardinality columns (Account, Category, Subcategory, Month, Year...): packed bitmaps per value
+
+    Every query returns a packed bitmap (np.packbits) of the matching rows, so filters combine
+    with a bitwise AND.
+    """
+    def __init__(self, df: pd.DataFrame, bitmap_columns: list, sorted_columns: list, text_column: str = 'Details'):
+        self.n_rows = len(df)
+        self.all_rows = self._pack(np.ones(self.n_rows, dtype=bool))
+
+        # Bitmap indexes
+        self.bitmaps = {}
+        for col in bitmap_columns:
+            codes, uniques = pd.factorize(df[col])
+            self.bitmaps[col] = {value: self._pack(codes == code) for code, value in enumerate(uniques)}
+
+        # Sorted indexes
+        self.sorted = {}
+        for col in sorted_columns:
+            # Missing values are left out of the sorted index (never matched, sorted last)
+            present = np.flatnonzero(df[col].notna().to_numpy())
+            values = df[col].to_numpy()[present]
+            order = np.argsort(values, kind='stable')
+            self.sorted[col] = (values[order], present[order])
+        self.ranks = {}   # col -> rank of each row in the sorted order, computed on first sort
+
+        # Inverted n-gram index of the distinct lower-cased texts
+        codes, uniques = pd.factorize(df[text_column].astype(object).str.lower())
+        self.text_codes = codes
+        self.texts = [value for value in uniques]
+        postings = {}
+        for text_id, text in enumerate(self.texts):
+            for gram in {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}:
+                postings.setdefault(gram, []).append(text_id)
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    def _pack(self, mask: np.ndarray) -> np.ndarray:
+        return np.packbits(mask)
+
+    def _unpack(self, bitmap: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bitmap, count=self.n_rows).astype(bool)
+
+    def _rows_bitmap(self, positions: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        return self._pack(mask)
+
+    def isin(self, col: str, values: list) -> np.ndarray:
+        """ Rows whose value in col is one of values (union of the value bitmaps). """
+        bitmap = np.zeros_like(self.all_rows)
+        for value in values:
+            value_bitmap = self.bitmaps[col].get(value)
+            if value_bitmap is not None:
+                bitmap |= value_bitmap
+        return bitmap
+
+    def between(self, col: str, low, high, include_low: bool = True, include_high: bool = True) -> np.ndarray:
+        """ Rows whose value in col is between low and high (binary search on the sorted values). """
+        values, order = self.sorted[col]
+        start = np.searchsorted(values, low, side='left' if include_low else 'right')
+        end = np.searchsorted(values, high, side='right' if include_high else 'left')
+        return self._rows_bitmap(order[start:end])
+
+    def equals(self, col: str, value) -> np.ndarray:
+        """ Rows whose value in col equals value. """
+        return self.between(col, value, value)
+
+    def amount(self, filter_str: str, col: str = 'Amount') -> np.ndarray:
+        """ Rows matching an amount filter ('>100', '<50', '10:200', '150'). Raises ValueError if invalid. """
+        return self.between(col, *parse_amount_filter(filter_str))
+
+    def contains(self, search_text: str) -> np.ndarray:
+        """ Rows whose text contains search_text (case-insensitive). """
+        if any(c in REGEX_METACHARACTERS for c in search_text):
+            # Regex search: evaluated on the distinct texts only
+            pattern = re.compile(search_text, re.IGNORECASE)
+            matches = [i for i, text in enumerate(self.texts) if pattern.search(text)]
+        else:
+            query = search_text.lower()
+            if len(query) >= NGRAM:
+                # Candidates contain every n-gram of the query, then checked exactly
+                candidates = None
+                for gram in {query[i:i + NGRAM] for i in range(len(query) - NGRAM + 1)}:
+                    ids = self.postings.get(gram)
+                    if ids is None:
+                        return np.zeros_like(self.all_rows)
+                    candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+                matches = [i for i in candidates if query in self.texts[i]]
+            else:
+                matches = [i for i, text in enumerate(self.texts) if query in text]
+
+        hit = np.zeros(len(self.texts) + 1, dtype=bool)  # last slot for missing texts (code -1)
+        hit[np.asarray(matches, dtype=np.int64)] = True
+        return self._pack(hit[self.text_codes])
+
+    def rows(self, bitmap: np.ndarray) -> np.ndarray:
+        """ Sorted positions of the rows set in a bitmap. """
+        return np.flatnonzero(self._unpack(bitmap))
+
+    def combine(self, bitmaps: list) -> np.ndarray:
+        """ Intersection of bitmaps (all rows if the list is empty). """
+        result = self.all_rows.copy()
+        for bitmap in bitmaps:
+            result &= bitmap
+        return result
+
+    def sort_rows(self, positions: np.ndarray, col: str, descending: bool = False) -> np.ndarray:
+        """ Sort row positions by a sorted column (stable: rows with equal values keep their order, missing values last). """
+        values, order = self.sorted[col]
+        rank = self.ranks.get(col)
+        if rank is None:
+            rank = np.full(self.n_rows, len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            self.ranks[col] = rank
+        positions = np.asarray(positions, dtype=np.int64)
+        keys = rank[positions]
+        if descending:
+            keys = np.where(keys < len(order), -keys, len(order))
+        return positions[np.argsort(keys, kind='stable')]
+
+    def from_positions(self, positions: np.ndarray) -> np.ndarray:
+        """ Bitmap of the given row positions. """
+        return self._rows_bitmap(np.asarray(positions, dtype=np.int64))
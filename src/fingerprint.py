@@ -0,0 +1,137 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Row fingerprints and fingerprint index used to detect operations already in the dataset.
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+FINGERPRINT_COLUMN = 'Fingerprint'
+
+
+def _canonical_column(column: pd.Series) -> pd.Series:
+    """ Convert a column to a canonical type so the same value always gives the same hash (CSV/Parquet round trips, categoricals...). """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return pd.Series(column.to_numpy(dtype='datetime64[ns]').view('i8'))
+    if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+        return pd.Series(column.to_numpy(dtype='float64', na_value=np.nan))
+    return pd.Series(column.astype(object).where(column.notna(), None).to_numpy(dtype=object)).astype(str)
+
+def row_fingerprints(df: pd.DataFrame, columns: list) -> np.ndarray:
+    """ Return a stable 64-bit fingerprint of each row computed from the given columns (vectorized hashing). """
+    canonical = pd.DataFrame({col: _canonical_column(df[col]) for col in columns})
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy(dtype=np.uint64)
+
+def occurrence_rank(fingerprints: np.ndarray) -> np.ndarray:
+    """ Rank of each row among the rows with the same fingerprint (0 for the first occurrence, 1 for the second...). """
+    return pd.Series(fingerprints).groupby(fingerprints).cumcount().to_numpy()
+
+
+class FingerprintIndex:
+    """
+    Sorted index of the fingerprints of the dataset, with the number of rows for each of them.
+
+    Identical operations (same date, details, amount...) are legitimate (e.g. two coffees the
+    same day): a new row is only considered as existing if the dataset already holds at least
+    as many occurrences of its fingerprint.
+    """
+    def __init__(self, keys: np.ndarray = None, counts: np.ndarray = None, signature: str = None):
+        self.keys = np.asarray(keys if keys is not None else [], dtype=np.uint64)
+        self.counts = np.asarray(counts if counts is not None else [], dtype=np.int64)
+        self.signature = signature  # storage signature of the dataset the index was saved for
+
+    @classmethod
+    def from_fingerprints(cls, fingerprints: np.ndarray) -> 'FingerprintIndex':
+        keys, counts = np.unique(np.asarray(fingerprints, dtype=np.uint64), return_counts=True)
+        return cls(keys, counts)
+
+    def __len__(self) -> int:
+        """ Number of rows indexed. """
+        return int(self.counts.sum())
+
+    def count(self, fingerprints: np.ndarray) -> np.ndarray:
+        """ Number of indexed rows for each fingerprint (0 if unknown). """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        if len(self.keys) == 0:
+            return np.zeros(len(fingerprints), dtype=np.int64)
+        position = np.searchsorted(self.keys, fingerprints)
+        position = np.minimum(position, len(self.keys) - 1)
+        return np.where(self.keys[position] == fingerprints, self.counts[position], 0)
+
+    def checksum(self) -> int:
+        """ Order independent checksum of the indexed rows (equal to fingerprint_checksum of the same rows). """
+        return int(np.sum(self.keys * self.counts.astype(np.uint64), dtype=np.uint64))
+
+    def new_rows_mask(self, fingerprints: np.ndarray) -> np.ndarray:
+        """ Boolean mask of the rows not already in the index (occurrences beyond the indexed count). """
+        return occurrence_rank(fingerprints) >= self.count(fingerprints)
+
+    def add(self, fingerprints: np.ndarray) -> None:
+        """ Add rows to the index. """
+        new = FingerprintIndex.from_fingerprints(fingerprints)
+        keys = np.concatenate([self.keys, new.keys])
+        counts = np.concatenate([self.counts, new.counts])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(self.keys)).astype(np.int64)
+
+    def save(self, file_path: str, signature: tuple = None) -> None:
+        """ Save the index as a .npz file, with the storage signature of the dataset it matches. """
+        self.signature = json.dumps(signature) if signature is not None else None
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path + '.tmp', 'wb') as file:
+            np.savez(file, keys=self.keys, counts=self.counts, signature=np.array(self.signature or ''))
+        os.replace(file_path + '.tmp', file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'FingerprintIndex':
+        """ Load an index saved with save(). """
+        with np.load(file_path) as data:
+            signature = str(data['signature']) if 'signature' in data.files else ''
+            return cls(data['keys'], data['counts'], signature or None)
+
+    def is_current(self, signature: tuple) -> bool:
+        """ True if the index was saved for this storage signature of the dataset. """
+        return self.signature is not None and self.signature == json.dumps(signature)
+
+
+def fingerprint_checksum(fingerprints: np.ndarray) -> int:
+    """ Order independent checksum of a set of rows (sum of their fingerprints modulo 2**64). """
+    return int(np.sum(np.asarray(fingerprints, dtype=np.uint64), dtype=np.uint64))
+
+def add_fingerprints(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """ Add (or complete) the fingerprint column of a DataFrame (in place). """
+    if df.empty:
+        df[FINGERPRINT_COLUMN] = np.array([], dtype=np.uint64)
+        return df
+    if FINGERPRINT_COLUMN in df.columns and df[FINGERPRINT_COLUMN].notna().all():
+        df[FINGERPRINT_COLUMN] = df[FINGERPRINT_COLUMN].astype(np.uint64)
+        return df
+    df[FINGERPRINT_COLUMN] = row_fingerprints(df, columns)
+    return df
+
+def index_path(config: dict) -> str:
+    """ Path of the persisted fingerprint index (next to the final dataset unless set in config). """
+    return config.get('fingerprint_index') or os.path.join(
+        os.path.dirname(config['output_final']), 'fingerprint_index.npz'
+        )
+
+def load_fingerprint_index(config: dict, df_existing: pd.DataFrame) -> FingerprintIndex:
+    """
+    Load the persisted index, rebuilding it from the dataset if it is missing or out of date.
+
+    The index is only trusted if it holds as many rows as the dataset and the checksums of their
+    fingerprints match (a dataset edited or replaced outside the pipeline can keep the same length).
+    """
+    if df_existing.empty:
+        return FingerprintIndex()
+    fingerprints = add_fingerprints(df_existing, config['merge_col'])[FINGERPRINT_COLUMN].to_numpy()
+    file_path = index_path(config)
+    if os.path.exists(file_path):
+        index = FingerprintIndex.load(file_path)
+        if len(index) == len(fingerprints) and index.checksum() == fingerprint_checksum(fingerprints):
+            return index
+        logging.info("Fingerprint index out of date, rebuilt from the dataset")
+    return FingerprintIndex.from_fingerprints(fingerprints)
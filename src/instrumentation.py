@@ -0,0 +1,109 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Per-stage timing, memory and row count instrumentation of the pipeline, with a JSON run report.
+
+import os
+import sys
+import time
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """ Peak resident set size of the process so far (MB), None if unavailable. """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes on Linux
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+def report_folder(config: dict) -> str:
+    """ Folder of the run reports (next to the final dataset unless set in config). """
+    return config.get('run_reports') or os.path.join(os.path.dirname(config['output_final']), 'run_reports')
+
+
+class RunReport:
+    """
+    Records, for each pipeline stage: wall time, CPU time, peak RSS increase and rows in/out.
+
+    Stages are measured with a few clock reads and one getrusage call, so the instrumentation
+    is always on. With a profile folder, each stage is also run under cProfile and tracemalloc
+    (slow) and their dumps are written to the folder ({stage}.prof, {stage}.tracemalloc).
+
+    Usage:
+        with report.stage('clean', rows_in=len(df_raw)) as stage:
+            df_clean = clean_data(df_raw, config)
+            stage['rows_out'] = len(df_clean)
+    """
+    def __init__(self, name: str = 'pipeline', profile_folder: str = None):
+        self.name = name
+        self.started = datetime.now()
+        self.run_id = self.started.strftime('%Y%m%d_%H%M%S_%f')
+        self.profile_folder = profile_folder
+        self.stages = []
+        self.status = 'running'
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = None):
+        record = {'stage': name, 'rows_in': rows_in, 'rows_out': None}
+        profiler = None
+        if self.profile_folder:
+            import cProfile
+            import tracemalloc
+            os.makedirs(self.profile_folder, exist_ok=True)
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        rss_before = peak_rss_mb()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall, 4)
+            record['cpu_s'] = round(time.process_time() - cpu, 4)
+            rss_after = peak_rss_mb()
+            record['peak_rss_delta_mb'] = round(rss_after - rss_before, 1) if rss_before is not None else None
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(self.profile_folder, f"{name}.prof"))
+                snapshot = tracemalloc.take_snapshot()
+                record['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+                tracemalloc.stop()
+                snapshot.dump(os.path.join(self.profile_folder, f"{name}.tracemalloc"))
+            self.stages.append(record)
+            logging.info(
+                f"Stage {name}: {record['wall_s']:.2f}s wall, {record['cpu_s']:.2f}s CPU, "
+                f"peak RSS +{record['peak_rss_delta_mb']} MB, rows {record['rows_in']} -> {record['rows_out']}"
+                )
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'run_id': self.run_id,
+            'started': self.started.isoformat(timespec='seconds'),
+            'status': self.status,
+            'total_wall_s': round(sum(stage['wall_s'] for stage in self.stages), 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'profile_folder': self.profile_folder,
+            **self.info,
+            'stages': self.stages,
+            }
+
+    def save(self, folder: str) -> str:
+        """ Write the report as {folder}/{name}_{run_id}.json and return its path. """
+        os.makedirs(folder, exist_ok=True)
+        file_path = os.path.join(folder, f"{self.name}_{self.run_id}.json")
+        with open(file_path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        return file_path
@@ -4,12 +4,22 @@
 # Content : Function to categorize operations and define sepecific rules
 
 import json
-import yaml
 import os
+import hashlib
+from contextlib import contextmanager
 import pandas as pd
 
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+# Number of each raw row among the identical rows of its file (see clean.drop_duplicates)
+OCCURRENCE_COLUMN = '__occurrence'
+
 def load_yaml(file_path: str) -> dict:
     """Load a yaml file"""
+    import yaml  # imported on first use: only needed when the config cache misses
     with open(file_path, 'r') as file:
         return yaml.safe_load(file) 
 
@@ -18,21 +28,104 @@ def load_json(file_path: str) -> dict:
     with open(file_path, 'r') as file:
         return json.load(file)
     
+def save_json(data, file_path: str) -> None:
+    """Save a dict to a json file (written to a temporary file first, then renamed)"""
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+def file_hash(file_path: str) -> str:
+    """Return the SHA-256 hash of a file content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Dtypes used by the reader for the column types declared in the config schema
+SCHEMA_DTYPES = {
+    'date': str,
+    'string': str,
+    'float': 'float64',
+    'int': 'int64',
+}
+
+def raw_read_options(config: dict) -> dict:
+    """
+    Options passed to pd.read_csv to read a raw file.
+
+    With a 'schema' block in config, the reader directly produces typed columns: only the declared
+    columns are read (by position), under their final names, with amounts parsed using the
+    declared decimal separator. Dates are kept as strings and parsed with the exact date format
+    during cleaning.
+    """
+    options = {
+        'sep': config['separator'],
+        'skiprows': config['skiprows'],
+        'encoding': config['encoding'],
+        }
+    schema = config.get('schema')
+    if schema:
+        columns = schema['columns']
+        options.update({
+            'header': 0,
+            'names': list(columns),
+            'usecols': range(len(columns)),
+            'decimal': schema.get('decimal', '.'),
+            'dtype': {col: SCHEMA_DTYPES[col_type] for col, col_type in columns.items()},
+            })
+    return options
+
+def add_occurrence_column(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Number the identical rows of one raw file (0, 1...) in OCCURRENCE_COLUMN (in place): they are
+    distinct operations (two coffees the same day), unlike a row repeated in two overlapping files.
+    """
+    df[OCCURRENCE_COLUMN] = df.groupby(list(df.columns), dropna=False, sort=False).cumcount().to_numpy() if len(df) else 0
+    return df
+
 def load_raw_data(file_path: str, config: dict) -> pd.DataFrame:
-    """ Load CSV file with specific formatting (separator, encoding, skiprows) defined in config and add Account column. """
-    df = pd.read_csv(file_path,
-                     sep=config['separator'],
-                     skiprows=config['skiprows'],
-                     encoding=config['encoding'])
+    """
+    Load CSV file with specific formatting (separator, encoding, skiprows, schema) defined in config
+    and add the Account and occurrence columns.
+    """
+    df = pd.read_csv(file_path, **raw_read_options(config))
     # Add account column
     account = os.path.basename(file_path)[:11]
     df['Account'] = account
-    return df
+    return add_occurrence_column(df)
+
+def iter_raw_data(file_path: str, config: dict, chunksize: int):
+    """ Read a raw CSV file in chunks of chunksize rows (same formatting as load_raw_data), adding the Account and occurrence columns. """
+    account = os.path.basename(file_path)[:11]
+    with pd.read_csv(file_path, chunksize=chunksize, **raw_read_options(config)) as reader:
+        for df in reader:
+            df['Account'] = account
+            yield add_occurrence_column(df)
 
 def get_all_files(folder_path : str, extensions: list) -> list:
-    """ Return a list of file paths from a folder that match the given extensions. """
+    """ Return a sorted list of file paths from a folder that match the given extensions. """
     all_files = []
-    for file in os.listdir(folder_path):
+    for file in sorted(os.listdir(folder_path)):
         if any(file.lower().endswith(ext.lower()) for ext in extensions):
             all_files.append(os.path.join(folder_path, file))
-    return all_files
\ No newline at end of file
+    return all_files
+
+@contextmanager
+def file_lock(file_path: str):
+    """
+    Hold an exclusive advisory lock (file_path + '.lock') around a read-modify-write of file_path,
+    so concurrent writers (Streamlit sessions, pipeline, watcher) never lose each other's updates.
+    """
+    lock_path = file_path + '.lock'
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    with open(lock_path, 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
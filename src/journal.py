@@ -0,0 +1,147 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Append-only journal of the manual category changes made in the Streamlit editor.
+
+import os
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.fingerprint import FINGERPRINT_COLUMN, add_fingerprints, occurrence_rank
+from src.schema import apply_compact_schema
+from src.storage import get_storage, export_final_csv
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are serialized by the single Streamlit process only
+    fcntl = None
+
+# Fields of a journal entry (one JSON object per line)
+JOURNAL_FIELDS = ['fingerprint', 'occurrence', 'old_subcategory', 'new_subcategory', 'new_category', 'timestamp']
+
+
+def journal_path(config: dict) -> str:
+    """ Path of the edit journal (next to the final dataset unless set in config). """
+    return config.get('edit_journal') or os.path.join(
+        os.path.dirname(config['output_final']), 'edit_journal.jsonl'
+        )
+
+@contextmanager
+def _locked(file_path: str, mode: str, exclusive: bool = True):
+    """ Open the journal holding an advisory lock (exclusive for writers, shared for readers). """
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    with open(file_path, mode, encoding='utf-8') as file:
+        if fcntl is not None:
+            fcntl.flock(file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield file
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+def row_keys(df: pd.DataFrame, config: dict) -> tuple:
+    """
+    (fingerprints, occurrences) identifying each row of the dataset in the journal.
+
+    Identical operations share a fingerprint; they are told apart by their occurrence number
+    (0 for the first one in dataset order, 1 for the second...).
+    """
+    if FINGERPRINT_COLUMN in df.columns and df[FINGERPRINT_COLUMN].notna().all():
+        fingerprints = df[FINGERPRINT_COLUMN].to_numpy(dtype=np.uint64)
+    else:
+        fingerprints = add_fingerprints(df[config['merge_col']].copy(), config['merge_col'])[FINGERPRINT_COLUMN].to_numpy()
+    return fingerprints, occurrence_rank(fingerprints)
+
+def append_entries(entries: list, file_path: str) -> None:
+    """
+    Append entries to the journal in a single locked write.
+
+    Only the new entries are written, whatever the size of the dataset or of the journal, and
+    the exclusive lock keeps concurrent saves (and compaction) from interleaving.
+    """
+    if not entries:
+        return
+    timestamp = datetime.now().isoformat(timespec='seconds')
+    lines = ''.join(
+        json.dumps({**entry, 'timestamp': entry.get('timestamp', timestamp)}, ensure_ascii=False) + '\n'
+        for entry in entries
+        )
+    with _locked(file_path, 'a') as file:
+        file.write(lines)
+        file.flush()
+        os.fsync(file.fileno())
+
+def _parse(lines: list) -> pd.DataFrame:
+    entries = []
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            logging.warning(f"Skipping malformed edit journal line {number}")
+    return pd.DataFrame(entries, columns=JOURNAL_FIELDS)
+
+def read_journal(file_path: str) -> pd.DataFrame:
+    """ Journal entries in write order, empty if the journal does not exist. """
+    if not os.path.exists(file_path):
+        return pd.DataFrame(columns=JOURNAL_FIELDS)
+    with _locked(file_path, 'r', exclusive=False) as file:
+        return _parse(file.readlines())
+
+def apply_journal(df: pd.DataFrame, journal: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """
+    Replay journal entries on the dataset: the last entry of each row sets its Category and
+    Subcategory and marks it as manual. Entries of rows no longer in the dataset are ignored.
+    """
+    if df.empty or journal.empty:
+        return df
+    journal = journal.drop_duplicates(['fingerprint', 'occurrence'], keep='last')
+    fingerprints, occurrences = row_keys(df, config)
+    rows = pd.MultiIndex.from_arrays([fingerprints, occurrences])
+    keys = pd.MultiIndex.from_arrays([
+        journal['fingerprint'].astype(np.uint64).to_numpy(),
+        journal['occurrence'].astype(np.int64).to_numpy(),
+        ])
+    positions = rows.get_indexer(keys)
+    found = positions >= 0
+    if not found.any():
+        return df
+    positions = positions[found]
+
+    df = df.astype({'Category': object, 'Subcategory': object})
+    df.iloc[positions, df.columns.get_loc('Category')] = journal['new_category'].to_numpy()[found]
+    df.iloc[positions, df.columns.get_loc('Subcategory')] = journal['new_subcategory'].to_numpy()[found]
+    df.iloc[positions, df.columns.get_loc('is_manual')] = True
+    if 'is_fallback' in df.columns:
+        df.iloc[positions, df.columns.get_loc('is_fallback')] = False
+    return apply_compact_schema(df)
+
+def replay_journal(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    """ Apply the edit journal of config to a freshly loaded dataset. """
+    return apply_journal(df, read_journal(journal_path(config)), config)
+
+def compact_journal(config: dict) -> int:
+    """
+    Fold the journal into the stored dataset and empty it.
+
+    The journal stays locked for the whole compaction, so concurrent saves wait for it and
+    cannot be lost. Returns the number of entries folded.
+    """
+    file_path = journal_path(config)
+    if not os.path.exists(file_path):
+        return 0
+    with _locked(file_path, 'r+') as file:
+        journal = _parse(file.readlines())
+        if not journal.empty:
+            storage = get_storage(config)
+            df = apply_journal(storage.load(), journal, config)
+            storage.write(df)
+            export_final_csv(df, df.iloc[0:0], config)
+        file.seek(0)
+        file.truncate()
+    logging.info(f"{len(journal)} journal entries folded into the dataset")
+    return len(journal)
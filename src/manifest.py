@@ -0,0 +1,61 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Ingestion manifest used to skip raw files that were already processed.
+
+import os
+from src.io_utils import load_json, save_json, file_hash
+
+def manifest_path(config: dict) -> str:
+    """ Path of the ingestion manifest (next to the final dataset unless set in config). """
+    return config.get('manifest_file') or os.path.join(
+        os.path.dirname(config['output_final']), 'ingestion_manifest.json'
+        )
+
+def load_manifest(file_path: str) -> dict:
+    """ Load the manifest {raw file path: {size, mtime, hash, rows}}, empty if it does not exist. """
+    if not os.path.exists(file_path):
+        return {}
+    return load_json(file_path)
+
+def save_manifest(manifest: dict, file_path: str) -> None:
+    """ Save the manifest. """
+    save_json(manifest, file_path)
+
+def select_changed_files(raw_files: list, manifest: dict) -> tuple:
+    """
+    Split raw files between new/modified files and files already processed.
+
+    Size and mtime are checked first; the content hash is only computed when they differ,
+    so a file touched without being modified is still skipped.
+
+    Returns:
+        tuple: (list of files to process, {file path: manifest entry without 'rows'} for these files)
+    """
+    changed = []
+    entries = {}
+    for file_path in raw_files:
+        stat = os.stat(file_path)
+        entry = manifest.get(file_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+            continue
+
+        content_hash = file_hash(file_path)
+        if entry and entry['size'] == stat.st_size and entry['hash'] == content_hash:
+            # Same content, only the mtime changed
+            entry['mtime'] = stat.st_mtime
+            continue
+
+        changed.append(file_path)
+        entries[file_path] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'hash': content_hash,
+            }
+    return changed, entries
+
+def record_files(manifest: dict, entries: dict, row_counts: dict) -> dict:
+    """ Add processed files to the manifest with the number of rows each of them contributed. """
+    for file_path, entry in entries.items():
+        manifest[file_path] = {**entry, 'rows': int(row_counts.get(file_path, 0))}
+    return manifest
@@ -0,0 +1,159 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Incremental recategorization of the dataset when the rules file changes.
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+from src.io_utils import load_json, save_json
+from src.rule_engine import compile_rules
+from src.categorize import categorize_operations
+from src.schema import apply_compact_schema
+from src.storage import get_storage, export_final_csv
+from src.journal import replay_journal
+from src.aggregates import update_cubes
+from src import data_cache
+
+# Columns of the recategorization report
+REPORT_COLUMNS = ['old_category', 'old_subcategory', 'new_category', 'new_subcategory', 'rows']
+
+
+def rules_snapshot_path(config: dict) -> str:
+    """ Path of the snapshot of the rules the dataset is categorized with (next to the final dataset unless set in config). """
+    return config.get('rules_snapshot') or os.path.join(
+        os.path.dirname(config['output_final']), 'rules_snapshot.json'
+        )
+
+def save_rules_snapshot(rules: dict, config: dict) -> None:
+    """ Record the rules the whole dataset is now categorized with. """
+    save_json(rules, rules_snapshot_path(config))
+
+def diff_rules(old_rules: dict, new_rules: dict) -> dict:
+    """
+    Subcategories added, removed or changed between two rules files.
+
+    A rule is changed when its main category or patterns differ, or when its position relative
+    to the other rules changed (the last matching rule wins, so the order matters).
+
+    Returns:
+        dict: {'added': [...], 'removed': [...], 'changed': [...]}
+    """
+    added = [subcat for subcat in new_rules if subcat not in old_rules]
+    removed = [subcat for subcat in old_rules if subcat not in new_rules]
+    changed = [subcat for subcat in new_rules if subcat in old_rules and new_rules[subcat] != old_rules[subcat]]
+
+    old_order = [subcat for subcat in old_rules if subcat in new_rules]
+    new_order = [subcat for subcat in new_rules if subcat in old_rules]
+    moved = {subcat for subcat, old_subcat in zip(new_order, old_order) if subcat != old_subcat}
+    changed += [subcat for subcat in new_order if subcat in moved and subcat not in changed]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+def affected_rows(df: pd.DataFrame, operation_col: str, diff: dict, new_rules: dict) -> np.ndarray:
+    """
+    Boolean mask of the rows whose category may change with the new rules:
+    - rows currently in a removed or changed subcategory (they may lose it)
+    - rows matching an added or changed rule (they may gain it)
+
+    Only the distinct operation strings are matched, against the added and changed rules only.
+    """
+    mask = df['Subcategory'].isin(diff['removed'] + diff['changed']).to_numpy().copy()
+
+    gained = {subcat: new_rules[subcat] for subcat in diff['added'] + diff['changed']}
+    if gained:
+        operations = df[operation_col]
+        if isinstance(operations.dtype, pd.CategoricalDtype):
+            # Compact schema: the distinct strings are already the categories
+            codes = operations.cat.codes.to_numpy()
+            uniques = operations.cat.categories
+        else:
+            codes, uniques = pd.factorize(operations)
+        matcher = compile_rules(gained)
+        hit = np.array([index >= 0 for index in matcher.match_all(list(uniques))] + [False], dtype=bool)
+        mask |= hit[codes]
+    return mask
+
+def changes_report(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """ Number of rows for each (old category, old subcategory) -> (new category, new subcategory) change. """
+    transitions = pd.DataFrame({
+        'old_category': old['Category'].to_numpy(),
+        'old_subcategory': old['Subcategory'].to_numpy(),
+        'new_category': new['Category'].to_numpy(),
+        'new_subcategory': new['Subcategory'].to_numpy(),
+        })
+    if transitions.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = transitions.groupby(REPORT_COLUMNS[:-1], dropna=False).size().rename('rows').reset_index()
+    return report.sort_values('rows', ascending=False, ignore_index=True)
+
+def category_summary(report: pd.DataFrame) -> pd.DataFrame:
+    """ Rows leaving ('rows_out') and entering ('rows_in') each main category. """
+    rows_out = report.groupby('old_category')['rows'].sum()
+    rows_in = report.groupby('new_category')['rows'].sum()
+    return pd.DataFrame({'rows_out': rows_out, 'rows_in': rows_in}).fillna(0).astype(int)
+
+def recategorize(config: dict, dry_run: bool = False) -> pd.DataFrame:
+    """
+    Re-apply the rules file to the existing dataset, re-evaluating only the rows the rule changes
+    can affect (see diff_rules and affected_rows). Rows with is_manual=True are never modified.
+
+    The rules the dataset was last categorized with are read from the rules snapshot; without a
+    snapshot every non-manual row is re-evaluated once. The dataset is written only if some rows
+    changed, and the snapshot is updated (unless dry_run).
+
+    Returns:
+        pd.DataFrame: changes report (see changes_report).
+    """
+    new_rules = load_json(config['rules_file'])
+    snapshot_file = rules_snapshot_path(config)
+    old_rules = load_json(snapshot_file) if os.path.exists(snapshot_file) else None
+
+    storage = get_storage(config)
+    df = replay_journal(storage.load(), config)
+    if df.empty:
+        if not dry_run:
+            save_rules_snapshot(new_rules, config)
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+
+    operation_col = config['category_columns']
+    if old_rules is None:
+        logging.info("No rules snapshot: every row is re-evaluated")
+        mask = np.ones(len(df), dtype=bool)
+    else:
+        diff = diff_rules(old_rules, new_rules)
+        logging.info(
+            f"Rules diff: {len(diff['added'])} added, {len(diff['removed'])} removed, {len(diff['changed'])} changed"
+            )
+        mask = affected_rows(df, operation_col, diff, new_rules)
+    positions = np.flatnonzero(mask & ~df['is_manual'].to_numpy(dtype=bool))
+
+    # Re-evaluate the affected rows with the whole new rules
+    old = df.iloc[positions][['Category', 'Subcategory']].astype(object)
+    new = categorize_operations(df.iloc[positions][[operation_col]], operation_col, category_rules=new_rules)
+    new = new[['Category', 'Subcategory']].astype(object)
+    changed = ((old['Category'].to_numpy() != new['Category'].to_numpy())
+               | (old['Subcategory'].to_numpy() != new['Subcategory'].to_numpy()))
+    report = changes_report(old[changed], new[changed])
+    logging.info(f"{len(positions)} row(s) re-evaluated, {int(changed.sum())} changed")
+    for category, counts in category_summary(report).iterrows():
+        logging.info(f"  {category}: -{counts['rows_out']} / +{counts['rows_in']}")
+
+    if dry_run:
+        return report
+
+    if changed.any():
+        df = df.astype({'Category': object, 'Subcategory': object})
+        positions = positions[changed]
+        rows_before = df.iloc[positions].copy()
+        df.iloc[positions, df.columns.get_loc('Category')] = new['Category'].to_numpy()[changed]
+        df.iloc[positions, df.columns.get_loc('Subcategory')] = new['Subcategory'].to_numpy()[changed]
+        if 'is_fallback' in df.columns:
+            df.iloc[positions, df.columns.get_loc('is_fallback')] = False
+        df = apply_compact_schema(df)
+        storage.write(df)
+        export_final_csv(df, df.iloc[0:0], config)
+        update_cubes(config, df_added=df.iloc[positions], df_removed=rows_before)
+        data_cache.invalidate()
+    save_rules_snapshot(new_rules, config)
+    return report
@@ -0,0 +1,188 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Rule profiler and coverage analyzer (matches, time per pattern, overlaps, shadowed rules).
+
+import os
+import re
+import time
+import logging
+import numpy as np
+import pandas as pd
+from src.io_utils import load_json
+from src.rule_engine import is_literal
+from src.storage import get_storage
+
+# Columns of the reports
+RULE_COLUMNS = [
+    'rule', 'main_category', 'position', 'patterns', 'rows_matched', 'rows_won', 'rows_shadowed',
+    'distinct_matched', 'time_ms', 'slowest_pattern', 'status', 'shadowed_by',
+]
+PATTERN_COLUMNS = ['rule', 'pattern', 'kind', 'rows_matched', 'distinct_matched', 'time_ms', 'us_per_string']
+OVERLAP_COLUMNS = ['rule', 'later_rule', 'rows', 'share_of_rule', 'share_of_later_rule']
+
+# Distinct strings evaluated at once (the match matrix of a chunk has rules x CHUNK_SIZE cells)
+CHUNK_SIZE = 10_000
+
+
+def analysis_folder(config: dict) -> str:
+    """ Folder of the rule analysis reports (next to the final dataset unless set in config). """
+    return config.get('rule_analysis') or os.path.join(os.path.dirname(config['output_final']), 'rule_analysis')
+
+def _pattern_matches(pattern: str, texts: list, lowered: list) -> np.ndarray:
+    """ Boolean mask of the texts matched by one pattern (lowered: the same texts in lower case), with the semantics of the rule engine. """
+    if is_literal(pattern):
+        literal = pattern.lower()
+        return np.fromiter((literal in text for text in lowered), dtype=bool, count=len(lowered))
+    search = re.compile(pattern, re.IGNORECASE).search
+    return np.fromiter((search(text) is not None for text in texts), dtype=bool, count=len(texts))
+
+def analyze_rules(operations: pd.Series, rules: dict) -> dict:
+    """
+    Evaluate every pattern of every rule against the distinct operations (a single factorization
+    of the column, then one timed scan of the distinct strings per pattern, chunk by chunk so
+    memory does not grow with the number of distinct strings).
+
+    A rule matches an operation if any of its patterns does; the last matching rule wins, as in
+    categorize_operations. Rows are counted with the number of occurrences of each distinct string.
+
+    Returns:
+        dict: DataFrames 'rules' (RULE_COLUMNS), 'patterns' (PATTERN_COLUMNS), 'overlaps' (OVERLAP_COLUMNS)
+        and the winning rule index of each distinct string ('winner', -1 if none) with its row count ('weights').
+    """
+    codes, uniques = pd.factorize(operations)
+    weights = np.bincount(codes[codes >= 0], minlength=len(uniques)).astype(np.int64)
+    texts = [str(text) for text in uniques]
+    lowered = [text.lower() for text in texts]
+
+    names = list(rules)
+    rule_patterns = [[patterns] if isinstance(patterns, str) else list(patterns) for patterns in (rules[name]['patterns'] for name in names)]
+    # Per pattern: [rows matched, distinct strings matched, seconds]
+    pattern_stats = [[[0, 0, 0.0] for _ in patterns] for patterns in rule_patterns]
+    overlap = np.zeros((len(names), len(names)), dtype=np.int64)
+    rows_won = np.zeros(len(names), dtype=np.int64)
+    distinct_matched = np.zeros(len(names), dtype=np.int64)
+    winner = np.full(len(texts), -1, dtype=np.int64)
+
+    # Distinct strings are scanned in chunks: only the (rules x chunk) match matrix of a chunk is held in memory
+    for start in range(0, len(texts), CHUNK_SIZE):
+        chunk, chunk_lowered = texts[start:start + CHUNK_SIZE], lowered[start:start + CHUNK_SIZE]
+        chunk_weights = weights[start:start + CHUNK_SIZE]
+        matched = np.zeros((len(names), len(chunk)), dtype=bool)
+        for index, patterns in enumerate(rule_patterns):
+            if not patterns:
+                matched[index] = True  # an empty alternation matches every string
+            for stats, pattern in zip(pattern_stats[index], patterns):
+                started = time.perf_counter()
+                mask = _pattern_matches(pattern, chunk, chunk_lowered)
+                stats[2] += time.perf_counter() - started
+                stats[0] += int(chunk_weights[mask].sum())
+                stats[1] += int(mask.sum())
+                matched[index] |= mask
+
+        # Winner: last matching rule
+        any_match = matched.any(axis=0)
+        if names:
+            chunk_winner = np.where(any_match, len(names) - 1 - np.argmax(matched[::-1], axis=0), -1)
+            winner[start:start + len(chunk)] = chunk_winner
+            np.add.at(rows_won, chunk_winner[any_match], chunk_weights[any_match])
+        distinct_matched += matched.sum(axis=1)
+
+        # Rows matched by both rules of each pair, for the rules matching strings of the chunk only
+        # (float product of 0/1 matrices, exact for row counts far below 2**53)
+        active = np.flatnonzero(matched.any(axis=1))
+        weighted = matched[active].astype(np.float64)
+        overlap[np.ix_(active, active)] += np.rint((weighted * chunk_weights) @ weighted.T).astype(np.int64)
+    rows_matched = np.diag(overlap).copy()
+
+    pattern_rows = []
+    rule_time = np.zeros(len(names))
+    slowest = [None] * len(names)
+    for index, name in enumerate(names):
+        slowest_time = -1.0
+        for (rows, distinct, seconds), pattern in zip(pattern_stats[index], rule_patterns[index]):
+            rule_time[index] += seconds
+            if seconds > slowest_time:
+                slowest[index], slowest_time = pattern, seconds
+            pattern_rows.append({
+                'rule': name,
+                'pattern': pattern,
+                'kind': 'literal' if is_literal(pattern) else 'regex',
+                'rows_matched': rows,
+                'distinct_matched': distinct,
+                'time_ms': round(seconds * 1e3, 3),
+                'us_per_string': round(seconds * 1e6 / max(len(texts), 1), 3),
+                })
+
+    first, later = np.nonzero(np.triu(overlap, k=1))
+    overlaps = pd.DataFrame({
+        'rule': [names[i] for i in first],
+        'later_rule': [names[j] for j in later],
+        'rows': overlap[first, later].astype(np.int64),
+        'share_of_rule': np.round(overlap[first, later] / rows_matched[first], 4),
+        'share_of_later_rule': np.round(overlap[first, later] / rows_matched[later], 4),
+        }, columns=OVERLAP_COLUMNS)
+
+    # A rule losing rows is shadowed by the later rule it shares the most rows with
+    shadowed_by = [
+        names[i + 1 + int(np.argmax(overlap[i, i + 1:]))] if rows_won[i] < rows_matched[i] else None
+        for i in range(len(names))
+        ]
+
+    rule_rows = []
+    for index, name in enumerate(names):
+        if rows_matched[index] == 0:
+            status = 'unused'
+        elif rows_won[index] == 0:
+            status = 'shadowed'
+        elif rows_won[index] < rows_matched[index]:
+            status = 'partially shadowed'
+        else:
+            status = 'ok'
+        patterns = rules[name]['patterns']
+        rule_rows.append({
+            'rule': name,
+            'main_category': rules[name]['main_category'],
+            'position': index,
+            'patterns': 1 if isinstance(patterns, str) else len(patterns),
+            'rows_matched': int(rows_matched[index]),
+            'rows_won': int(rows_won[index]),
+            'rows_shadowed': int(rows_matched[index] - rows_won[index]),
+            'distinct_matched': int(distinct_matched[index]),
+            'time_ms': round(rule_time[index] * 1e3, 3),
+            'slowest_pattern': slowest[index],
+            'status': status,
+            'shadowed_by': shadowed_by[index],
+            })
+
+    return {
+        'rules': pd.DataFrame(rule_rows, columns=RULE_COLUMNS),
+        'patterns': pd.DataFrame(pattern_rows, columns=PATTERN_COLUMNS),
+        'overlaps': overlaps.sort_values('rows', ascending=False, kind='stable', ignore_index=True),
+        'winner': winner,
+        'weights': weights,
+        }
+
+def run_rule_analysis(config: dict) -> dict:
+    """
+    Analyze the rules file against the operations of the dataset and write the reports as CSV
+    files (rules.csv, patterns.csv, overlaps.csv) in the analysis folder.
+    """
+    df = get_storage(config).load()
+    rules = load_json(config['rules_file'])
+    operations = df[config['category_columns']] if not df.empty else pd.Series([], dtype=object)
+    report = analyze_rules(operations, rules)
+
+    folder = analysis_folder(config)
+    os.makedirs(folder, exist_ok=True)
+    for name in ['rules', 'patterns', 'overlaps']:
+        report[name].to_csv(os.path.join(folder, f"{name}.csv"), index=False)
+
+    counts = report['rules']['status'].value_counts()
+    logging.info(
+        f"{len(rules)} rules analyzed on {len(df)} rows ({len(report['weights'])} distinct operations): "
+        f"{counts.get('unused', 0)} unused, {counts.get('shadowed', 0)} shadowed, "
+        f"{counts.get('partially shadowed', 0)} partially shadowed, {len(report['overlaps'])} overlapping pairs. "
+        f"Reports written to {folder}"
+        )
+    return report
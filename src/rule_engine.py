@@ -0,0 +1,146 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Compiled rule engine used to categorize operations with a few vectorized scans.
+
+import re
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional: every rule is then searched with the re module
+    pa = pc = None
+
+# Characters that make a pattern a real regular expression rather than a plain literal
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+# Number of rules searched at once as a single alternation (larger alternations slow RE2 down)
+RULES_PER_GROUP = 32
+
+
+def is_literal(pattern: str) -> bool:
+    """ Return True if the pattern contains no regex metacharacter (plain substring search). """
+    return pattern.isascii() and not any(c in REGEX_METACHARACTERS for c in pattern)
+
+
+def _re2_compiles(pattern: str) -> bool:
+    """ Return True if pyarrow (RE2) accepts the pattern (no lookaround, backreference...). """
+    try:
+        pc.match_substring_regex(pa.array([''], type=pa.string()), pattern, ignore_case=True)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return False
+    return True
+
+def _search(matcher, texts: np.ndarray, arrow_texts) -> np.ndarray:
+    """ Boolean mask of the texts in which the matcher (RE2 pattern, or compiled re pattern) is found. """
+    if isinstance(matcher, re.Pattern):
+        search = matcher.search
+        return np.fromiter((search(text) is not None for text in texts), dtype=bool, count=len(texts))
+    return pc.match_substring_regex(arrow_texts, matcher, ignore_case=True).to_numpy(zero_copy_only=False)
+
+
+class CompiledRules:
+    """
+    Categorization rules compiled once into a few vectorized matchers.
+
+    The rules are split, from the last one to the first, into groups of RULES_PER_GROUP rules
+    whose patterns are searched as one alternation (pyarrow RE2 kernel, like str.contains on
+    the pandas string dtype). A group scan discards in one pass the strings matched by none of
+    its rules. The winner of the strings a group matches is then looked for among its rules
+    only, from the last one. Matched strings are resolved, so the following groups only scan
+    the strings left.
+
+    Rules RE2 cannot compile (lookarounds, backreferences...), and every rule without pyarrow,
+    are searched with the re module, one rule at a time.
+
+    Like the original loop over the rules, the last matching rule wins. Like
+    str.contains(case=False, na=False), matching is case-insensitive and missing values match no rule.
+    """
+    def __init__(self, category_rules: dict):
+        category_rules = category_rules or {}
+        self.subcategories = list(category_rules.keys())
+        self.main_categories = [details['main_category'] for details in category_rules.values()]
+
+        # Pattern of each rule (an empty alternation matches every string, like str.contains(''))
+        patterns = []
+        for details in category_rules.values():
+            rule_patterns = details['patterns']
+            patterns.append(rule_patterns if isinstance(rule_patterns, str) else '|'.join(rule_patterns))
+        self.groups = self._compile_groups(patterns)
+
+    @staticmethod
+    def _compile_groups(patterns: list) -> list:
+        """
+        Groups of rules, from the last rule to the first: [(alternation, [(rule index, matcher)])],
+        a matcher being an RE2 pattern or a compiled re pattern (the alternation of a group of one rule is its matcher).
+        """
+        matchers = []
+        for index in reversed(range(len(patterns))):
+            pattern = patterns[index]
+            if pc is not None and _re2_compiles(pattern):
+                matchers.append((index, pattern))
+            else:
+                matchers.append((index, re.compile(pattern, re.IGNORECASE)))
+
+        groups = []
+        batch = []
+        for index, matcher in matchers + [(None, None)]:
+            if isinstance(matcher, str) and len(batch) < RULES_PER_GROUP:
+                batch.append((index, matcher))
+                continue
+            if batch:
+                alternation = '|'.join(f'(?:{pattern})' for _, pattern in batch)
+                if len(batch) > 1 and _re2_compiles(alternation):
+                    groups.append((alternation, batch))
+                else:
+                    # A single rule, or rules that cannot share an alternation (same group name...)
+                    groups.extend((pattern, [(rule, pattern)]) for rule, pattern in batch)
+            batch = [(index, matcher)] if isinstance(matcher, str) else []
+            if isinstance(matcher, re.Pattern):
+                groups.append((matcher, [(index, matcher)]))
+        return groups
+
+    def match(self, text) -> int:
+        """ Return the index of the last rule matching the text, or -1 if no rule matches. """
+        return int(self.match_all([text])[0])
+
+    def match_all(self, values) -> list:
+        """ Return the index of the winning rule for each value (-1 if no rule matches). """
+        texts = np.empty(len(values), dtype=object)
+        texts[:] = list(values)
+        result = np.full(len(texts), -1, dtype=np.int64)
+
+        # Strings not resolved yet (positions in texts), and the same strings as an Arrow array
+        pending = np.flatnonzero(np.fromiter((isinstance(text, str) for text in texts), dtype=bool, count=len(texts)))
+        arrow_pending = pa.array(texts[pending].tolist(), type=pa.string()) if pc is not None else None
+
+        for alternation, rules in self.groups:
+            if len(pending) == 0:
+                break
+            hit = _search(alternation, texts[pending], arrow_pending)
+            if not hit.any():
+                continue
+            found = pending[hit]
+            if len(rules) == 1:
+                result[found] = rules[0][0]
+            else:
+                # Every string found matches one of the rules of the group: the last one wins
+                left = np.arange(len(found))
+                arrow_found = arrow_pending.filter(hit) if arrow_pending is not None else None
+                for index, matcher in rules:
+                    arrow_left = arrow_found.take(left) if arrow_found is not None else None
+                    matched = _search(matcher, texts[found[left]], arrow_left)
+                    result[found[left[matched]]] = index
+                    left = left[~matched]
+                    if len(left) == 0:
+                        break
+            pending = pending[~hit]
+            if arrow_pending is not None:
+                arrow_pending = arrow_pending.filter(~hit)
+        return result.tolist()
+
+
+def compile_rules(category_rules: dict) -> CompiledRules:
+    """ Compile categorization rules ({subcategory: {main_category, patterns}}) into a single matcher. """
+    return CompiledRules(category_rules)
@@ -1,46 +1,100 @@
 import os
+import argparse
 import pandas as pd
 import logging
 from src.io_utils import load_json, get_all_files, load_raw_data
+from src.disk_cache import load_compiled_rules
 from src.config_loader import load_config
 from src.clean import clean_bank_data
-from src.categorize import categorize_operations
+from src.categorize import categorize_operations, load_category_memo, save_category_memo
+from src.storage import get_storage, export_final_csv
+from src.schema import memory_summary
+from src import data_cache
+from src.fingerprint import FingerprintIndex, FINGERPRINT_COLUMN, add_fingerprints, load_fingerprint_index, index_path
+from src.journal import replay_journal, compact_journal
+from src.recategorize import save_rules_snapshot
+from src.aggregates import update_or_build_cubes, build_cubes
+from src.balances import update_or_build_checkpoints, record_statements, reconcile_balances
+from src.instrumentation import RunReport, report_folder
+from src.manifest import manifest_path, load_manifest, save_manifest, select_changed_files, record_files
 
 # Load existing database (if exists)
 def load_existing_dataset(config: dict) -> pd.DataFrame:
-    """ Load existing dataset if it exists, otherwise return an empty DataFrame. """
-    if os.path.exists(config['output_final']):
-        df = pd.read_csv(config['output_final'])
-        df ['Date'] = pd.to_datetime(df ['Date'], errors='coerce')
-        return df
-    else:
-        return pd.DataFrame()
+    """
+    Load existing dataset from the storage backend if it exists, otherwise return an empty DataFrame.
+    Manual changes recorded in the edit journal are replayed on the loaded rows.
+    """
+    return replay_journal(get_storage(config).load(), config)
 
 # Load raw files
-def load_raw_files(config: dict) -> pd.DataFrame:
-    """ Load and concatenate all raw files from the input folder. """
-    raw_files = get_all_files(config['input_folder'], config['file_extensions'])
-    df = pd.concat([load_raw_data(f, config) for f in raw_files], ignore_index=True)
+def _load_raw_file(file_path: str, config: dict) -> tuple:
+    """ Load one raw file, returning (dataframe, None) or (None, error message) so errors can be reported per file. """
+    try:
+        return load_raw_data(file_path, config), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _load_raw_files_parallel(raw_files: list, config: dict, workers: int) -> list:
+    """ Load raw files on a process pool. Results are returned in the same order as raw_files. """
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(raw_files))) as executor:
+        return list(executor.map(_load_raw_file, raw_files, [config] * len(raw_files)))
+
+def load_raw_files(config: dict, raw_files: list = None, row_counts: dict = None) -> pd.DataFrame:
+    """
+    Load and concatenate all raw files from the input folder (or the given raw_files).
+
+    Files are parsed on a process pool when 'load_workers' (config) is greater than 1,
+    serially otherwise or if the pool cannot be started. The output order is always the
+    order of the files, and every file that fails to load is reported.
+    If row_counts is given, it is filled with the number of rows read from each file.
+    """
+    if raw_files is None:
+        raw_files = get_all_files(config['input_folder'], config['file_extensions'])
+    workers = config.get('load_workers') or 1
+
+    results = None
+    if workers > 1 and len(raw_files) > 1:
+        try:
+            results = _load_raw_files_parallel(raw_files, config, workers)
+        except (OSError, RuntimeError) as e:
+            logging.warning(f"Parallel loading unavailable ({e}), falling back to serial mode")
+    if results is None:
+        results = [_load_raw_file(f, config) for f in raw_files]
+
+    errors = [(f, error) for f, (_, error) in zip(raw_files, results) if error is not None]
+    for f, error in errors:
+        logging.error(f"Failed to load raw file {f}: {error}")
+    if errors:
+        raise ValueError(f"{len(errors)} raw file(s) could not be loaded: {', '.join(f for f, _ in errors)}")
+
+    if row_counts is not None:
+        row_counts.update({f: len(df_file) for f, (df_file, _) in zip(raw_files, results)})
+
+    if not results:
+        return pd.DataFrame()
+    df = pd.concat([df_file for df_file, _ in results], ignore_index=True)
     return df
 
 # Clean raw data
-def clean_data(df: pd.DataFrame, config: dict) -> pd.DataFrame:
-    """ Clean raw data using the cleaning pipeline defined in clean.py. """
-    return clean_bank_data(df, config)
+def clean_data(df: pd.DataFrame, config: dict, copy: bool = True) -> pd.DataFrame:
+    """ Clean raw data using the cleaning pipeline defined in clean.py (copy=False lets it modify df). """
+    return clean_bank_data(df, config, copy=copy)
 
 
 # Remove existing rows
-def remove_existing_rows(df_clean: pd.DataFrame, df_existing: pd.DataFrame, config: dict) -> pd.DataFrame:
-    """ Remove rows from the cleaned DataFrame that already exist in the existing dataset. """
-    if df_existing.empty:
-        return df_clean
-    df_merged = df_clean.merge(
-            df_existing,
-            on=config['merge_col'], 
-            how='left', 
-            indicator=True
-            )
-    return df_merged[df_merged['_merge']=='left_only'].drop(columns=['_merge'])
+def remove_existing_rows(df_clean: pd.DataFrame, df_existing: pd.DataFrame, config: dict, index: FingerprintIndex = None) -> pd.DataFrame:
+    """
+    Remove rows from the cleaned DataFrame that already exist in the existing dataset.
+
+    Rows are compared through their fingerprint (hash of the merge_col columns), stored in the
+    'Fingerprint' column. A fingerprint seen n times in the dataset removes its first n occurrences only.
+    """
+    df_clean = add_fingerprints(df_clean.copy(), config['merge_col'])
+    if index is None:
+        index = load_fingerprint_index(config, df_existing)
+    mask = index.new_rows_mask(df_clean[FINGERPRINT_COLUMN].to_numpy())
+    return df_clean[mask].reset_index(drop=True)
 
 # Categorize data
 def categorize_data(df: pd.DataFrame, config: dict) -> pd.DataFrame:
@@ -48,37 +102,56 @@ def categorize_data(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     if df.empty:
         return df
     
-    rules = load_json(config['rules_file'])
+    # Compiled rules are cached on disk by content hash of the rules file
+    _, compiled_rules, rules_hash = load_compiled_rules(config['rules_file'])
+
+    # Persistent memo of already categorized strings, only valid for the same rules file
+    memo_file = config.get('category_memo')
+    memo = load_category_memo(memo_file, rules_hash) if memo_file else {}
+    memo_size = len(memo)
 
-    return categorize_operations(
+    df_cat = categorize_operations(
         df, 
         config['category_columns'], 
-        category_rules=rules
+        compiled_rules=compiled_rules,
+        memo=memo
         )
 
+    if memo_file and len(memo) > memo_size:
+        save_category_memo(memo, memo_file, rules_hash)
+
+    return df_cat
+
 def save_final_dataset(df_new: pd.DataFrame, df_existing: pd.DataFrame, config: dict) -> None:
-    """ Merge new and existing data and save result."""
-    # Combine old and new data
-    df = pd.concat(
-        [df_existing, df_new], 
-        ignore_index=True
-        )
-    # Sort by date
-    df.sort_values(
-        'Date', 
-        inplace=True
-        )
-    # Save to CSV
-    df.to_csv(
-        config['output_final'], 
-        sep=',', 
-        index=False
-        )
+    """
+    Add new rows to the dataset through the storage backend (CSV: full rewrite, Parquet: new partitions only)
+    and to the monthly/yearly aggregate tables (see aggregates.py) and balance checkpoints (see balances.py).
+    """
+    get_storage(config).append(df_new, df_existing)
+    update_or_build_cubes(config, df_new, df_existing)
+    update_or_build_checkpoints(config, df_new, df_existing)
+
+    # Optional CSV export of the full dataset
+    export_final_csv(df_new, df_existing, config)
+    data_cache.invalidate()
     logging.info(f"{len(df_new)} new operations added")
 
 
-def run_pipeline():
-    """ Main function to run the data processing pipeline. """
+def run_pipeline(full_rebuild: bool = False, config: dict = None, profile: bool = False):
+    """
+    Main function to run the data processing pipeline.
+
+    Raw files already recorded in the ingestion manifest (same size/mtime or same content hash)
+    are skipped, unless full_rebuild is True.
+
+    Each stage (load_existing, load_raw, clean, dedup, categorize, save) is measured (wall time,
+    CPU time, peak RSS increase, rows in/out) and a JSON run report is written to the
+    'run_reports' folder. With profile=True, every stage is also profiled with cProfile and
+    tracemalloc, and the dumps are written next to the report.
+
+    Returns:
+        RunReport: the report of the run (also saved as JSON).
+    """
     # Setup logging
     logging.basicConfig(
         level=logging.INFO, 
@@ -87,24 +160,190 @@ def run_pipeline():
 
     logging.info("Pipeline started")
 
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     if not config:
         raise ValueError("Configuration is empty. Check your YAML file!")
 
-    df_existing = load_existing_dataset(config)
-    df_raw = load_raw_files(config)
-    df_clean = clean_data(df_raw, config)
-    df_new = remove_existing_rows(df_clean, df_existing, config)
+    report = RunReport('pipeline')
+    if profile:
+        report.profile_folder = os.path.join(report_folder(config), f"profile_{report.run_id}")
+    try:
+        _run_stages(config, full_rebuild, report)
+        report.status = 'success'
+    except Exception as e:
+        report.status = 'failed'
+        report.info['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        logging.info(f"Run report saved to {report.save(report_folder(config))}")
+    return report
+
+def _run_stages(config: dict, full_rebuild: bool, report: RunReport) -> None:
+    """ Pipeline stages of run_pipeline, each one measured in report and run by the engine selected in config. """
+    from src.engines import get_engine
+    engine = get_engine(config)
+    report.info['engine'] = engine.name
+
+    # Select raw files not already ingested
+    manifest_file = manifest_path(config)
+    manifest = {} if full_rebuild else load_manifest(manifest_file)
+    raw_files = get_all_files(config['input_folder'], config['file_extensions'])
+    changed_files, entries = select_changed_files(raw_files, manifest)
+    logging.info(f"{len(changed_files)} new or modified raw file(s), {len(raw_files) - len(changed_files)} skipped")
+    report.info.update({'raw_files': len(raw_files), 'changed_files': len(changed_files)})
+
+    if not changed_files:
+        save_manifest(manifest, manifest_file)
+        logging.info("No new operations to add.")
+        return
+
+    row_counts = {}
+    with report.stage('load_existing') as stage:
+        df_existing = load_existing_dataset(config)
+        index = load_fingerprint_index(config, df_existing)
+        stage['rows_out'] = len(df_existing)
+    logging.info(f"Existing dataset: {memory_summary(df_existing)}")
+
+    with report.stage('load_raw') as stage:
+        df_raw = engine.load_raw(config, changed_files, row_counts)
+        record_statements(config, changed_files)
+        stage['rows_out'] = len(df_raw)
+
+    with report.stage('clean', rows_in=len(df_raw)) as stage:
+        df_clean = engine.clean(df_raw, config)
+        stage['rows_out'] = len(df_clean)
+
+    with report.stage('dedup', rows_in=len(df_clean)) as stage:
+        df_new = engine.dedup(df_clean, df_existing, config, index)
+        stage['rows_out'] = len(df_new)
 
     if df_new.empty:
+        save_manifest(record_files(manifest, entries, row_counts), manifest_file)
         logging.info("No new operations to add.")
         return
 
-    df_new_cat = categorize_data(df_new, config)
-    save_final_dataset(df_existing, df_new_cat, config)
+    with report.stage('categorize', rows_in=len(df_new)) as stage:
+        df_new_cat = engine.categorize(df_new, config)
+        if config.get('fallback'):
+            from src.fallback import categorize_fallback
+            df_new_cat = categorize_fallback(df_new_cat, config, df_existing)
+        stage['rows_out'] = len(df_new_cat)
+
+    with report.stage('save', rows_in=len(df_new_cat)) as stage:
+        engine.save(df_new_cat, df_existing, config)
+        if df_existing.empty:
+            # The whole dataset is categorized with the current rules (reference of the recategorize command)
+            save_rules_snapshot(load_json(config['rules_file']), config)
+        index.add(df_new_cat[FINGERPRINT_COLUMN].to_numpy())
+        index.save(index_path(config), get_storage(config).signature())
+        save_manifest(record_files(manifest, entries, row_counts), manifest_file)
+        reconciliation = reconcile_balances(config)
+        report.info['balance_mismatches'] = int((reconciliation['Status'] == 'mismatch').sum())
+        stage['rows_out'] = len(df_existing) + len(df_new_cat)
 
     logging.info("Pipeline finished successfully")
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the bank data processing pipeline.")
+    parser.add_argument(
+        '--full-rebuild',
+        action='store_true',
+        help="Re-read every raw file, ignoring the ingestion manifest."
+        )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help="Bounded-memory mode: read raw files in chunks and append each chunk to the dataset."
+        )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=None,
+        help="Number of rows per chunk in streaming mode (default: 'chunk_size' in config)."
+        )
+    parser.add_argument(
+        '--compact-journal',
+        action='store_true',
+        help="Fold the edit journal of manual changes into the dataset and empty it."
+        )
+    parser.add_argument(
+        '--recategorize',
+        action='store_true',
+        help="Re-apply the rules file to the existing dataset (only the rows affected by the rule changes, manual changes are kept)."
+        )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help="With --recategorize: report the changes without writing the dataset."
+        )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help="Keep running and ingest new or modified raw files as they arrive in the input folder."
+        )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=None,
+        help="With --watch: seconds without new arrivals before a batch is processed (default: 2)."
+        )
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help="With --watch: scan the folder periodically instead of using inotify."
+        )
+    parser.add_argument(
+        '--rebuild-aggregates',
+        action='store_true',
+        help="Rebuild the monthly and yearly aggregate tables from the whole dataset."
+        )
+    parser.add_argument(
+        '--analyze-rules',
+        action='store_true',
+        help="Profile the rules on the dataset: matches and time per rule and pattern, overlapping and shadowed rules (CSV reports)."
+        )
+    parser.add_argument(
+        '--balances',
+        action='store_true',
+        help="Rebuild the balance checkpoints, reconcile them with the statement balances and print the current balance of each account."
+        )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Profile every stage with cProfile and tracemalloc (dumps written next to the run report)."
+        )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.watch:
+        from src.watch import watch, DEFAULT_DEBOUNCE
+        watch(load_config(), debounce=args.debounce or DEFAULT_DEBOUNCE, use_inotify=not args.poll)
+    elif args.recategorize:
+        from src.recategorize import recategorize
+        report = recategorize(load_config(), dry_run=args.dry_run)
+        print(report.to_string(index=False) if not report.empty else "No category changes.")
+    elif args.analyze_rules:
+        from src.rule_analysis import run_rule_analysis
+        report = run_rule_analysis(load_config())
+        print(report['rules'].sort_values('time_ms', ascending=False).to_string(index=False))
+    elif args.balances:
+        from src.balances import build_checkpoints, record_statements, running_balances
+        config = load_config()
+        df = load_existing_dataset(config)
+        build_checkpoints(df, config)
+        record_statements(config, get_all_files(config['input_folder'], config['file_extensions']))
+        reconciliation = reconcile_balances(config)
+        print(reconciliation.to_string(index=False))
+        current = df.assign(Balance=running_balances(df, config)).dropna(subset=['Balance'])
+        print(current.sort_values('Date', kind='stable').groupby('Account', observed=True)[['Date', 'Balance']].last().to_string())
+    elif args.rebuild_aggregates:
+        config = load_config()
+        build_cubes(load_existing_dataset(config), config)
+    elif args.compact_journal:
+        compact_journal(load_config())
+    elif args.stream:
+        from src.streaming import run_streaming_pipeline
+        run_streaming_pipeline(load_config(), full_rebuild=args.full_rebuild, chunksize=args.chunk_size)
+    else:
+        run_pipeline(full_rebuild=args.full_rebuild, profile=args.profile)
\ No newline at end of file
@@ -0,0 +1,63 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Canonical compact schema of the transaction table and memory footprint report.
+
+import pandas as pd
+
+# Canonical dtypes of the transaction table: categoricals for the low-cardinality columns and
+# dictionary-encoded Details, narrow integers for Month and Year
+DATASET_DTYPES = {
+    'Date': 'datetime64[ns]',
+    'Details': 'category',
+    'Amount': 'float64',
+    'Account': 'category',
+    'Currency': 'category',
+    'Debit/Credit': 'category',
+    'Month': 'int8',
+    'Year': 'int16',
+    'Category': 'category',
+    'Subcategory': 'category',
+    'is_manual': 'bool',
+    'is_fallback': 'bool',
+    'Fingerprint': 'uint64',
+}
+
+# Nullable equivalents, used when an integer column has missing values (unparsed dates)
+NULLABLE_DTYPES = {
+    'int8': 'Int8',
+    'int16': 'Int16',
+    'uint64': 'UInt64',
+}
+
+
+def apply_compact_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """ Cast the transaction table columns to the canonical compact dtypes (columns absent from the frame are ignored). """
+    dtypes = {}
+    for col, dtype in DATASET_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype in NULLABLE_DTYPES and df[col].isna().any():
+            dtype = NULLABLE_DTYPES[dtype]
+        dtypes[col] = dtype
+
+    if 'Date' in dtypes and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    for col in ('is_manual', 'is_fallback'):
+        if col in dtypes and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].map({True: True, False: False, 'True': True, 'False': False}).fillna(False)
+    return df.astype(dtypes)
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """ Memory footprint of each column (dtype, bytes), with a 'Total' row. """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'dtype': [str(df[col].dtype) for col in usage.index],
+        'bytes': usage.to_numpy(),
+        }, index=usage.index)
+    report.loc['Total'] = ['', int(usage.sum())]
+    return report
+
+def memory_summary(df: pd.DataFrame) -> str:
+    """ One-line summary of the memory footprint of a DataFrame (for logs). """
+    return f"{len(df)} rows, {df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory"
@@ -0,0 +1,176 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Storage backends (CSV, partitioned Parquet) for the final dataset.
+
+import os
+import glob
+import uuid
+import logging
+import pandas as pd
+from src.schema import apply_compact_schema
+from src.io_utils import load_json, save_json
+
+# Columns used to partition the Parquet dataset
+PARTITION_COLUMNS = ['Year', 'Month']
+# List of the live partition files of a Parquet dataset (relative to its folder)
+MANIFEST_NAME = '_manifest.json'
+
+
+def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    """ Sort the dataset by date (stable, so rows of the same day keep their order). """
+    return df.sort_values('Date', kind='stable', ignore_index=True)
+
+def export_csv(df: pd.DataFrame, file_path: str) -> None:
+    """ Export the dataset as a CSV file. """
+    df.to_csv(
+        file_path,
+        sep=',',
+        index=False
+        )
+
+
+class CsvStorage:
+    """ Whole dataset stored in a single CSV file (rewritten on every save). """
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def signature(self) -> tuple:
+        """ Identifies the stored version of the dataset (changes whenever the file is written). """
+        if not self.exists():
+            return ()
+        stat = os.stat(self.path)
+        return (self.path, stat.st_mtime_ns, stat.st_size)
+
+    def load(self) -> pd.DataFrame:
+        """ Load the dataset, or an empty DataFrame if it does not exist. """
+        if not self.exists():
+            return pd.DataFrame()
+        df = pd.read_csv(self.path)
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        return apply_compact_schema(df)
+
+    def append(self, df_new: pd.DataFrame, df_existing: pd.DataFrame) -> None:
+        """ Add new rows: the CSV file is rewritten with the existing and new rows sorted by date. """
+        self.write(pd.concat([df_existing, df_new], ignore_index=True))
+
+    def write(self, df: pd.DataFrame) -> None:
+        """ Replace the whole dataset. """
+        export_csv(sort_by_date(df), self.path)
+
+    def append_rows(self, df_new: pd.DataFrame) -> None:
+        """
+        Append rows at the end of the CSV file without reading it (streaming mode).
+        Rows are not sorted by date; the file is fully rewritten only if its columns differ.
+        """
+        if not self.exists():
+            export_csv(df_new, self.path)
+            return
+        columns = pd.read_csv(self.path, nrows=0).columns.tolist()
+        if set(columns) != set(df_new.columns):
+            logging.warning(f"Columns of {self.path} differ from the new rows, rewriting the whole file")
+            self.append(df_new, self.load())
+            return
+        df_new[columns].to_csv(self.path, mode='a', header=False, index=False)
+
+
+class ParquetStorage:
+    """
+    Dataset stored as Parquet files partitioned by Year/Month (Year=2025/Month=1/part-*.parquet).
+
+    New rows are appended as new files in their partitions, existing files are never rewritten
+    (except by write(), which replaces the whole dataset). Requires pyarrow.
+
+    The live files are listed in a manifest, replaced atomically once the new files are written:
+    a crash leaves at most unlisted files, which readers ignore and the next write() removes.
+    Datasets written before the manifest existed are read by listing the partition folders.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_NAME)
+
+    def _all_files(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, '*', '*', '*.parquet')))
+
+    def _files(self) -> list:
+        if not os.path.exists(self.manifest_path):
+            return self._all_files()
+        return sorted(os.path.join(self.path, f) for f in load_json(self.manifest_path)['parts'])
+
+    def _save_manifest(self, files: list) -> None:
+        save_json({'parts': sorted(os.path.relpath(f, self.path) for f in files)}, self.manifest_path)
+
+    def exists(self) -> bool:
+        return len(self._files()) > 0
+
+    def signature(self) -> tuple:
+        """ Identifies the stored version of the dataset (changes whenever a partition file is added or removed). """
+        return tuple((f, os.stat(f).st_mtime_ns) for f in self._files())
+
+    def load(self) -> pd.DataFrame:
+        """ Load all partitions, or an empty DataFrame if the dataset does not exist. """
+        files = self._files()
+        if not files:
+            return pd.DataFrame()
+        df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+        return sort_by_date(apply_compact_schema(df))
+
+    def _write_parts(self, df: pd.DataFrame) -> list:
+        """ Write the rows as new files in their Year/Month partitions and return their paths. """
+        df = apply_compact_schema(df.copy())
+        new_files = []
+        for (year, month), df_part in df.groupby(PARTITION_COLUMNS, sort=True, dropna=False):
+            folder = os.path.join(self.path, f'Year={year}', f'Month={month}')
+            os.makedirs(folder, exist_ok=True)
+            file_path = os.path.join(folder, f'part-{uuid.uuid4().hex}.parquet')
+            sort_by_date(df_part).to_parquet(file_path, index=False)
+            new_files.append(file_path)
+        return new_files
+
+    def append(self, df_new: pd.DataFrame, df_existing: pd.DataFrame = None) -> None:
+        """ Write the new rows as new files in their Year/Month partitions. """
+        if df_new.empty:
+            return
+        live_files = self._files()
+        self._save_manifest(live_files + self._write_parts(df_new))
+
+    def append_rows(self, df_new: pd.DataFrame) -> None:
+        """ Append rows without reading the dataset (streaming mode). """
+        self.append(df_new)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """ Replace the whole dataset (one file per partition), then remove the files no longer listed. """
+        new_files = self._write_parts(df) if not df.empty else []
+        self._save_manifest(new_files)
+        for f in sorted(set(self._all_files()) - set(new_files)):
+            os.remove(f)
+
+
+def get_storage(config: dict):
+    """
+    Return the storage backend defined in config['storage'] (CSV on config['output_final'] by default).
+
+    Example:
+        storage:
+          backend: "parquet"
+          path: "data/processed/personal/final_data"
+          export_csv: true
+    """
+    storage_config = config.get('storage') or {}
+    backend = storage_config.get('backend', 'csv')
+    if backend == 'csv':
+        return CsvStorage(storage_config.get('path', config['output_final']))
+    if backend == 'parquet':
+        return ParquetStorage(storage_config['path'])
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+def export_final_csv(df_new: pd.DataFrame, df_existing: pd.DataFrame, config: dict) -> None:
+    """ Export the full dataset to config['output_final'] when the storage backend is not already CSV. """
+    storage_config = config.get('storage') or {}
+    if storage_config.get('backend', 'csv') != 'csv' and storage_config.get('export_csv'):
+        df = pd.concat([df_existing, df_new], ignore_index=True)
+        export_csv(sort_by_date(df), config['output_final'])
+        logging.info(f"Dataset exported to {config['output_final']}")
@@ -0,0 +1,147 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Bounded-memory streaming pipeline for very large statement exports.
+
+import os
+import logging
+from src.io_utils import get_all_files, iter_raw_data
+from src.clean import clean_bank_data
+from src.categorize import categorize_operations, load_category_memo, save_category_memo
+from src.disk_cache import load_compiled_rules
+from src.storage import get_storage
+from src.fingerprint import FingerprintIndex, FINGERPRINT_COLUMN, add_fingerprints, occurrence_rank, index_path, load_fingerprint_index
+from src.manifest import manifest_path, load_manifest, save_manifest, select_changed_files, record_files
+from src.recategorize import save_rules_snapshot
+from src.aggregates import update_cubes, build_cubes
+from src.balances import update_checkpoints, build_checkpoints, record_statements, reconcile_balances
+from src.fallback import FallbackModel, apply_fallback, load_model_without_dataset, model_path
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def load_index_for_streaming(config: dict) -> FingerprintIndex:
+    """
+    Load the persisted fingerprint index without reading the dataset, as long as the index was saved
+    for the current version of the dataset (storage signature). Otherwise (no index, run interrupted
+    between an append and the index save, dataset written by another tool) it is rebuilt from the dataset.
+    """
+    storage = get_storage(config)
+    signature = storage.signature()
+    file_path = index_path(config)
+    if os.path.exists(file_path):
+        index = FingerprintIndex.load(file_path)
+        if index.is_current(signature):
+            return index
+        logging.info("Fingerprint index out of date, rebuilding it from the dataset")
+    else:
+        logging.info("No fingerprint index found, building it from the dataset")
+    index = load_fingerprint_index(config, storage.load())
+    index.save(file_path, signature)
+    return index
+
+def load_fallback_for_streaming(config: dict) -> FallbackModel:
+    """ Fallback model if enabled in config (see fallback.load_model_without_dataset), None otherwise. """
+    if not config.get('fallback'):
+        return None
+    return load_model_without_dataset(config, get_storage(config).load)
+
+def stream_file(
+        file_path: str, config: dict, index: FingerprintIndex, compiled_rules, memo: dict, chunksize: int,
+        model: FallbackModel = None,
+        ) -> tuple:
+    """
+    Clean, dedup, categorize (rules, then the fallback model if given) and append one raw file chunk by chunk.
+
+    Occurrences of identical operations are counted over the whole file, not per chunk: the n-th
+    occurrence in the file is new if the dataset held fewer than n of them before the file.
+
+    Returns:
+        tuple: (number of rows read, number of new rows appended)
+    """
+    storage = get_storage(config)
+    rows_read = rows_added = 0
+    seen = FingerprintIndex()   # rows of the file read so far
+    added = FingerprintIndex()  # rows of the file appended so far
+    record_statements(config, [file_path])
+    for df_chunk in iter_raw_data(file_path, config, chunksize):
+        rows_read += len(df_chunk)
+        df_clean = add_fingerprints(clean_bank_data(df_chunk, config, copy=False), config['merge_col'])
+        fingerprints = df_clean[FINGERPRINT_COLUMN].to_numpy()
+        rank = seen.count(fingerprints) + occurrence_rank(fingerprints)
+        is_new = rank >= index.count(fingerprints) - added.count(fingerprints)
+        seen.add(fingerprints)
+        df_new = df_clean[is_new].reset_index(drop=True)
+        if df_new.empty:
+            continue
+        df_new = categorize_operations(
+            df_new,
+            config['category_columns'],
+            compiled_rules=compiled_rules,
+            memo=memo
+            )
+        if model is not None:
+            df_new = apply_fallback(df_new, config, model)
+        storage.append_rows(df_new)
+        df_all = None
+        if not update_cubes(config, df_added=df_new):
+            # First rows or cubes deleted: build them once from the dataset (chunk included)
+            df_all = storage.load()
+            build_cubes(df_all, config)
+        if not update_checkpoints(config, df_added=df_new):
+            build_checkpoints(storage.load() if df_all is None else df_all, config)
+        index.add(df_new[FINGERPRINT_COLUMN].to_numpy())
+        added.add(df_new[FINGERPRINT_COLUMN].to_numpy())
+        rows_added += len(df_new)
+    return rows_read, rows_added
+
+def run_streaming_pipeline(config: dict, full_rebuild: bool = False, chunksize: int = None) -> None:
+    """
+    Run the pipeline in streaming mode: raw files are read in chunks of 'chunk_size' rows (config),
+    and each chunk is cleaned, deduplicated, categorized and appended to the dataset.
+
+    Peak memory is set by the chunk size, not by the size of the files or of the dataset
+    (the existing dataset is only loaded to rebuild a missing or outdated fingerprint index or
+    fallback model, new rows are checked against the fingerprint index).
+    With the CSV backend, appended rows are not sorted by date.
+    """
+    chunksize = chunksize or config.get('chunk_size') or DEFAULT_CHUNK_SIZE
+    logging.info(f"Streaming pipeline started (chunks of {chunksize} rows)")
+
+    manifest_file = manifest_path(config)
+    manifest = {} if full_rebuild else load_manifest(manifest_file)
+    raw_files = get_all_files(config['input_folder'], config['file_extensions'])
+    changed_files, entries = select_changed_files(raw_files, manifest)
+    logging.info(f"{len(changed_files)} new or modified raw file(s), {len(raw_files) - len(changed_files)} skipped")
+
+    index = load_index_for_streaming(config)
+    new_dataset = not get_storage(config).exists()
+    rules, compiled_rules, rules_hash = load_compiled_rules(config['rules_file'])
+    memo_file = config.get('category_memo')
+    memo = load_category_memo(memo_file, rules_hash) if memo_file else {}
+    model = load_fallback_for_streaming(config)
+
+    row_counts = {}
+    total_added = 0
+    for file_path in changed_files:
+        rows_read, rows_added = stream_file(file_path, config, index, compiled_rules, memo, chunksize, model)
+        row_counts[file_path] = rows_read
+        total_added += rows_added
+        logging.info(f"{file_path}: {rows_read} rows read, {rows_added} new operations")
+
+        # Save progress after each file so an interrupted run does not reprocess it
+        index.save(index_path(config), get_storage(config).signature())
+        if model is not None:
+            model.save(model_path(config))
+        save_manifest(record_files(manifest, {file_path: entries[file_path]}, row_counts), manifest_file)
+
+    if memo_file:
+        save_category_memo(memo, memo_file, rules_hash)
+    if new_dataset and get_storage(config).exists():
+        # The whole dataset is categorized with the current rules (reference of the recategorize command)
+        save_rules_snapshot(rules, config)
+    save_manifest(manifest, manifest_file)
+    if changed_files:
+        reconcile_balances(config)
+    logging.info(f"{total_added} new operations added")
+    logging.info("Streaming pipeline finished successfully")
@@ -0,0 +1,204 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Synthetic La Banque Postale raw files and matching rules, used for tests and benchmarks.
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from src.io_utils import save_json
+
+# Raw file format (La Banque Postale export)
+ENCODING = 'ISO-8859-15'
+PREAMBLE = (
+    "Numéro Compte   ;{account};\n"
+    "Type         ;CCP;\n"
+    "Compte tenu en  ;euros;\n"
+    "Date            ;{date};\n"
+    "Solde (EUROS)   ;{balance};\n"
+    ";;\n"
+    "Date;Libellé;Montant(EUROS)\n"
+)
+
+# Operation templates: (subcategory, main category, rule patterns, labels, mean amount, weight)
+# Labels are prefixed like real statements (CB, PRLV SEPA, VIR...) and card payments get the card date
+OPERATIONS = [
+    ('groceries', 'food', ['CARREFOUR', 'AUCHAN', 'LIDL', r'INTERMARCH[EÉ]'],
+     ['CB CARREFOUR CITY', 'CB CARREFOUR MARKET', 'CB AUCHAN', 'CB LIDL', 'CB INTERMARCHE'], -45.0, 30),
+    ('bakery', 'food', ['BOULANGERIE', 'PAUL'],
+     ['CB BOULANGERIE DU MARCHE', 'CB BOULANGERIE ST HONORE', 'CB PAUL GARE'], -6.5, 15),
+    ('restaurant', 'leisure', ['RESTAURANT', 'BRASSERIE', r'MC ?DONALD'],
+     ['CB RESTAURANT LE PETIT ZINC', 'CB BRASSERIE DU PORT', 'CB MCDONALDS', 'CB MC DONALD S'], -28.0, 12),
+    ('cinema', 'leisure', ['CINEMA', 'PATHE', 'UGC'],
+     ['CB CINEMA LE REX', 'CB PATHE', 'CB UGC CINE CITE'], -12.5, 3),
+    ('fuel', 'transport', ['TOTAL', 'ESSO', r'STATION\s+\w+'],
+     ['CB TOTALENERGIES', 'CB ESSO EXPRESS', 'CB STATION U'], -60.0, 6),
+    ('public transport', 'transport', ['SNCF', 'RATP', 'NAVIGO'],
+     ['CB SNCF INTERNET', 'CB RATP', 'PRLV SEPA NAVIGO'], -35.0, 5),
+    ('electricity', 'housing', ['EDF', 'ENGIE'],
+     ['PRLV SEPA EDF CLIENTS PARTICULIERS', 'PRLV SEPA ENGIE'], -85.0, 2),
+    ('internet', 'housing', ['ORANGE', 'FREE MOBILE', r'SFR|BOUYGUES'],
+     ['PRLV SEPA ORANGE SA', 'PRLV SEPA FREE MOBILE', 'PRLV SEPA SFR'], -32.0, 2),
+    ('rent', 'housing', [r'LOYER|FONCIA'],
+     ['PRLV SEPA FONCIA LOYER', 'VIR SEPA LOYER APPARTEMENT'], -850.0, 1),
+    ('online shopping', 'shopping', ['AMAZON', 'FNAC', r'PAYPAL \*'],
+     ['CB AMAZON PAYMENTS', 'CB FNAC.COM', 'CB PAYPAL *EBAY'], -55.0, 8),
+    ('clothing', 'shopping', ['ZARA', r'H ?& ?M', 'DECATHLON'],
+     ['CB ZARA', 'CB H&M', 'CB DECATHLON'], -70.0, 4),
+    ('cash withdrawal', 'cash', [r'RETRAIT DAB'],
+     ['RETRAIT DAB PARIS', 'RETRAIT DAB LYON', 'RETRAIT DAB LA POSTE'], -50.0, 5),
+    ('salary', 'income', [r'VIR(EMENT)? SEPA SALAIRE', 'PAYROLL'],
+     ['VIR SEPA SALAIRE ACME SAS', 'VIREMENT SEPA SALAIRE ACME SAS'], 2400.0, 1),
+    ('transfer received', 'income', [r'VIR(EMENT)? (SEPA )?RECU', 'VIR INST RE'],
+     ['VIR SEPA RECU DE M DUPONT', 'VIR INST RE 5487 DE MME MARTIN'], 150.0, 2),
+]
+# Labels matched by no rule (categorized 'other')
+UNMATCHED_LABELS = ['CB TABAC DE LA MAIRIE', 'CHEQUE 2103945', 'FRAIS BANCAIRES', 'CB PHARMACIE CENTRALE']
+UNMATCHED_WEIGHT = 4
+# Label of the monthly salary added to each file
+SALARY_LABEL = 'VIR SEPA SALAIRE ACME SAS'
+
+
+def synthetic_rules() -> dict:
+    """ Categorization rules matching the synthetic operations. """
+    return {
+        subcategory: {'main_category': main_category, 'patterns': patterns}
+        for subcategory, main_category, patterns, _, _, _ in OPERATIONS
+    }
+
+def _label_table() -> tuple:
+    """ (labels, mean amounts, probabilities, is card payment) of every label. """
+    labels, means, weights = [], [], []
+    for _, _, _, operation_labels, mean, weight in OPERATIONS:
+        for label in operation_labels:
+            labels.append(label)
+            means.append(mean)
+            weights.append(weight / len(operation_labels))
+    for label in UNMATCHED_LABELS:
+        labels.append(label)
+        means.append(-20.0)
+        weights.append(UNMATCHED_WEIGHT / len(UNMATCHED_LABELS))
+    labels = np.array(labels, dtype=object)
+    weights = np.array(weights)
+    is_card = np.array([label.startswith('CB ') for label in labels])
+    return labels, np.array(means), weights / weights.sum(), is_card
+
+def generate_operations(n_rows: int, month: pd.Period, rng: np.random.Generator) -> pd.DataFrame:
+    """ Operations of one account for one month (sorted by date), with raw-format columns. """
+    labels, means, probabilities, is_card = _label_table()
+    choice = rng.choice(len(labels), size=n_rows, p=probabilities)
+
+    days = np.sort(rng.integers(0, month.days_in_month, size=n_rows))
+    dates = month.start_time + pd.to_timedelta(days, unit='D')
+
+    # Lognormal spread around the mean amount of each label, rounded to cents
+    amounts = np.round(means[choice] * rng.lognormal(0.0, 0.35, size=n_rows), 2)
+
+    details = pd.Series(labels[choice])
+    # Card payments carry the card date (several days before the debit), as in real statements
+    card_dates = (dates - pd.to_timedelta(rng.integers(0, 4, size=n_rows), unit='D')).strftime(' %d/%m')
+    details = details.where(~is_card[choice], details + pd.Series(card_dates))
+
+    # Monthly salary (end of month) covering the spending, so balances stay realistic at any volume
+    if n_rows > 1:
+        payday = min(int(np.searchsorted(days, 26)), n_rows - 1)
+        spending = amounts.sum() - amounts[payday]
+        if spending < 0:
+            details.iloc[payday] = SALARY_LABEL
+            amounts[payday] = np.round(-spending * rng.uniform(0.97, 1.06), 2)
+
+    return pd.DataFrame({
+        'Date': dates.strftime('%d/%m/%Y'),
+        'Libellé': details.to_numpy(),
+        'Montant(EUROS)': amounts,
+        })
+
+def _format_amount(value: float) -> str:
+    return f"{value:.2f}".replace('.', ',')
+
+def write_raw_file(df: pd.DataFrame, file_path: str, account: str, statement_date: str, balance: float) -> None:
+    """ Write operations in the La Banque Postale export format (preamble, ';' separator, comma decimals). """
+    with open(file_path, 'w', encoding=ENCODING, newline='') as file:
+        file.write(PREAMBLE.format(account=account, date=statement_date, balance=_format_amount(balance)))
+        df.to_csv(file, sep=';', decimal=',', index=False, header=False, float_format='%.2f', lineterminator='\n')
+
+def account_numbers(n_accounts: int) -> list:
+    """ Synthetic 11-character account numbers (the raw file name starts with the account number). """
+    return [f"{1000001 + i:07d}M044" for i in range(n_accounts)]
+
+def generate_raw_files(
+    output_folder: str,
+    n_rows: int,
+    n_accounts: int = 2,
+    n_months: int = 12,
+    start_month: str = '2024-01',
+    seed: int = 0,
+    ) -> list:
+    """
+    Write synthetic raw files: one file per account and month ({account}{YYYYMM}.csv), n_rows
+    operations in total. The statement balance ('Solde') of each file is the running balance of
+    the account at the end of the month.
+
+    Returns:
+        list: paths of the written files.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_folder, exist_ok=True)
+    months = pd.period_range(start_month, periods=n_months, freq='M')
+    accounts = account_numbers(n_accounts)
+
+    # Spread the rows as evenly as possible over the files
+    n_files = n_accounts * n_months
+    rows_per_file = np.full(n_files, n_rows // n_files)
+    rows_per_file[:n_rows % n_files] += 1
+
+    file_paths = []
+    for a, account in enumerate(accounts):
+        balance = float(np.round(rng.uniform(500, 5000), 2))
+        for m, month in enumerate(months):
+            df = generate_operations(int(rows_per_file[a * n_months + m]), month, rng)
+            balance = round(balance + df['Montant(EUROS)'].sum(), 2)
+            file_path = os.path.join(output_folder, f"{account}{month.strftime('%Y%m')}.csv")
+            write_raw_file(df, file_path, account, month.end_time.strftime('%d/%m/%Y'), balance)
+            file_paths.append(file_path)
+    return file_paths
+
+def synthetic_config(folder: str) -> dict:
+    """ Pipeline configuration for synthetic raw files in folder/raw, with outputs in folder/processed. """
+    return {
+        'input_folder': os.path.join(folder, 'raw'),
+        'output_final': os.path.join(folder, 'processed', 'final_data.csv'),
+        'rename_columns': ['Date', 'Details', 'Amount', 'Account'],
+        'rules_file': os.path.join(folder, 'rules.json'),
+        'category_columns': 'Details',
+        'details_column': 'Details',
+        'amount_column': 'Amount',
+        'date_column': 'Date',
+        'merge_col': ['Date', 'Details', 'Amount', 'Account', 'Currency', 'Debit/Credit', 'Month', 'Year'],
+        'currency': 'Euros',
+        'encoding': ENCODING,
+        'skiprows': 6,
+        'separator': ';',
+        'file_extensions': ['.csv'],
+    }
+
+def generate_dataset(folder: str, n_rows: int, n_accounts: int = 2, n_months: int = 12, seed: int = 0) -> dict:
+    """ Write synthetic raw files (folder/raw) and rules (folder/rules.json) and return the matching pipeline config. """
+    config = synthetic_config(folder)
+    generate_raw_files(config['input_folder'], n_rows, n_accounts, n_months, seed=seed)
+    save_json(synthetic_rules(), config['rules_file'])
+    os.makedirs(os.path.dirname(config['output_final']), exist_ok=True)
+    return config
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic La Banque Postale raw files and matching rules.")
+    parser.add_argument('folder', help="Output folder (raw files in folder/raw, rules in folder/rules.json).")
+    parser.add_argument('--rows', type=int, default=10000, help="Total number of operations.")
+    parser.add_argument('--accounts', type=int, default=2, help="Number of accounts.")
+    parser.add_argument('--months', type=int, default=12, help="Number of months (one file per account and month).")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+    args = parser.parse_args()
+    generate_dataset(args.folder, args.rows, args.accounts, args.months, args.seed)
+    print(f"{args.rows} operations written to {os.path.join(args.folder, 'raw')}")
@@ -0,0 +1,245 @@
+# Author : Adeline Le Ray
+# Date : 2026/10/18
+# Project : Personal finance analysis
+# Content : Watch-folder daemon ingesting new raw files continuously (inotify, polling fallback).
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from src.io_utils import get_all_files
+from src.categorize import load_category_memo, save_category_memo
+from src.disk_cache import load_compiled_rules
+from src.fingerprint import index_path
+from src.manifest import manifest_path, load_manifest, save_manifest, select_changed_files, record_files
+from src.instrumentation import RunReport, report_folder
+from src.streaming import DEFAULT_CHUNK_SIZE, load_index_for_streaming, load_fallback_for_streaming, stream_file
+from src.fallback import model_path
+from src.storage import get_storage
+from src.recategorize import save_rules_snapshot
+from src.balances import reconcile_balances
+from src import data_cache
+
+# inotify flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+# Default delays (seconds)
+DEFAULT_DEBOUNCE = 2.0        # quiet period closing a batch of arrivals
+DEFAULT_MAX_DELAY = 30.0      # a batch is processed at the latest this long after its first arrival
+DEFAULT_POLL_INTERVAL = 1.0   # scan interval of the polling watcher
+
+
+class InotifyWatcher:
+    """ Reports files of a folder closed after writing or moved into it, using Linux inotify (through ctypes). """
+    def __init__(self, folder: str):
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed on {folder}")
+
+    def changes(self, timeout: float) -> set:
+        """ Paths written or moved into the folder, waiting at most timeout seconds for the first event. """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buffer = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset < len(buffer):
+            _, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: report every file, the manifest filters the unchanged ones
+                paths.update(os.path.join(self.folder, f) for f in os.listdir(self.folder))
+            elif name:
+                paths.add(os.path.join(self.folder, os.fsdecode(name)))
+        return paths
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """ Reports new or modified files of a folder by comparing (size, mtime) between scans. """
+    def __init__(self, folder: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.folder = folder
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict:
+        with os.scandir(self.folder) as entries:
+            return {
+                entry.path: (entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in entries if entry.is_file()
+            }
+
+    def changes(self, timeout: float) -> set:
+        """ Paths new or modified since the previous scan (scans after min(timeout, interval) seconds). """
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        paths = {path for path, stat in snapshot.items() if self.snapshot.get(path) != stat}
+        self.snapshot = snapshot
+        return paths
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(folder: str, poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+    """ inotify watcher on Linux, polling watcher elsewhere or if inotify is unavailable (e.g. network shares). """
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folder)
+        except (OSError, AttributeError) as e:
+            logging.warning(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(folder, poll_interval)
+
+
+class WatchIngestor:
+    """
+    Ingests batches of raw files, keeping the pipeline state warm between batches: compiled rules
+    (recompiled only when the rules file changes), fingerprint index, categorization memo, fallback
+    model and ingestion manifest. Only the given files are read, cleaned, deduplicated and categorized,
+    chunk by chunk (see streaming.stream_file), and new rows are appended to the dataset.
+    """
+    def __init__(self, config: dict, chunksize: int = None):
+        self.config = config
+        self.chunksize = chunksize or config.get('chunk_size') or DEFAULT_CHUNK_SIZE
+        self.manifest_file = manifest_path(config)
+        self.manifest = load_manifest(self.manifest_file)
+        self.index = load_index_for_streaming(config)
+        self.memo_file = config.get('category_memo')
+        self.rules_signature = None
+        self._load_rules()
+
+    def _load_rules(self) -> None:
+        """ (Re)compile the rules and reload the memo and fallback model if the rules file changed since the last batch. """
+        signature = data_cache.file_signature(self.config['rules_file'])
+        if signature == self.rules_signature:
+            return
+        self.rules, self.compiled_rules, self.rules_hash = load_compiled_rules(self.config['rules_file'])
+        self.memo = load_category_memo(self.memo_file, self.rules_hash) if self.memo_file else {}
+        self.model = load_fallback_for_streaming(self.config)
+        self.rules_signature = signature
+        logging.info("Categorization rules loaded")
+
+    def process(self, paths: set) -> int:
+        """ Ingest the new or modified raw files among paths. Returns the number of new operations. """
+        extensions = [ext.lower() for ext in self.config['file_extensions']]
+        raw_files = sorted(
+            path for path in paths
+            if os.path.isfile(path) and any(path.lower().endswith(ext) for ext in extensions)
+            )
+        changed_files, entries = select_changed_files(raw_files, self.manifest)
+        if not changed_files:
+            return 0
+
+        self._load_rules()
+        storage = get_storage(self.config)
+        new_dataset = not storage.exists()
+        if not self.index.is_current(storage.signature()):
+            # The dataset was written by another process since the last batch
+            self.index = load_index_for_streaming(self.config)
+        report = RunReport('watch')
+        row_counts = {}
+        total_added = 0
+        with report.stage('ingest') as stage:
+            for file_path in changed_files:
+                rows_read, rows_added = stream_file(
+                    file_path, self.config, self.index, self.compiled_rules, self.memo, self.chunksize, self.model
+                    )
+                row_counts[file_path] = rows_read
+                total_added += rows_added
+                logging.info(f"{file_path}: {rows_read} rows read, {rows_added} new operations")
+            stage['rows_in'] = sum(row_counts.values())
+            stage['rows_out'] = total_added
+
+        with report.stage('save', rows_in=total_added) as stage:
+            self.index.save(index_path(self.config), storage.signature())
+            save_manifest(record_files(self.manifest, entries, row_counts), self.manifest_file)
+            if self.memo_file:
+                save_category_memo(self.memo, self.memo_file, self.rules_hash)
+            if self.model is not None:
+                self.model.save(model_path(self.config))
+            if new_dataset and storage.exists():
+                # The whole dataset is categorized with the current rules (reference of the recategorize command)
+                save_rules_snapshot(self.rules, self.config)
+            reconcile_balances(self.config)
+            data_cache.invalidate()
+            stage['rows_out'] = len(self.index)
+        report.status = 'success'
+        report.info['files'] = changed_files
+        report.save(report_folder(self.config))
+        logging.info(f"Batch of {len(changed_files)} file(s): {total_added} new operations added")
+        return total_added
+
+
+def watch(
+    config: dict,
+    debounce: float = DEFAULT_DEBOUNCE,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    use_inotify: bool = True,
+    stop: threading.Event = None,
+    ) -> None:
+    """
+    Watch config['input_folder'] and ingest new or modified raw files until stop is set (or Ctrl+C).
+
+    Files already in the folder and not yet ingested are processed first. Arrivals are then
+    grouped into batches: a batch is processed once no file arrived for `debounce` seconds, or
+    `max_delay` seconds after its first file during a continuous burst.
+    """
+    stop = stop or threading.Event()
+    folder = config['input_folder']
+    watcher = make_watcher(folder, poll_interval, use_inotify)
+    logging.info(f"Watching {folder} ({type(watcher).__name__})")
+
+    def process(ingestor: WatchIngestor, paths: set) -> None:
+        try:
+            ingestor.process(paths)
+        except Exception as e:
+            # Keep watching: the files stay out of the manifest and are retried on their next change
+            logging.error(f"Batch failed ({type(e).__name__}: {e})")
+
+    pending = set()
+    first_arrival = last_arrival = None
+    try:
+        ingestor = WatchIngestor(config)
+        # Catch up on files added while the daemon was not running
+        process(ingestor, set(get_all_files(folder, config['file_extensions'])))
+
+        while not stop.is_set():
+            timeout = debounce if pending else 1.0
+            paths = watcher.changes(timeout)
+            now = time.monotonic()
+            if paths:
+                pending |= paths
+                last_arrival = now
+                first_arrival = first_arrival or now
+            if pending and (now - last_arrival >= debounce or now - first_arrival >= max_delay):
+                batch, pending = pending, set()
+                first_arrival = last_arrival = None
+                process(ingestor, batch)
+    except KeyboardInterrupt:
+        logging.info("Watch stopped")
+    finally:
+        watcher.close()
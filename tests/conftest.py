@@ -0,0 +1,58 @@
+import json
+import pytest
+from src import disk_cache
+
+PREAMBLE = "Numéro Compte   ;{account};\nType         ;CCP;\nCompte tenu en  ;euros;\nDate            ;31/01/2025;\nSolde (EUROS)   ;1521,44;\n;;\n"
+
+RULES = {
+    'groceries': {'main_category': 'food', 'patterns': ['Supermarket']},
+    'cinema': {'main_category': 'leisure', 'patterns': ['Cinema']},
+    'salary': {'main_category': 'income', 'patterns': [r'Salary|Payroll']},
+}
+
+def write_raw_file(folder, account, rows, suffix='M0442025'):
+    """ Write a raw file in the La Banque Postale format. """
+    content = PREAMBLE.format(account=account) + "Date;Libellé;Montant(EUROS)\n" + "".join(f"{row}\n" for row in rows)
+    path = folder / f"{account}{suffix}.csv"
+    path.write_bytes(content.encode('ISO-8859-15'))
+    return path
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """ Keep the compiled rules and config cache of each test in its temporary folder (and start with an empty memory cache). """
+    folder = tmp_path / 'cache'
+    monkeypatch.setenv('FINANCE_CACHE_DIR', str(folder))
+    monkeypatch.setattr(disk_cache, '_compiled_rules', {})
+    return folder
+
+@pytest.fixture
+def raw_folder(tmp_path):
+    folder = tmp_path / 'raw'
+    folder.mkdir()
+    write_raw_file(folder, '2222222B000', ['03/01/2025;Cinema;-12,50', '04/01/2025;Salary;2100,00'])
+    write_raw_file(folder, '1111111A000', ['02/01/2025;Supermarket;-97,51'])
+    return folder
+
+@pytest.fixture
+def pipeline_config(tmp_path, raw_folder):
+    """ Complete pipeline configuration working on temporary folders. """
+    rules_file = tmp_path / 'rules.json'
+    rules_file.write_text(json.dumps(RULES))
+    processed = tmp_path / 'processed'
+    processed.mkdir()
+    return {
+        'input_folder': str(raw_folder),
+        'output_final': str(processed / 'final_data.csv'),
+        'rename_columns': ['Date', 'Details', 'Amount', 'Account'],
+        'rules_file': str(rules_file),
+        'category_columns': 'Details',
+        'details_column': 'Details',
+        'amount_column': 'Amount',
+        'date_column': 'Date',
+        'merge_col': ['Date', 'Details', 'Amount', 'Account', 'Currency', 'Debit/Credit', 'Month', 'Year'],
+        'currency': 'Euros',
+        'encoding': 'ISO-8859-15',
+        'skiprows': 6,
+        'separator': ';',
+        'file_extensions': ['.csv'],
+    }
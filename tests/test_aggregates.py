@@ -0,0 +1,67 @@
+import json
+import threading
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.aggregates import load_cube, build_cubes, update_cubes, CUBES
+from src.recategorize import recategorize
+from src.streaming import run_streaming_pipeline
+from tests.conftest import write_raw_file, RULES
+
+def _cubes(config):
+    return {name: load_cube(config, name) for name in CUBES}
+
+def _assert_same_as_rebuild(config):
+    incremental = _cubes(config)
+    build_cubes(load_existing_dataset(config), config)
+    for name, cube in _cubes(config).items():
+        pd.testing.assert_frame_equal(incremental[name], cube, obj=f"cube {name}")
+
+def test_cubes_are_updated_incrementally(pipeline_config, raw_folder):
+    run_pipeline(config=pipeline_config)
+    monthly = load_cube(pipeline_config, 'monthly')
+    assert monthly['Count'].sum() == 3 and round(monthly['Total'].sum(), 2) == 1989.99
+
+    write_raw_file(raw_folder, '2222222B000', ['05/02/2025;Cinema;-9,00', '06/01/2025;Cinema;-3,50'], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    yearly = load_cube(pipeline_config, 'yearly')
+    cinema = yearly[(yearly['Subcategory'] == 'cinema')]
+    assert cinema[['Total', 'Count', 'Average']].values.tolist() == [[-25.0, 3, -8.33]]
+    _assert_same_as_rebuild(pipeline_config)
+
+def test_recategorized_rows_move_between_categories(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    with open(pipeline_config['rules_file'], 'w') as file:
+        json.dump({**RULES, 'cinema': {'main_category': 'culture', 'patterns': ['Cinema']}}, file)
+    recategorize(pipeline_config)
+    monthly = load_cube(pipeline_config, 'monthly')
+    assert 'leisure' not in monthly['Category'].tolist()
+    assert monthly.loc[monthly['Category'] == 'culture', 'Count'].item() == 1
+    _assert_same_as_rebuild(pipeline_config)
+
+def test_removed_rows_empty_their_cell(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    update_cubes(pipeline_config, df_removed=df[df['Details'] == 'Salary'])
+    assert 'income' not in load_cube(pipeline_config, 'yearly')['Category'].tolist(), "Une cellule vide doit disparaître."
+
+def test_rows_without_date_are_left_out(pipeline_config, raw_folder):
+    write_raw_file(raw_folder, '1111111A000', ['31/02/2025;Cinema;-5,00', '10/02/2025;Cinema;-7,00'], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    assert len(load_existing_dataset(pipeline_config)) == 5
+    assert load_cube(pipeline_config, 'monthly')['Count'].sum() == 4, "Une opération sans date ne doit pas être agrégée."
+    _assert_same_as_rebuild(pipeline_config)
+
+def test_streaming_builds_missing_cubes(pipeline_config):
+    run_streaming_pipeline(pipeline_config, chunksize=1)
+    assert load_cube(pipeline_config, 'monthly')['Count'].sum() == 3
+    _assert_same_as_rebuild(pipeline_config)
+
+def test_concurrent_updates_are_not_lost(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    row = load_existing_dataset(pipeline_config).iloc[[0]]
+    threads = [threading.Thread(target=update_cubes, args=(pipeline_config,), kwargs={'df_added': row}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load_cube(pipeline_config, 'yearly')['Count'].sum() == 11, "Des mises à jour concurrentes ne doivent pas se perdre."
@@ -0,0 +1,99 @@
+import os
+import shutil
+import pandas as pd
+from src.synthetic_data import generate_dataset
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.balances import (
+    extend_checkpoints, monthly_totals, load_checkpoints, load_daily_totals, build_checkpoints, load_statements,
+    read_statement, reconcile, running_balances, balances_folder,
+)
+from src.streaming import run_streaming_pipeline
+from src.watch import WatchIngestor
+from tests.conftest import write_raw_file
+
+def _reconciliation(config):
+    return pd.read_csv(os.path.join(balances_folder(config), 'reconciliation.csv'), dtype={'Account': str})
+
+def test_computed_balances_match_statements(tmp_path):
+    config = generate_dataset(str(tmp_path), n_rows=1500, n_accounts=2, n_months=6, seed=3)
+    report = run_pipeline(config=config)
+    reconciliation = _reconciliation(config)
+    assert len(reconciliation) == 12 and report.info['balance_mismatches'] == 0
+    assert set(reconciliation['Status']) == {'anchor', 'ok'}, "Les soldes calculés doivent correspondre aux relevés."
+
+    df = load_existing_dataset(config)
+    last = df.assign(Balance=running_balances(df, config)).sort_values('Date', kind='stable').groupby('Account', observed=True)['Balance'].last()
+    statements = load_statements(config).groupby('Account')['Balance'].last()
+    assert last.round(2).to_dict() == statements.round(2).to_dict()
+
+def test_incremental_checkpoints_match_full_build(tmp_path):
+    config = generate_dataset(str(tmp_path), n_rows=1200, n_accounts=2, n_months=6, seed=4)
+    later = tmp_path / 'later'
+    later.mkdir()
+    for name in sorted(os.listdir(config['input_folder']))[::2]:
+        shutil.move(os.path.join(config['input_folder'], name), later / name)
+    run_pipeline(config=config)
+    for name in os.listdir(later):
+        shutil.move(later / name, os.path.join(config['input_folder'], name))
+    run_pipeline(config=config)
+
+    incremental, incremental_daily = load_checkpoints(config), load_daily_totals(config)
+    build_checkpoints(load_existing_dataset(config), config)
+    pd.testing.assert_frame_equal(incremental, load_checkpoints(config))
+    pd.testing.assert_frame_equal(incremental_daily, load_daily_totals(config))
+    assert (_reconciliation(config)['Status'] != 'mismatch').all()
+
+def test_late_operation_only_shifts_later_months():
+    months = pd.DataFrame({
+        'Account': ['A'] * 3, 'Year': [2025] * 3, 'Month': [1, 2, 3],
+        'Date': pd.to_datetime(['2025-01-05', '2025-02-05', '2025-03-05']), 'Amount': [10.0, -2.5, 4.0],
+        })
+    checkpoints = extend_checkpoints(extend_checkpoints(None, monthly_totals(months[:1])), monthly_totals(months[1:]))
+    assert checkpoints['Net'].tolist() == [1000, 750, 1150]
+    late = extend_checkpoints(checkpoints, monthly_totals(months.iloc[[1]].assign(Amount=1.0)))
+    assert late['Net'].tolist() == [1000, 850, 1250] and late['Count'].tolist() == [1, 2, 1]
+
+def test_tampered_statement_is_flagged(pipeline_config, raw_folder):
+    path = write_raw_file(raw_folder, '2222222B000', ['03/02/2025;Cinema;-10,00'], suffix='M0442025b')
+    path.write_bytes(path.read_bytes().replace(b'31/01/2025', b'28/02/2025'))
+    assert read_statement(str(path), pipeline_config)['Balance'] == 1521.44
+
+    report = run_pipeline(config=pipeline_config)
+    reconciliation = _reconciliation(pipeline_config)
+    mismatch = reconciliation[reconciliation['Status'] == 'mismatch']
+    assert report.info['balance_mismatches'] == 1, "Un solde incohérent doit être signalé."
+    assert mismatch[['Account', 'Computed', 'Difference']].values.tolist() == [['2222222B000', 1511.44, 10.0]]
+
+def test_statement_before_month_end_uses_operations_up_to_its_date(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    statements = pd.DataFrame({
+        'Account': ['2222222B000', '2222222B000'],
+        'Date': pd.to_datetime(['2025-01-03', '2025-01-31']),
+        'Balance': [100.0, 2200.0],
+        'File': ['a.csv', 'b.csv'],
+        })
+    reconciliation = reconcile(statements, load_checkpoints(pipeline_config), load_daily_totals(pipeline_config))
+    assert reconciliation['Opening'].tolist() == [112.5, 112.5]
+    assert reconciliation['Status'].tolist() == ['anchor', 'ok']
+
+def _mid_month_statements(raw_folder):
+    """ Two statements of one account exported mid-month, consistent with the operations between them. """
+    first = write_raw_file(raw_folder, '3333333C000', ['02/01/2025;Supermarket;-10,00', '20/01/2025;Cinema;-5,00'], suffix='M044202501')
+    second = write_raw_file(raw_folder, '3333333C000', ['20/01/2025;Cinema;-5,00', '25/01/2025;Cinema;-20,00'], suffix='M044202502')
+    first.write_bytes(first.read_bytes().replace(b'31/01/2025', b'15/01/2025'))
+    second.write_bytes(second.read_bytes().replace(b'31/01/2025', b'26/01/2025').replace(b'1521,44', b'1496,44'))
+
+def test_streamed_statements_reconcile_within_the_month(pipeline_config, raw_folder):
+    _mid_month_statements(raw_folder)
+    run_streaming_pipeline(pipeline_config, chunksize=1)
+    reconciliation = _reconciliation(pipeline_config)
+    account = reconciliation[reconciliation['Account'] == '3333333C000']
+    assert account['Status'].tolist() == ['anchor', 'ok'], "Un relevé en milieu de mois doit être rapproché au jour près."
+    assert account['Opening'].tolist() == [1531.44, 1531.44]
+    assert load_checkpoints(pipeline_config) is not None
+
+def test_watch_reconciles_each_batch(pipeline_config, raw_folder):
+    _mid_month_statements(raw_folder)
+    WatchIngestor(pipeline_config).process({str(p) for p in raw_folder.iterdir()})
+    reconciliation = _reconciliation(pipeline_config)
+    assert (reconciliation.loc[reconciliation['Account'] == '3333333C000', 'Status'] != 'mismatch').all()
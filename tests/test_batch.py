@@ -0,0 +1,37 @@
+import json
+import pytest
+from src.batch import profile_configs, run_batch
+from tests.conftest import write_raw_file
+
+@pytest.fixture
+def profiles(tmp_path, pipeline_config):
+    """ Two profiles sharing the rules file, and one profile with an invalid configuration. """
+    folder = tmp_path / 'profiles'
+    folder.mkdir()
+    second = tmp_path / 'raw_second'
+    second.mkdir()
+    write_raw_file(second, '3333333C000', ['05/01/2025;Payroll;1800,00', '06/01/2025;Cinema;-9,00', '07/01/2025;Bakery;-3,20'])
+    (tmp_path / 'processed_second').mkdir()
+    configs = {
+        'alice': pipeline_config,
+        'bob': {**pipeline_config, 'input_folder': str(second), 'output_final': str(tmp_path / 'processed_second' / 'final_data.csv')},
+        'broken': {key: value for key, value in pipeline_config.items() if key != 'rules_file'},
+    }
+    for name, config in configs.items():
+        (folder / f"{name}.yml").write_text(json.dumps(config))
+    return folder
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_summary(profiles, workers):
+    config_files = profile_configs([str(profiles)])
+    assert [path.rsplit('/', 1)[-1] for path in config_files] == ['alice.yml', 'bob.yml', 'broken.yml']
+
+    summary = run_batch(config_files, workers=workers).set_index('profile')
+    assert list(summary['status']) == ['success', 'success', 'failed']
+    assert (summary.loc['alice', 'rows_read'], summary.loc['alice', 'rows_added']) == (3, 3)
+    assert (summary.loc['bob', 'rows_read'], summary.loc['bob', 'rows_total']) == (3, 3)
+    assert "rules_file" in summary.loc['broken', 'error'], "L'erreur d'un profil doit apparaître dans le résumé."
+
+    # Second run: nothing new to ingest
+    summary = run_batch(config_files, workers=workers).set_index('profile')
+    assert list(summary.loc[['alice', 'bob'], 'rows_added']) == [0, 0]
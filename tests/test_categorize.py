@@ -0,0 +1,88 @@
+import pandas as pd
+from src.categorize import categorize_operations, load_category_memo, save_category_memo
+from src.rule_engine import compile_rules
+
+rules = {
+    'groceries': {'main_category': 'food', 'patterns': ['INTERMARCHE', 'CARREFOUR', 'Supermarket']},
+    'restaurant': {'main_category': 'food', 'patterns': ['RESTAU', r'MC ?DO']},
+    'fuel': {'main_category': 'transport', 'patterns': ['GAS STATION', r'^TOTAL\b']},
+    'transfer': {'main_category': 'financial', 'patterns': ['VIR ', 'PRLV SEPA']},
+    'carrefour_fuel': {'main_category': 'transport', 'patterns': [r'CARREFOUR.*STATION']},
+}
+
+details = [
+    'INTERMARCHE', 'carrefour market', 'CARREFOUR GAS STATION', 'Restaurant Le Bon',
+    'MCDO PARIS', 'MC DO', 'TOTAL ENERGIES', 'PAIEMENT TOTAL', 'VIR SEPA LOYER',
+    'PRLV SEPA RESTAU', 'Cinema', None, '',
+]
+
+def legacy_categorize(df, operation_col, category_rules):
+    """ Original implementation: one str.contains scan per rule, the last matching rule wins. """
+    df = df.copy()
+    df['Category'] = 'other'
+    df['Subcategory'] = 'other'
+    for category, rule in category_rules.items():
+        mask = df[operation_col].str.contains('|'.join(rule['patterns']), case=False, na=False)
+        df.loc[mask, 'Subcategory'] = category
+        df.loc[mask, 'Category'] = rule['main_category']
+    return df
+
+def test_categorize_operations_matches_legacy():
+    df = pd.DataFrame({'Details': details})
+    expected = legacy_categorize(df, 'Details', rules)
+    result = categorize_operations(df, 'Details', category_rules=rules)
+    assert result['Subcategory'].tolist() == expected['Subcategory'].tolist()
+    assert result['Category'].tolist() == expected['Category'].tolist()
+    assert not result['is_manual'].any()
+
+def test_last_matching_rule_wins():
+    compiled = compile_rules(rules)
+    assert compiled.subcategories[compiled.match('CARREFOUR GAS STATION')] == 'carrefour_fuel'
+    assert compiled.subcategories[compiled.match('PRLV SEPA RESTAU')] == 'transfer'
+    assert compiled.match('Cinema') == -1
+
+def test_dedup_matches_row_by_row():
+    df = pd.DataFrame({'Details': details * 3})
+    result = categorize_operations(df, 'Details', category_rules=rules, dedup=True)
+    expected = categorize_operations(df, 'Details', category_rules=rules, dedup=False)
+    assert result['Subcategory'].tolist() == expected['Subcategory'].tolist()
+    assert result['Category'].tolist() == expected['Category'].tolist()
+
+def test_category_memo_is_keyed_by_rules_hash(tmp_path):
+    memo_file = str(tmp_path / 'memo.json')
+    memo = {}
+    categorize_operations(pd.DataFrame({'Details': details}), 'Details', category_rules=rules, memo=memo)
+    assert memo['INTERMARCHE'] == ('food', 'groceries')
+
+    save_category_memo(memo, memo_file, 'hash-1')
+    assert load_category_memo(memo_file, 'hash-1') == memo
+    assert load_category_memo(memo_file, 'hash-2') == {}, "Le memo ne doit pas être réutilisé avec d'autres règles."
+
+def test_many_rules_match_legacy():
+    # More rules than one alternation group, with a pattern RE2 rejects (lookahead), a group name
+    # used by two rules and a rule without patterns (matches everything)
+    many = {f'rule{i}': {'main_category': 'misc', 'patterns': [f'SHOP{i}\\b', f'CODE {i:03d}']} for i in range(70)}
+    many['lookahead'] = {'main_category': 'misc', 'patterns': [r'SHOP1(?=2)']}
+    many['named_a'] = {'main_category': 'misc', 'patterns': [r'(?P<n>BAKERY)']}
+    many['named_b'] = {'main_category': 'misc', 'patterns': [r'(?P<n>PHARMACY)']}
+    many = {'everything': {'main_category': 'misc', 'patterns': []}, **many}
+    df = pd.DataFrame({'Details': [
+        'CB SHOP5 01/02', 'shop12', 'SHOP1', 'PRLV CODE 042', 'CHEQUE 5550001', 'CB BAKERY', 'CB PHARMACY SHOP3',
+        'SHOP69 code 007', 'Cinema', None, '',
+        ]})
+    expected = legacy_categorize(df, 'Details', many)
+    result = categorize_operations(df, 'Details', category_rules=many, dedup=False)
+    assert result['Subcategory'].tolist() == expected['Subcategory'].tolist(), "Le moteur doit donner les mêmes catégories que la boucle d'origine."
+
+    # Backreferences are searched with the re module (the original loop fails on them with the pandas string dtype)
+    compiled = compile_rules({**many, 'backreference': {'main_category': 'misc', 'patterns': [r'(\d)\1{2}']}})
+    assert [compiled.subcategories[i] for i in compiled.match_all(['CHEQUE 5550001', 'CHEQUE 5050101'])] == ['backreference', 'everything']
+
+def test_dedup_keeps_case_sensitive_patterns():
+    scoped = {**rules, 'baz': {'main_category': 'misc', 'patterns': ['(?-i:Baz)']}}
+    df = pd.DataFrame({'Details': ['Baz', 'baz', 'BAZ', 'Baz', 'CARREFOUR baz']})
+    result = categorize_operations(df, 'Details', category_rules=scoped, dedup=True)
+    expected = categorize_operations(df, 'Details', category_rules=scoped, dedup=False)
+    assert result['Subcategory'].tolist() == expected['Subcategory'].tolist() == legacy_categorize(df, 'Details', scoped)['Subcategory'].tolist()
+    assert result['Subcategory'].tolist() == ['baz', 'other', 'other', 'baz', 'groceries'], \
+        "Un motif sensible à la casse doit donner le même résultat avec ou sans déduplication."
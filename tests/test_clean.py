@@ -0,0 +1,20 @@
+import pandas as pd
+from src.run_pipeline import load_raw_files, clean_data
+from tests.conftest import write_raw_file
+
+SCHEMA = {
+    'columns': {'Date': 'date', 'Details': 'string', 'Amount': 'float'},
+    'date_format': '%d/%m/%Y',
+    'decimal': ',',
+}
+
+def test_schema_cleaning_matches_default_cleaning(pipeline_config, raw_folder):
+    write_raw_file(raw_folder, '3333333C000', ['31/12/2024;VIR   SEPA  LOYER;-750,00', '31/12/2024;VIR   SEPA  LOYER;-750,00', '01/01/2025;Refund;0,00'])
+    df_default = clean_data(load_raw_files(pipeline_config), pipeline_config)
+    schema_config = {**pipeline_config, 'schema': SCHEMA}
+    df_raw = load_raw_files(schema_config)
+    assert df_raw['Amount'].dtype == 'float64', "Les montants doivent être lus directement en float."
+
+    df_schema = clean_data(df_raw, schema_config, copy=False)
+    pd.testing.assert_frame_equal(df_default, df_schema)
+    assert df_schema['Date'].dtype == df_default['Date'].dtype
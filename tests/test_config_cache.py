@@ -0,0 +1,74 @@
+import json
+import pytest
+from src import disk_cache
+from src.config_loader import Config, load_config
+from src.disk_cache import load_compiled_rules
+from tests.conftest import RULES
+
+def test_compiled_rules_cache(pipeline_config, cache_dir):
+    rules, compiled, rules_hash = load_compiled_rules(pipeline_config['rules_file'])
+    assert rules == RULES
+    assert len(list(cache_dir.iterdir())) == 1, "Les règles compilées doivent être mises en cache."
+
+    # Cache hit: same rules and same matches, the rules dict of each caller is its own copy
+    rules['cinema']['patterns'].append('Theatre')
+    rules_cached, compiled_cached, hash_cached = load_compiled_rules(pipeline_config['rules_file'])
+    texts = ['SUPERMARKET 12', 'cinema', 'Payroll March', 'unknown']
+    assert hash_cached == rules_hash
+    assert rules_cached == RULES, "Les règles en cache ne doivent pas être modifiées par un appelant."
+    assert compiled_cached.match_all(texts) == compiled.match_all(texts)
+
+    # A modified rules file is compiled again
+    with open(pipeline_config['rules_file'], 'w') as file:
+        json.dump({'rent': {'main_category': 'housing', 'patterns': ['Rent']}}, file)
+    rules_new, compiled_new, hash_new = load_compiled_rules(pipeline_config['rules_file'])
+    assert hash_new != rules_hash
+    assert compiled_new.subcategories == ['rent'], "Une modification des règles doit invalider le cache."
+
+def test_unreadable_cache_entry_is_rebuilt(pipeline_config, cache_dir):
+    load_compiled_rules(pipeline_config['rules_file'])
+    entry = next(cache_dir.iterdir())
+    entry.write_bytes(b'corrupted')
+    disk_cache._compiled_rules.clear()  # new process
+    rules, compiled, _ = load_compiled_rules(pipeline_config['rules_file'])
+    assert rules == RULES
+    assert compiled.subcategories == list(RULES)
+
+def test_untrusted_or_outdated_entries_are_not_loaded(pipeline_config, cache_dir, monkeypatch):
+    load_compiled_rules(pipeline_config['rules_file'])
+    entry = next(cache_dir.iterdir())
+    entry.chmod(0o666)
+    disk_cache._compiled_rules.clear()
+    assert load_compiled_rules(pipeline_config['rules_file'])[0] == RULES
+    assert entry.stat().st_mode & 0o022 == 0, "Une entrée modifiable par d'autres utilisateurs doit être reconstruite."
+
+    # Another version of the code building the rules writes its own entry
+    monkeypatch.setattr(disk_cache, 'source_version', lambda *modules: 'othercode')
+    disk_cache._compiled_rules.clear()
+    load_compiled_rules(pipeline_config['rules_file'])
+    assert len(list(cache_dir.iterdir())) == 2
+
+def test_default_cache_dir_is_per_user(tmp_path, monkeypatch):
+    monkeypatch.delenv('FINANCE_CACHE_DIR')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert disk_cache.cache_dir() == str(tmp_path / 'personal_finance')
+
+def test_load_config_validation(tmp_path, pipeline_config):
+    path = tmp_path / 'config.yml'
+    path.write_text(json.dumps(pipeline_config))  # JSON is valid YAML
+    config = load_config(str(path))
+    assert isinstance(config, Config) and config == pipeline_config
+    assert load_config(str(path)) == pipeline_config, "La configuration en cache doit être identique."
+
+    invalid = {key: value for key, value in pipeline_config.items() if key not in ('rules_file', 'rename_columns')}
+    invalid['skiprows'] = '6'
+    path.write_text(json.dumps(invalid))
+    with pytest.raises(ValueError) as error:
+        load_config(str(path))
+    message = str(error.value)
+    assert "missing key 'rules_file'" in message
+    assert "'skiprows' must be of type int" in message
+    assert "'rename_columns' or 'schema'" in message
+
+def test_example_config_is_valid():
+    assert load_config('config/config_example.yml').errors() == []
@@ -0,0 +1,55 @@
+import os
+from src import data_cache
+from src.run_pipeline import run_pipeline
+from tests.conftest import write_raw_file
+
+def test_dataset_is_shared_until_the_pipeline_writes(pipeline_config, raw_folder):
+    data_cache.invalidate()
+    run_pipeline(config=pipeline_config)
+    df_first = data_cache.get_dataset(pipeline_config)
+    assert data_cache.get_dataset(pipeline_config) is df_first, "Les sessions doivent partager le même DataFrame."
+
+    write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00'], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    df_second = data_cache.get_dataset(pipeline_config)
+    assert df_second is not df_first
+    assert len(df_second) == 4
+
+def test_display_frame_reloads_when_file_changes(pipeline_config):
+    data_cache.invalidate()
+    run_pipeline(config=pipeline_config)
+    columns = ['Date', 'Details', 'Amount']
+    display = data_cache.get_display_frame(pipeline_config, columns)
+    assert display['row_id'].tolist() == [0, 1, 2]
+    assert data_cache.get_display_frame(pipeline_config, columns) is display
+
+    # Written by another process: detected through the file signature
+    os.utime(pipeline_config['output_final'], ns=(0, 0))
+    assert data_cache.get_display_frame(pipeline_config, columns) is not display
+
+def test_filter_options_are_cached(pipeline_config):
+    data_cache.invalidate()
+    run_pipeline(config=pipeline_config)
+    columns = ['Date', 'Month', 'Year', 'Details', 'Amount', 'Account', 'Category', 'Subcategory']
+    options = data_cache.get_filter_options(pipeline_config, columns)
+    assert options['Year'] == [2025]
+    assert options['Account'] == sorted(options['Account'])
+    assert set(options['subcategories_by_category']) == set(options['Category'])
+    assert data_cache.get_filter_options(pipeline_config, columns) is options
+
+def test_row_keys_of_a_rendered_frame_survive_a_reload(pipeline_config, raw_folder):
+    data_cache.invalidate()
+    run_pipeline(config=pipeline_config)
+    columns = ['Date', 'Details', 'Amount']
+    display = data_cache.get_display_frame(pipeline_config, columns)
+    rendered = display[display['Details'] == 'Salary']
+    key = tuple(rendered[data_cache.ROW_KEY_COLUMNS].iloc[0])
+    assert data_cache.get_row_index(pipeline_config)[rendered['row_id'].iloc[0]] == key
+
+    # The dataset is rewritten between the render and the edit: positions shift, keys do not
+    write_raw_file(raw_folder, '1111111A000', ['01/01/2025;Cinema;-9,00', '01/01/2025;Cinema;-9,00'], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    df, row_index = data_cache.get_keyed_dataset(pipeline_config)
+    moved = row_index.get_indexer([key])[0]
+    assert moved != rendered['row_id'].iloc[0], "Les lignes ajoutées avant l'opération décalent sa position."
+    assert df['Details'].iloc[moved] == 'Salary', "La clé d'une ligne affichée doit désigner la même opération après rechargement."
@@ -0,0 +1,80 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.engines import ENGINES, get_engine
+from src.synthetic_data import generate_dataset
+from tests.conftest import write_raw_file
+
+EXAMPLE_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'example')
+
+def _run_engines(make_config):
+    """ Run the pipeline with every engine (each on its own copy of the inputs) and return the final CSV contents. """
+    outputs = {}
+    for engine in ENGINES:
+        config = {**make_config(engine), 'engine': engine}
+        report = run_pipeline(config=config)
+        assert report.info['engine'] == engine
+        with open(config['output_final'], 'rb') as file:
+            outputs[engine] = file.read()
+    return outputs
+
+def _assert_identical(outputs):
+    reference = outputs['pandas']
+    for engine, output in outputs.items():
+        assert output == reference, f"Le moteur {engine} doit produire le même jeu de données que pandas."
+
+def test_parity_example_data(tmp_path, pipeline_config):
+    def make_config(engine):
+        folder = tmp_path / engine
+        shutil.copytree(EXAMPLE_FOLDER, folder / 'raw')
+        (folder / 'processed').mkdir()
+        return {**pipeline_config, 'input_folder': str(folder / 'raw'), 'output_final': str(folder / 'processed' / 'final_data.csv')}
+    _assert_identical(_run_engines(make_config))
+
+@pytest.mark.parametrize('typed', [False, True])
+def test_parity_synthetic_data(tmp_path, typed):
+    def make_config(engine):
+        config = generate_dataset(str(tmp_path / engine), n_rows=3000, n_accounts=2, n_months=3, seed=7)
+        if typed:
+            config['schema'] = {
+                'columns': {'Date': 'date', 'Details': 'string', 'Amount': 'float'},
+                'date_format': '%d/%m/%Y',
+                'decimal': ',',
+            }
+        return config
+    _assert_identical(_run_engines(make_config))
+
+def test_parity_edge_cases(tmp_path, pipeline_config):
+    """ Duplicated rows, irregular spaces, unparsable dates and amounts, then a second incremental run. """
+    rows = [
+        '01/02/2025;  Supermarket \t  North ;-10,00',
+        '01/02/2025;  Supermarket \t  North ;-10,00',
+        '31/02/2025;Cinema;-8,50',
+        '02/02/2025;Salary;',
+        '03/02/2025;;-1,00',
+        '05/02/2025;Bakery\xa0;-2,00',
+    ]
+    def make_config(engine):
+        folder = tmp_path / engine
+        (folder / 'raw').mkdir(parents=True)
+        (folder / 'processed').mkdir()
+        write_raw_file(folder / 'raw', '4444444D000', rows)
+        return {**pipeline_config, 'input_folder': str(folder / 'raw'), 'output_final': str(folder / 'processed' / 'final_data.csv')}
+    _assert_identical(_run_engines(make_config))
+
+    # Incremental run: new file, deduplicated against the dataset written by the same engine
+    outputs = {}
+    for engine in ENGINES:
+        config = {**pipeline_config, 'input_folder': str(tmp_path / engine / 'raw'),
+                  'output_final': str(tmp_path / engine / 'processed' / 'final_data.csv'), 'engine': engine}
+        write_raw_file(tmp_path / engine / 'raw', '4444444D000', rows + ['04/02/2025;Cinema;-9,00'], suffix='M0442025b')
+        run_pipeline(config=config)
+        outputs[engine] = load_existing_dataset(config)
+    assert len(outputs['pandas']) == 7, "Les lignes identiques d'un même fichier sont des opérations distinctes."
+    pd.testing.assert_frame_equal(outputs['arrow'], outputs['pandas'])
+
+def test_unknown_engine(pipeline_config):
+    with pytest.raises(ValueError, match="Unknown engine"):
+        get_engine({**pipeline_config, 'engine': 'spark'})
@@ -0,0 +1,105 @@
+import os
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.streaming import run_streaming_pipeline
+from src.watch import WatchIngestor
+from src.fallback import FallbackModel, trigrams, model_path, normalize_details
+from src.journal import journal_path, append_entries, row_keys
+from tests.conftest import write_raw_file
+
+def _labelled(rows):
+    return pd.DataFrame(rows, columns=['Details', 'Category', 'Subcategory', 'is_manual'])
+
+def test_trigrams():
+    ptr, features, counts = trigrams(['aaaa', '', 'ab'])
+    assert list(ptr) == [0, 3, 3, 5]
+    code = lambda gram: int.from_bytes(gram.encode(), 'big')
+    assert dict(zip(features[:3].tolist(), counts[:3].tolist())) == {code(' aa'): 1, code('aaa'): 2, code('aa '): 1}, \
+        "'aaa' apparaît deux fois dans ' aaaa '."
+    assert list(features[:3]) == sorted(features[:3])
+    assert list(features[3:]) == sorted([code(' ab'), code('ab ')])
+
+def test_model_nearest_neighbour():
+    model = FallbackModel()
+    model.update(_labelled([
+        ('CB BOULANGERIE DU MARCHE 12/03', 'food', 'bakery', False),
+        ('CB PHARMACIE CENTRALE 02/01', 'health', 'pharmacy', False),
+        ('PRLV SEPA ASSURANCE HABITATION', 'housing', 'insurance', False),
+        ('CB UNKNOWN SHOP', 'other', 'other', False),  # not labelled
+    ]), 'Details')
+    assert len(model) == 3
+
+    texts = normalize_details(pd.Series(['CB BOULANGERIE DU MARCHE 28/04', 'CB PHARMACIE CENTRALE PARIS 05/05', 'VIR INST RE 5487']))
+    categories, subcategories, scores = model.predict(texts.to_numpy(), threshold=0.5)
+    assert abs(scores[0] - 1) < 1e-9, "Les nombres (dates) sont ignorés."
+    assert list(subcategories) == ['bakery', 'pharmacy', 'other']
+    assert categories[2] == 'other', "Une opération trop différente reste 'other'."
+
+    # A manual label overrides the rule label of the same details, not the other way round
+    assert model.update(_labelled([('CB PHARMACIE CENTRALE 09/09', 'health', 'drugstore', True)]), 'Details') == 1
+    assert model.update(_labelled([('CB PHARMACIE CENTRALE 10/10', 'health', 'pharmacy', False)]), 'Details') == 0
+    assert model.predict(texts.to_numpy()[1:2], threshold=0.0)[1][0] == 'drugstore'
+
+def test_pipeline_fallback_learns_manual_changes(tmp_path, raw_folder, pipeline_config):
+    config = {**pipeline_config, 'fallback': {'threshold': 0.5}}
+    write_raw_file(raw_folder, '5555555E000', ['10/01/2025;CB TABAC DE LA MAIRIE 10/01;-8,20'])
+    run_pipeline(config=config)
+    df = load_existing_dataset(config)
+    assert (df.loc[df['Details'].astype(str).str.startswith('CB TABAC'), 'Subcategory'] == 'other').all()
+
+    # Manual categorization in the editor, then new operations of the same shop
+    fingerprints, occurrences = row_keys(df, config)
+    position = df.index[df['Details'].astype(str).str.startswith('CB TABAC')][0]
+    append_entries([{
+        'fingerprint': int(fingerprints[position]), 'occurrence': int(occurrences[position]),
+        'old_subcategory': 'other', 'new_subcategory': 'tobacco', 'new_category': 'leisure',
+        }], journal_path(config))
+    write_raw_file(raw_folder, '5555555E000', [
+        '12/02/2025;CB TABAC DE LA MAIRIE 11/02;-9,10',
+        '13/02/2025;CB GARAGE DU CENTRE;-250,00',
+        '14/02/2025;Supermarket North;-40,00',
+    ], suffix='M0442025b')
+    run_pipeline(config=config)
+
+    df = load_existing_dataset(config).set_index('Date')
+    assert df.loc['2025-02-12', 'Subcategory'] == 'tobacco', "Le libellé proche d'un libellé corrigé à la main doit être catégorisé."
+    assert not df.loc['2025-02-12', 'is_manual']
+    assert df.loc['2025-02-13', 'Subcategory'] == 'other'
+    assert df.loc['2025-02-14', 'Subcategory'] == 'groceries'
+
+    model = FallbackModel.load(model_path(config))
+    assert 'cb tabac de la mairie 0/0' in set(model.texts)
+    assert set(model.subcategories) == {'groceries', 'cinema', 'salary', 'tobacco'}
+
+def test_fallback_predictions_are_flagged_and_not_learnt(raw_folder, pipeline_config):
+    config = {**pipeline_config, 'fallback': {'threshold': 0.3}}
+    write_raw_file(raw_folder, '5555555E000', ['10/01/2025;Supermarkt South;-30,00'])
+    run_pipeline(config=config)
+    df = load_existing_dataset(config).set_index('Details')
+    assert df.loc['Supermarkt South', 'Subcategory'] == 'groceries'
+    assert df['is_fallback'].tolist() == [details == 'Supermarkt South' for details in df.index], \
+        "Seules les opérations catégorisées par le modèle sont marquées."
+
+    model = FallbackModel.load(model_path(config))
+    assert 'supermarkt south' not in set(model.texts), "Le modèle n'apprend pas de ses propres prédictions."
+    model.update(load_existing_dataset(config), 'Details')
+    assert 'supermarkt south' not in set(model.texts)
+
+def test_fallback_applies_to_every_entry_point(tmp_path, raw_folder, pipeline_config):
+    write_raw_file(raw_folder, '5555555E000', ['10/01/2025;Supermarkt South;-30,00', '11/01/2025;Garage du centre;-250,00'])
+    results = {}
+    for mode in ['batch', 'streaming', 'watch']:
+        (tmp_path / mode).mkdir()
+        config = {**pipeline_config, 'fallback': {'threshold': 0.3}, 'output_final': str(tmp_path / mode / 'final_data.csv')}
+        if mode == 'batch':
+            run_pipeline(config=config)
+        elif mode == 'streaming':
+            run_streaming_pipeline(config, chunksize=1)
+        else:
+            WatchIngestor(config).process({str(p) for p in raw_folder.iterdir()})
+        df = load_existing_dataset(config).sort_values(['Date', 'Details'], ignore_index=True)
+        results[mode] = df[['Details', 'Subcategory', 'is_fallback']].astype({'Details': str, 'Subcategory': str})
+        assert os.path.exists(model_path(config))
+    assert results['batch'].loc[results['batch']['is_fallback'], 'Details'].tolist() == ['Supermarkt South']
+    for mode in ['streaming', 'watch']:
+        assert results[mode].equals(results['batch']), "Le modèle de repli doit s'appliquer quel que soit le mode d'ingestion."
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.filter_index import FilterIndex, parse_amount_filter
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 500
+    details = np.array(['CB Supermarket Paris', 'Cinema Rex', 'VIR Salary ACME', 'Bakery', 'cinema pathe'])
+    return pd.DataFrame({
+        'Date': pd.date_range('2025-01-01', periods=n, freq='D').strftime('%Y-%m-%d')[rng.integers(0, n, n)],
+        'Details': details[rng.integers(0, len(details), n)],
+        'Amount': np.round(rng.normal(0, 100, n), 2),
+        'Account': rng.choice(['A', 'B'], n),
+        'Category': rng.choice(['Food', 'Leisure', 'Income'], n),
+        'Month': rng.integers(1, 13, n),
+        })
+
+def _index(df):
+    return FilterIndex(df, bitmap_columns=['Account', 'Category', 'Month'], sorted_columns=['Amount', 'Date'])
+
+def test_queries_match_pandas_masks(frame):
+    index = _index(frame)
+    rows = lambda bitmap: index.rows(bitmap).tolist()
+    assert rows(index.contains('cinema')) == np.flatnonzero(frame['Details'].str.contains('cinema', case=False)).tolist()
+    assert rows(index.contains('sal|bak')) == np.flatnonzero(frame['Details'].str.contains('sal|bak', case=False)).tolist()
+    assert rows(index.contains('ci')) == np.flatnonzero(frame['Details'].str.contains('ci', case=False)).tolist()
+    assert rows(index.amount('>50')) == np.flatnonzero(frame['Amount'] > 50).tolist()
+    assert rows(index.amount('-20:30')) == np.flatnonzero(frame['Amount'].between(-20, 30)).tolist()
+    assert rows(index.isin('Category', ['Food', 'Income'])) == np.flatnonzero(frame['Category'].isin(['Food', 'Income'])).tolist()
+
+    date = frame['Date'].iloc[0]
+    expected = (frame['Date'] == date) & (frame['Account'] == 'A') & frame['Details'].str.contains('rex', case=False)
+    combined = index.combine([index.equals('Date', date), index.isin('Account', ['A']), index.contains('rex')])
+    assert rows(combined) == np.flatnonzero(expected).tolist(), "L'intersection des filtres doit égaler le masque pandas."
+
+def test_from_positions(frame):
+    index = _index(frame)
+    assert index.rows(index.from_positions([3, 7])).tolist() == [3, 7]
+
+def test_invalid_amount_filter():
+    assert parse_amount_filter('150') == (150.0, 150.0, True, True)
+    with pytest.raises(ValueError, match='Invalid range'):
+        parse_amount_filter('5:1')
+    with pytest.raises(ValueError):
+        parse_amount_filter('abc')
+
+def test_sort_rows_puts_missing_values_last():
+    df = pd.DataFrame({'Details': ['a', 'b', 'c', 'd'], 'Amount': [3.0, np.nan, 1.0, 3.0]})
+    index = FilterIndex(df, bitmap_columns=[], sorted_columns=['Amount'])
+    assert index.sort_rows([0, 1, 2, 3], 'Amount').tolist() == [2, 0, 3, 1]
+    assert index.sort_rows([0, 1, 3], 'Amount', descending=True).tolist()[-1] == 1, "Les valeurs manquantes doivent être en dernier."
+    assert index.rows(index.amount('>0')).tolist() == [0, 2, 3]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from src.fingerprint import FingerprintIndex, row_fingerprints, load_fingerprint_index, fingerprint_checksum, index_path
+from src.run_pipeline import run_pipeline, load_existing_dataset, load_raw_files, clean_data, remove_existing_rows
+from tests.conftest import write_raw_file
+
+merge_col = ['Date', 'Details', 'Amount', 'Account']
+
+def make_operations(rows):
+    df = pd.DataFrame(rows, columns=merge_col)
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+def test_fingerprints_survive_csv_round_trip(tmp_path):
+    df = make_operations([('2025-01-02', 'Supermarket', -97.51, '1111111A000'), ('2025-01-03', 'Cinema', -12.5, '2222222B000')])
+    df.to_csv(tmp_path / 'ops.csv', index=False)
+    df_read = pd.read_csv(tmp_path / 'ops.csv', parse_dates=['Date'])
+    df_read['Details'] = df_read['Details'].astype('category')
+    assert (row_fingerprints(df, merge_col) == row_fingerprints(df_read, merge_col)).all()
+
+def test_repeated_identical_operations_are_counted():
+    coffee = ('2025-01-02', 'COFFEE SHOP', -2.5, '1111111A000')
+    existing = make_operations([coffee])
+    new = make_operations([coffee, coffee, ('2025-01-02', 'Cinema', -12.5, '1111111A000')])
+    index = FingerprintIndex.from_fingerprints(row_fingerprints(existing, merge_col))
+    mask = index.new_rows_mask(row_fingerprints(new, merge_col))
+    assert mask.tolist() == [False, True, True], "Le second café identique est une nouvelle opération."
+
+def test_index_add_and_persist(tmp_path):
+    index = FingerprintIndex.from_fingerprints(np.array([3, 1, 3], dtype=np.uint64))
+    index.add(np.array([2, 3], dtype=np.uint64))
+    index.save(str(tmp_path / 'index.npz'))
+    loaded = FingerprintIndex.load(str(tmp_path / 'index.npz'))
+    assert loaded.keys.tolist() == [1, 2, 3]
+    assert loaded.count(np.array([3, 4], dtype=np.uint64)).tolist() == [3, 0]
+
+def test_pipeline_persists_fingerprint_index(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df_existing = load_existing_dataset(pipeline_config)
+    assert 'Fingerprint' in df_existing.columns
+    index = load_fingerprint_index(pipeline_config, df_existing)
+    assert len(index) == 3
+
+    df_clean = clean_data(load_raw_files(pipeline_config), pipeline_config)
+    assert remove_existing_rows(df_clean, df_existing, pipeline_config, index).empty
+
+def test_stale_index_of_same_length_is_rebuilt(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df_existing = load_existing_dataset(pipeline_config)
+    FingerprintIndex.from_fingerprints(np.array([1, 2, 3], dtype=np.uint64)).save(index_path(pipeline_config))
+    index = load_fingerprint_index(pipeline_config, df_existing)
+    assert index.checksum() == fingerprint_checksum(df_existing['Fingerprint'].to_numpy()), "Un index obsolète de même taille doit être reconstruit."
+
+def test_identical_operations_of_one_file_are_kept(pipeline_config, raw_folder):
+    coffee = '02/01/2025;Coffee shop;-2,50'
+    write_raw_file(raw_folder, '3333333C000', [coffee, coffee, coffee])
+    run_pipeline(config=pipeline_config)
+    assert len(load_existing_dataset(pipeline_config)) == 6, "Les cafés identiques d'un même relevé sont des opérations distinctes."
+    write_raw_file(raw_folder, '3333333C000', [coffee, coffee], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    assert len(load_existing_dataset(pipeline_config)) == 6, "Un relevé qui recouvre le précédent n'ajoute pas d'opération."
@@ -0,0 +1,46 @@
+import os
+import json
+import glob
+import pstats
+import pytest
+from src.run_pipeline import run_pipeline
+from src.instrumentation import RunReport, report_folder
+
+def _reports(config):
+    return sorted(glob.glob(os.path.join(report_folder(config), 'pipeline_*.json')))
+
+def test_run_report_records_every_stage(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    with open(_reports(pipeline_config)[-1]) as file:
+        report = json.load(file)
+    assert report['status'] == 'success'
+    stages = {stage['stage']: stage for stage in report['stages']}
+    assert list(stages) == ['load_existing', 'load_raw', 'clean', 'dedup', 'categorize', 'save']
+    assert (stages['load_raw']['rows_out'], stages['dedup']['rows_out'], stages['save']['rows_out']) == (3, 3, 3)
+    assert all(stage['wall_s'] >= 0 and stage['cpu_s'] >= 0 for stage in stages.values())
+    assert report['profile_folder'] is None
+
+def test_profile_dumps_per_stage(pipeline_config):
+    run_pipeline(config=pipeline_config, profile=True)
+    with open(_reports(pipeline_config)[-1]) as file:
+        report = json.load(file)
+    folder = report['profile_folder']
+    assert os.path.exists(os.path.join(folder, 'clean.tracemalloc'))
+    assert pstats.Stats(os.path.join(folder, 'categorize.prof')).total_calls > 0, "Le profil cProfile doit être lisible."
+    assert all('tracemalloc_peak_mb' in stage for stage in report['stages'])
+
+def test_failed_run_is_reported(pipeline_config):
+    pipeline_config['rules_file'] = pipeline_config['rules_file'] + '.missing'
+    with pytest.raises(FileNotFoundError):
+        run_pipeline(config=pipeline_config)
+    with open(_reports(pipeline_config)[-1]) as file:
+        report = json.load(file)
+    assert report['status'] == 'failed' and 'FileNotFoundError' in report['error']
+    assert report['stages'][-1]['stage'] == 'categorize'
+
+def test_stage_records_rows_even_on_error():
+    report = RunReport('test')
+    with pytest.raises(ValueError):
+        with report.stage('boom', rows_in=5):
+            raise ValueError
+    assert report.stages[0]['rows_in'] == 5 and report.stages[0]['wall_s'] >= 0
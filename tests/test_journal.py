@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.journal import journal_path, append_entries, read_journal, row_keys, compact_journal
+from tests.conftest import write_raw_file
+
+def _entry(df, config, details, new_subcategory, new_category):
+    fingerprints, occurrences = row_keys(df, config)
+    position = df.index[df['Details'] == details][0]
+    return {
+        'fingerprint': int(fingerprints[position]),
+        'occurrence': int(occurrences[position]),
+        'old_subcategory': df['Subcategory'].iloc[position],
+        'new_subcategory': new_subcategory,
+        'new_category': new_category,
+        }
+
+def test_journal_is_replayed_on_load(pipeline_config, raw_folder):
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    append_entries([_entry(df, pipeline_config, 'Cinema', 'restaurant', 'food')], journal_path(pipeline_config))
+
+    df = load_existing_dataset(pipeline_config)
+    row = df[df['Details'] == 'Cinema'].iloc[0]
+    assert (row['Subcategory'], row['Category'], row['is_manual']) == ('restaurant', 'food', True)
+    assert df['is_manual'].sum() == 1, "Seule la ligne modifiée doit être manuelle."
+
+    # New rows ingested afterwards keep the manual change
+    write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00'], suffix='M0442025b')
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    assert df.loc[df['Details'] == 'Cinema', 'Subcategory'].tolist() == ['restaurant', 'cinema']
+
+def test_compaction_folds_journal_into_dataset(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    append_entries([_entry(df, pipeline_config, 'Salary', 'bonus', 'income')], journal_path(pipeline_config))
+
+    assert compact_journal(pipeline_config) == 1
+    assert read_journal(journal_path(pipeline_config)).empty
+    df_file = pd.read_csv(pipeline_config['output_final'])
+    assert df_file.loc[df_file['Details'] == 'Salary', 'Subcategory'].item() == 'bonus'
+    assert df_file['is_manual'].sum() == 1
+
+def test_concurrent_saves_are_all_kept(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    entry = _entry(df, pipeline_config, 'Supermarket', 'groceries', 'food')
+    file_path = journal_path(pipeline_config)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: append_entries([entry] * 5, file_path), range(40)))
+    assert len(read_journal(file_path)) == 200, "Aucune sauvegarde concurrente ne doit être perdue."
+    assert os.path.getsize(file_path) > 0
@@ -0,0 +1,25 @@
+import pytest
+import pandas as pd
+from src.run_pipeline import load_raw_files
+
+def make_config(folder, **kwargs):
+    config = {
+        'input_folder': str(folder),
+        'file_extensions': ['.csv'],
+        'separator': ';',
+        'skiprows': 6,
+        'encoding': 'ISO-8859-15',
+    }
+    config.update(kwargs)
+    return config
+
+def test_parallel_loading_matches_serial(raw_folder):
+    df_serial = load_raw_files(make_config(raw_folder, load_workers=1))
+    df_parallel = load_raw_files(make_config(raw_folder, load_workers=2))
+    pd.testing.assert_frame_equal(df_serial, df_parallel)
+    assert df_serial['Account'].tolist() == ['1111111A000', '2222222B000', '2222222B000'], "L'ordre des fichiers doit être déterministe."
+
+def test_loading_errors_are_reported_per_file(raw_folder):
+    (raw_folder / '3333333C000broken.csv').write_bytes(b'')
+    with pytest.raises(ValueError, match='3333333C000broken.csv'):
+        load_raw_files(make_config(raw_folder, load_workers=2))
@@ -0,0 +1,35 @@
+import os
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.manifest import manifest_path, load_manifest, select_changed_files
+from tests.conftest import write_raw_file
+
+def test_manifest_records_processed_files(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    manifest = load_manifest(manifest_path(pipeline_config))
+    assert len(manifest) == 2
+    assert sorted(entry['rows'] for entry in manifest.values()) == [1, 2]
+    assert all(len(entry['hash']) == 64 for entry in manifest.values())
+
+def test_unchanged_files_are_skipped(pipeline_config, raw_folder):
+    run_pipeline(config=pipeline_config)
+    manifest = load_manifest(manifest_path(pipeline_config))
+    raw_files = sorted(manifest)
+
+    # Touched but unchanged file: skipped thanks to the content hash
+    os.utime(raw_files[0], (0, 0))
+    changed, _ = select_changed_files(raw_files, manifest)
+    assert changed == []
+
+    # New statement: only this file is processed
+    new_file = write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00'], suffix='M0442025b')
+    changed, _ = select_changed_files(raw_files + [str(new_file)], manifest)
+    assert changed == [str(new_file)]
+
+    run_pipeline(config=pipeline_config)
+    assert len(load_existing_dataset(pipeline_config)) == 4
+
+def test_full_rebuild_reads_every_file(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    run_pipeline(config=pipeline_config, full_rebuild=True)
+    df = load_existing_dataset(pipeline_config)
+    assert len(df) == 3, "Une reconstruction complète ne doit pas dupliquer les opérations."
@@ -0,0 +1,65 @@
+import json
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.recategorize import diff_rules, recategorize, rules_snapshot_path
+from src.journal import journal_path, append_entries, row_keys
+from tests.conftest import RULES
+
+def _write_rules(config, rules):
+    with open(config['rules_file'], 'w') as file:
+        json.dump(rules, file)
+
+def test_diff_rules():
+    new_rules = {
+        'cinema': {'main_category': 'leisure', 'patterns': ['Cinema', 'Theatre']},
+        'salary': RULES['salary'],
+        'groceries': RULES['groceries'],
+        'rent': {'main_category': 'housing', 'patterns': ['Rent']},
+    }
+    diff = diff_rules(RULES, new_rules)
+    assert diff['added'] == ['rent']
+    assert diff['removed'] == []
+    # cinema patterns changed; groceries and salary swapped positions (last match wins)
+    assert sorted(diff['changed']) == ['cinema', 'groceries', 'salary']
+
+    assert diff_rules(RULES, dict(RULES)) == {'added': [], 'removed': [], 'changed': []}
+
+def test_recategorize_only_changes_affected_rows(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    with open(rules_snapshot_path(pipeline_config)) as file:
+        assert json.load(file) == RULES, "Le premier chargement doit enregistrer les règles utilisées."
+
+    # Salary manually kept as is, cinema rule removed, new rule for the supermarket
+    df = load_existing_dataset(pipeline_config)
+    fingerprints, occurrences = row_keys(df, pipeline_config)
+    position = df.index[df['Details'] == 'Salary'][0]
+    append_entries([{
+        'fingerprint': int(fingerprints[position]), 'occurrence': int(occurrences[position]),
+        'old_subcategory': 'salary', 'new_subcategory': 'salary', 'new_category': 'income',
+        }], journal_path(pipeline_config))
+    rules = {
+        'groceries': RULES['groceries'],
+        'salary': {'main_category': 'income', 'patterns': ['Payroll']},
+        'hypermarket': {'main_category': 'food', 'patterns': ['market']},
+    }
+    _write_rules(pipeline_config, rules)
+
+    report = recategorize(pipeline_config)
+    assert sorted(zip(report['old_subcategory'], report['new_subcategory'], report['rows'])) == [
+        ('cinema', 'other', 1),
+        ('groceries', 'hypermarket', 1),
+        ]
+    df = load_existing_dataset(pipeline_config)
+    assert dict(zip(df['Details'], df['Subcategory'])) == {
+        'Supermarket': 'hypermarket', 'Cinema': 'other', 'Salary': 'salary',
+        }
+
+    # Same rules again: nothing to re-evaluate
+    assert recategorize(pipeline_config).empty
+
+def test_dry_run_does_not_write(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    _write_rules(pipeline_config, {**RULES, 'cinema': {'main_category': 'culture', 'patterns': ['Cinema']}})
+    report = recategorize(pipeline_config, dry_run=True)
+    assert report[['new_category', 'rows']].values.tolist() == [['culture', 1]]
+    df = load_existing_dataset(pipeline_config)
+    assert df.loc[df['Details'] == 'Cinema', 'Category'].item() == 'leisure'
@@ -0,0 +1,56 @@
+import pandas as pd
+from src.run_pipeline import run_pipeline
+from src import rule_analysis
+from src.rule_analysis import analyze_rules, run_rule_analysis, analysis_folder
+from src.rule_engine import compile_rules
+
+RULES = {
+    'groceries': {'main_category': 'food', 'patterns': ['Supermarket', 'Bakery']},
+    'organic': {'main_category': 'food', 'patterns': [r'Supermarket\s+Bio']},
+    'cinema': {'main_category': 'leisure', 'patterns': ['Cinema']},
+    'movies': {'main_category': 'leisure', 'patterns': ['Cinema', 'Theatre']},
+    'travel': {'main_category': 'transport', 'patterns': ['Airline']},
+}
+
+def test_analyze_rules():
+    operations = pd.Series(['Supermarket', 'Supermarket Bio', 'Supermarket  bio', 'Bakery', 'Cinema', 'Cinema', 'Unknown', None])
+    report = analyze_rules(operations, RULES)
+    rules = report['rules'].set_index('rule')
+
+    assert rules.loc['groceries', ['rows_matched', 'rows_won', 'status']].tolist() == [4, 2, 'partially shadowed']
+    assert rules.loc['groceries', 'shadowed_by'] == 'organic'
+    assert rules.loc['cinema', ['rows_matched', 'rows_won', 'status', 'shadowed_by']].tolist() == [2, 0, 'shadowed', 'movies']
+    assert rules.loc['travel', 'status'] == 'unused'
+    assert rules.loc['movies', 'status'] == 'ok'
+
+    overlaps = report['overlaps'].set_index(['rule', 'later_rule'])
+    assert overlaps['rows'].to_dict() == {('groceries', 'organic'): 2, ('cinema', 'movies'): 2}
+    assert overlaps.loc[('groceries', 'organic'), 'share_of_rule'] == 0.5
+
+    patterns = report['patterns'].set_index('pattern')
+    assert patterns.loc['Supermarket', 'rows_matched'] == 3
+    assert patterns.loc[r'Supermarket\s+Bio', 'kind'] == 'regex'
+    assert (report['patterns']['time_ms'] >= 0).all()
+
+    # Same winners as the rule engine
+    uniques = pd.unique(operations.dropna())
+    assert list(report['winner']) == compile_rules(RULES).match_all(list(uniques)), \
+        "L'analyse doit désigner la même règle gagnante que le moteur."
+
+def test_run_rule_analysis_writes_reports(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    run_rule_analysis(pipeline_config)
+    rules = pd.read_csv(f"{analysis_folder(pipeline_config)}/rules.csv")
+    assert list(rules['rule']) == ['groceries', 'cinema', 'salary']
+    assert rules['rows_matched'].sum() == 3
+    assert set(rules['status']) == {'ok'}
+
+def test_analysis_by_chunks_matches_single_pass(monkeypatch):
+    operations = pd.Series(['Supermarket Bio', 'Cinema Rex', 'Bakery', 'supermarket', 'Theatre', 'Bank fee'] * 3 + ['Cinema'], dtype=object)
+    single = analyze_rules(operations, RULES)
+    monkeypatch.setattr(rule_analysis, 'CHUNK_SIZE', 2)
+    chunked = analyze_rules(operations, RULES)
+    columns = ['rows_matched', 'rows_won', 'distinct_matched', 'status', 'shadowed_by']
+    pd.testing.assert_frame_equal(chunked['rules'][columns], single['rules'][columns])
+    pd.testing.assert_frame_equal(chunked['overlaps'], single['overlaps'])
+    assert list(chunked['winner']) == list(single['winner']), "Le découpage en blocs ne doit pas changer l'analyse."
@@ -0,0 +1,21 @@
+import pandas as pd
+from src.schema import apply_compact_schema, memory_report
+from src.run_pipeline import run_pipeline, load_existing_dataset
+
+def test_pipeline_output_uses_compact_schema(pipeline_config):
+    run_pipeline(config=pipeline_config)
+    df = load_existing_dataset(pipeline_config)
+    for col in ['Account', 'Currency', 'Debit/Credit', 'Category', 'Subcategory', 'Details']:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), f"La colonne {col} doit être catégorielle."
+    assert df['Month'].dtype == 'int8' and df['Year'].dtype == 'int16'
+    assert df['is_manual'].dtype == 'bool'
+
+def test_missing_dates_use_nullable_integers():
+    df = pd.DataFrame({'Date': pd.to_datetime(['2025-01-02', None]), 'Month': [1, None], 'Year': [2025, None]})
+    df = apply_compact_schema(df)
+    assert str(df['Month'].dtype) == 'Int8' and str(df['Year'].dtype) == 'Int16'
+
+def test_memory_report_total():
+    df = apply_compact_schema(pd.DataFrame({'Account': ['a', 'b', 'a'], 'Amount': [1.0, 2.0, 3.0]}))
+    report = memory_report(df)
+    assert report.loc['Total', 'bytes'] == report['bytes'].iloc[:-1].sum()
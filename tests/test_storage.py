@@ -0,0 +1,71 @@
+import os
+import pytest
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.storage import get_storage, CsvStorage, ParquetStorage
+from tests.conftest import write_raw_file
+
+def parquet_config(pipeline_config, tmp_path, **kwargs):
+    pytest.importorskip('pyarrow')
+    return {**pipeline_config, 'storage': {'backend': 'parquet', 'path': str(tmp_path / 'final_data'), **kwargs}}
+
+def test_default_storage_is_csv(pipeline_config):
+    storage = get_storage(pipeline_config)
+    assert isinstance(storage, CsvStorage)
+    assert storage.path == pipeline_config['output_final']
+
+def test_parquet_storage_appends_new_partitions_only(pipeline_config, raw_folder, tmp_path):
+    config = parquet_config(pipeline_config, tmp_path)
+    run_pipeline(config=config)
+    storage = get_storage(config)
+    assert isinstance(storage, ParquetStorage)
+    first_files = storage._files()
+    assert all('Year=2025' + os.sep + 'Month=1' in f for f in first_files)
+
+    write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00'], suffix='M0442025b')
+    run_pipeline(config=config)
+    new_files = sorted(set(storage._files()) - set(first_files))
+    assert set(first_files) <= set(storage._files()), "Les partitions existantes ne doivent pas être réécrites."
+    assert len(new_files) == 1 and 'Month=2' in new_files[0]
+
+    df = load_existing_dataset(config)
+    assert len(df) == 4
+    assert df['Date'].is_monotonic_increasing
+    assert df['Date'].dtype == 'datetime64[ns]'
+
+def test_parquet_storage_exports_csv(pipeline_config, tmp_path):
+    config = parquet_config(pipeline_config, tmp_path, export_csv=True)
+    run_pipeline(config=config)
+    df_csv = pd.read_csv(config['output_final'])
+    assert len(df_csv) == len(load_existing_dataset(config)) == 3
+
+def test_parquet_write_interrupted_never_duplicates_rows(pipeline_config, raw_folder, tmp_path, monkeypatch):
+    config = parquet_config(pipeline_config, tmp_path)
+    run_pipeline(config=config)
+    storage = get_storage(config)
+    df = storage.load()
+
+    def crash(*args, **kwargs):
+        raise OSError("crash")
+
+    # Crash after writing the new files, before the manifest is replaced: the old version stays live
+    with monkeypatch.context() as m:
+        m.setattr('src.storage.save_json', crash)
+        with pytest.raises(OSError):
+            storage.write(df.assign(Details='new'))
+    assert len(storage._all_files()) == 2 * len(storage._files())
+    pd.testing.assert_frame_equal(storage.load(), df, obj="Une écriture interrompue ne doit pas être visible")
+
+    # Crash after the manifest is replaced, before the old files are removed: only the new version is live
+    with monkeypatch.context() as m:
+        m.setattr('src.storage.os.remove', crash)
+        with pytest.raises(OSError):
+            storage.write(df.assign(Details='new'))
+    loaded = storage.load()
+    assert len(loaded) == len(df), "Les anciennes partitions ne doivent pas être relues."
+    assert (loaded['Details'] == 'new').all()
+
+    # The next write removes every file left over by the interrupted writes
+    storage.write(df)
+    assert storage._all_files() == storage._files()
+    pd.testing.assert_frame_equal(storage.load(), df)
@@ -0,0 +1,53 @@
+import copy
+import pytest
+import pandas as pd
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.streaming import run_streaming_pipeline
+from src.fingerprint import FingerprintIndex
+from src.io_utils import load_json
+from src.recategorize import rules_snapshot_path
+from tests.conftest import RULES
+from tests.conftest import write_raw_file
+
+def sorted_rows(df):
+    return df.sort_values(['Date', 'Account', 'Details'], ignore_index=True)
+
+def test_streaming_matches_batch_pipeline(pipeline_config, raw_folder, tmp_path):
+    write_raw_file(raw_folder, '3333333C000', ['02/01/2025;Supermarket;-97,51', '06/01/2025;Payroll;150,00'])
+    stream_config = copy.deepcopy(pipeline_config)
+    stream_config['output_final'] = str(tmp_path / 'stream' / 'final_data.csv')
+    (tmp_path / 'stream').mkdir()
+
+    run_pipeline(config=pipeline_config)
+    run_streaming_pipeline(stream_config, chunksize=1)
+
+    df_batch = sorted_rows(load_existing_dataset(pipeline_config))
+    df_stream = sorted_rows(load_existing_dataset(stream_config))
+    pd.testing.assert_frame_equal(df_batch, df_stream)
+
+def test_streaming_skips_existing_rows(pipeline_config):
+    run_streaming_pipeline(pipeline_config, chunksize=2)
+    assert load_json(rules_snapshot_path(pipeline_config)) == RULES, "Le jeu de données créé en streaming doit avoir un instantané des règles."
+    run_streaming_pipeline(pipeline_config, chunksize=2, full_rebuild=True)
+    assert len(load_existing_dataset(pipeline_config)) == 3
+
+def test_streaming_counts_identical_operations_over_the_whole_file(pipeline_config, raw_folder):
+    coffee = '02/01/2025;Coffee shop;-2,50'
+    write_raw_file(raw_folder, '3333333C000', [coffee, coffee, '03/01/2025;Cinema;-12,50', coffee])
+    run_streaming_pipeline(pipeline_config, chunksize=1)
+    assert len(load_existing_dataset(pipeline_config)) == 7, "Chaque café identique du relevé doit être ajouté une fois."
+    write_raw_file(raw_folder, '3333333C000', [coffee, coffee, coffee, coffee], suffix='M0442025b')
+    run_streaming_pipeline(pipeline_config, chunksize=1)
+    assert len(load_existing_dataset(pipeline_config)) == 8, "Seul le quatrième café du second relevé est nouveau."
+
+def test_interrupted_run_does_not_duplicate_rows(pipeline_config, raw_folder, monkeypatch):
+    run_streaming_pipeline(pipeline_config, chunksize=2)
+    write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00'], suffix='M0442025b')
+    def interrupt(self, *args):
+        raise KeyboardInterrupt
+    with monkeypatch.context() as patch:
+        patch.setattr(FingerprintIndex, 'save', interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            run_streaming_pipeline(pipeline_config, chunksize=2)
+    run_streaming_pipeline(pipeline_config, chunksize=2)
+    assert len(load_existing_dataset(pipeline_config)) == 4, "Les lignes ajoutées avant l'interruption ne doivent pas être dupliquées."
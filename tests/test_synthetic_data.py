@@ -0,0 +1,37 @@
+import numpy as np
+from src.synthetic_data import generate_dataset, ENCODING
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from benchmarks.bench_pipeline import bench_size
+
+def test_generated_files_follow_raw_format(tmp_path):
+    config = generate_dataset(str(tmp_path), n_rows=1000, n_accounts=2, n_months=3)
+    raw_files = sorted((tmp_path / 'raw').iterdir())
+    assert [f.name for f in raw_files][:3] == ['1000001M044202401.csv', '1000001M044202402.csv', '1000001M044202403.csv']
+    lines = raw_files[0].read_bytes().decode(ENCODING).splitlines()
+    assert lines[0].startswith('Numéro Compte') and lines[4].startswith('Solde (EUROS)')
+    assert lines[6] == 'Date;Libellé;Montant(EUROS)'
+    date, details, amount = lines[7].split(';')
+    assert len(date) == 10 and ',' in amount, "Montants au format décimal français attendus."
+
+    run_pipeline(config=config)
+    df = load_existing_dataset(config)
+    assert len(df) > 950
+    assert (df['Subcategory'] != 'other').mean() > 0.9, "Les règles générées doivent couvrir la plupart des opérations."
+
+def test_statement_balance_is_running_balance(tmp_path):
+    generate_dataset(str(tmp_path), n_rows=600, n_accounts=1, n_months=2)
+    raw_files = sorted((tmp_path / 'raw').iterdir())
+    balances = []
+    amounts = []
+    for f in raw_files:
+        lines = f.read_bytes().decode(ENCODING).splitlines()
+        balances.append(float(lines[4].split(';')[1].replace(',', '.')))
+        amounts.append(sum(float(line.split(';')[2].replace(',', '.')) for line in lines[7:]))
+    assert np.isclose(balances[1] - balances[0], amounts[1])
+
+def test_benchmark_times_every_stage(tmp_path):
+    result = bench_size(2000, str(tmp_path), n_accounts=2, n_months=2)
+    assert set(result['seconds']) == {
+        'load_raw_files', 'clean_bank_data', 'remove_existing_rows', 'categorize_operations', 'save_final_dataset',
+        }
+    assert result['rows_new'] == result['rows_clean'] - result['rows_clean'] // 2
@@ -0,0 +1,88 @@
+import time
+import threading
+import pytest
+from src.watch import watch, make_watcher, InotifyWatcher, WatchIngestor
+from src.run_pipeline import run_pipeline, load_existing_dataset
+from src.io_utils import load_json
+from src.recategorize import rules_snapshot_path
+from tests.conftest import write_raw_file, RULES
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watcher_reports_new_files(raw_folder, use_inotify):
+    watcher = make_watcher(str(raw_folder), poll_interval=0.05, use_inotify=use_inotify)
+    try:
+        if use_inotify and not isinstance(watcher, InotifyWatcher):
+            pytest.skip("inotify indisponible")
+        path = write_raw_file(raw_folder, '3333333C000', ['06/02/2025;Cinema;-9,00'])
+        changes = set()
+        deadline = time.monotonic() + 2
+        while str(path) not in changes and time.monotonic() < deadline:
+            changes |= watcher.changes(0.1)
+        assert str(path) in changes
+    finally:
+        watcher.close()
+
+def test_ingestor_only_processes_new_files(pipeline_config, raw_folder):
+    run_pipeline(config=pipeline_config)
+    ingestor = WatchIngestor(pipeline_config)
+    assert ingestor.process({str(p) for p in raw_folder.iterdir()}) == 0, "Les fichiers déjà ingérés doivent être ignorés."
+
+    new_file = write_raw_file(raw_folder, '1111111A000', ['05/02/2025;Cinema;-9,00', '06/02/2025;Salary;10,00'], suffix='M0442025b')
+    assert ingestor.process({str(new_file)}) == 2
+    df = load_existing_dataset(pipeline_config)
+    assert len(df) == 5
+    assert df.loc[df['Details'] == 'Cinema', 'Subcategory'].tolist() == ['cinema', 'cinema']
+
+def test_ingestor_snapshots_rules_of_a_new_dataset(pipeline_config, raw_folder):
+    WatchIngestor(pipeline_config).process({str(p) for p in raw_folder.iterdir()})
+    assert load_json(rules_snapshot_path(pipeline_config)) == RULES, "Le jeu de données créé par le watcher doit avoir un instantané des règles."
+
+def test_watch_batches_a_burst_of_arrivals(pipeline_config, raw_folder, monkeypatch):
+    batches = []
+    process = WatchIngestor.process
+    monkeypatch.setattr(WatchIngestor, 'process', lambda self, paths: batches.append(sorted(paths)) or process(self, paths))
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(pipeline_config,), kwargs={'debounce': 0.3, 'poll_interval': 0.05, 'stop': stop})
+    thread.start()
+    try:
+        time.sleep(0.5)
+        for i in range(3):
+            write_raw_file(raw_folder, '1111111A000', [f'0{i + 1}/03/2025;Cinema;-{i + 1},00'], suffix=f'M044202503{i}')
+            time.sleep(0.05)
+        deadline = time.monotonic() + 5
+        while len(batches) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+
+    # Catch-up batch with the initial files, then one batch for the burst
+    assert len(batches) == 2
+    assert len(batches[1]) == 3
+    assert len(load_existing_dataset(pipeline_config)) == 6
+
+def test_watch_survives_a_failed_catch_up(pipeline_config, raw_folder, monkeypatch):
+    batches = []
+    process = WatchIngestor.process
+    def failing_first(self, paths):
+        batches.append(sorted(paths))
+        if len(batches) == 1:
+            raise ValueError("bad file")
+        return process(self, paths)
+    monkeypatch.setattr(WatchIngestor, 'process', failing_first)
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, args=(pipeline_config,), kwargs={'debounce': 0.2, 'poll_interval': 0.05, 'stop': stop})
+    thread.start()
+    try:
+        time.sleep(0.5)
+        write_raw_file(raw_folder, '1111111A000', ['01/03/2025;Cinema;-1,00'], suffix='M0442025030')
+        deadline = time.monotonic() + 5
+        while len(batches) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(batches) == 2, "Un échec du rattrapage initial ne doit pas arrêter la surveillance."
+    assert len(load_existing_dataset(pipeline_config)) == 1